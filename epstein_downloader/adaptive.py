@@ -0,0 +1,232 @@
+"""AIMD concurrency control driven by server feedback."""
+
+import asyncio
+import threading
+import time
+from collections import deque
+from email.utils import parsedate_to_datetime
+from typing import Deque, Optional, Tuple
+
+import aiohttp
+
+from . import metrics
+
+# Responses that mean "slow down" rather than "this request is broken"
+THROTTLE_STATUSES = (429, 503)
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Seconds to wait from a ``Retry-After`` header (delta-seconds or HTTP date)."""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when is None:
+        return None
+    return max(when.timestamp() - time.time(), 0.0)
+
+
+def _wake(future: "asyncio.Future") -> None:
+    if not future.done():
+        future.set_result(None)
+
+
+class AdaptiveController:
+    """
+    Additive-increase / multiplicative-decrease limit on requests in flight.
+
+    Every healthy response grows the limit by ``1 / limit`` (about +1 per
+    round trip's worth of requests). A 429/503, a connection error, or a
+    smoothed time-to-first-byte above ``latency_factor`` times the best
+    seen so far cuts it by ``decrease`` — at most once per ``cooldown``
+    seconds, so one burst of failures counts as one signal. Throttling
+    responses also pause all new requests for their ``Retry-After`` (or an
+    exponential backoff when the header is missing).
+
+    One controller is meant to be shared per host by the scraper and the
+    download engine, even when they run in different threads and event
+    loops: state is guarded by a thread lock and waiters are woken on their
+    own loop.
+    """
+
+    def __init__(
+        self,
+        initial: int = 4,
+        minimum: int = 1,
+        maximum: int = 32,
+        decrease: float = 0.5,
+        latency_factor: float = 3.0,
+        cooldown: float = 2.0,
+        name: str = "doj",
+    ):
+        self.minimum = max(1, minimum)
+        self.maximum = max(self.minimum, maximum)
+        self.limit = float(min(max(initial, self.minimum), self.maximum))
+        self.decrease = decrease
+        self.latency_factor = latency_factor
+        self.cooldown = cooldown
+        self.name = name
+        self.in_flight = 0
+        self.last_decision = "start"
+
+        self._lock = threading.Lock()
+        self._waiters: Deque[Tuple[asyncio.AbstractEventLoop, asyncio.Future]] = deque()
+        self._pause_until = 0.0
+        self._last_cut = 0.0
+        self._throttle_streak = 0
+        self._error_streak = 0
+        self._latency: Optional[float] = None
+        self._best_latency: Optional[float] = None
+        metrics.CONCURRENCY_LIMIT.set(int(self.limit), controller=name)
+
+    # -- slots ---------------------------------------------------------
+
+    async def acquire(self) -> None:
+        """Wait for a free slot (and for any Retry-After pause to end)."""
+        loop = asyncio.get_running_loop()
+        while True:
+            future = None
+            with self._lock:
+                pause = self._pause_until - time.monotonic()
+                if pause <= 0 and self.in_flight < int(self.limit):
+                    self.in_flight += 1
+                    return
+                if pause <= 0:
+                    future = loop.create_future()
+                    self._waiters.append((loop, future))
+            if future is None:
+                await asyncio.sleep(pause)
+                continue
+            try:
+                await future
+            except asyncio.CancelledError:
+                with self._lock:
+                    if (loop, future) in self._waiters:
+                        self._waiters.remove((loop, future))
+                    self._wake_waiters()
+                raise
+
+    def release(self) -> None:
+        with self._lock:
+            self.in_flight -= 1
+            self._wake_waiters()
+
+    def _wake_waiters(self) -> None:
+        """Hand free slots to waiters (lock held)."""
+        free = int(self.limit) - self.in_flight
+        while free > 0 and self._waiters:
+            loop, future = self._waiters.popleft()
+            loop.call_soon_threadsafe(_wake, future)
+            free -= 1
+
+    async def __aenter__(self) -> "AdaptiveController":
+        await self.acquire()
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        self.release()
+
+    def wait_sync(self) -> None:
+        """Blocking wait for a Retry-After pause (sequential scraper)."""
+        pause = self._pause_until - time.monotonic()
+        if pause > 0:
+            time.sleep(pause)
+
+    # -- feedback ------------------------------------------------------
+
+    def record(self, status: int, latency: float, retry_after: Optional[str] = None) -> None:
+        """Feed back one response: HTTP status and seconds until its headers arrived."""
+        if status in THROTTLE_STATUSES:
+            self._throttled(status, retry_after)
+            return
+
+        with self._lock:
+            self._throttle_streak = 0
+            self._error_streak = 0
+            self._latency = latency if self._latency is None else 0.8 * self._latency + 0.2 * latency
+            if self._best_latency is None or self._latency < self._best_latency:
+                self._best_latency = self._latency
+            slow = self._latency > self._best_latency * self.latency_factor and self._latency > 0.05
+            if slow:
+                self._cut(f"latency {self._latency * 1000:.0f} ms")
+                return
+            if self.limit < self.maximum:
+                old = int(self.limit)
+                self.limit = min(self.maximum, self.limit + 1 / self.limit)
+                if int(self.limit) != old:
+                    self._decided(f"+1 (healthy, {self._latency * 1000:.0f} ms)")
+                self._wake_waiters()
+
+    def record_error(self, error: object) -> None:
+        """Feed back a connection error or timeout."""
+        with self._lock:
+            self._error_streak += 1
+            self._cut(type(error).__name__)
+
+    def _throttled(self, status: int, retry_after: Optional[str]) -> None:
+        wait = parse_retry_after(retry_after)
+        with self._lock:
+            self._throttle_streak += 1
+            if wait is None:
+                wait = min(60.0, 2.0 ** (self._throttle_streak - 1))
+            self._pause_until = max(self._pause_until, time.monotonic() + wait)
+            self._cut(f"HTTP {status}, pause {wait:g}s")
+
+    def _cut(self, reason: str) -> None:
+        """Multiplicative decrease, once per cooldown (lock held)."""
+        now = time.monotonic()
+        if now - self._last_cut < self.cooldown:
+            return
+        self._last_cut = now
+        self.limit = max(float(self.minimum), self.limit * self.decrease)
+        # A new, slower regime should not be judged against the old best
+        self._best_latency = self._latency
+        self._decided(f"x{self.decrease:g} ({reason})")
+
+    def _decided(self, decision: str) -> None:
+        self.last_decision = decision
+        metrics.CONCURRENCY_LIMIT.set(int(self.limit), controller=self.name)
+        metrics.event("aimd", controller=self.name, limit=int(self.limit), decision=decision)
+
+    def retry_delay(self) -> float:
+        """How long a failed request should wait before retrying."""
+        with self._lock:
+            pause = self._pause_until - time.monotonic()
+            if pause > 0:
+                return pause
+            return min(30.0, 2.0 ** max(self._error_streak - 1, 0))
+
+    def describe(self) -> str:
+        """Short state for progress displays."""
+        pause = self._pause_until - time.monotonic()
+        state = f"c={int(self.limit)}"
+        if pause > 0:
+            state += f" paused {pause:.0f}s"
+        return f"{state} [{self.last_decision}]"
+
+    # -- aiohttp integration -------------------------------------------
+
+    def trace_config(self) -> aiohttp.TraceConfig:
+        """Trace hooks that feed every request of a session back to the controller."""
+        trace = aiohttp.TraceConfig()
+
+        async def on_start(session, ctx, params) -> None:
+            ctx.started = time.monotonic()
+
+        async def on_end(session, ctx, params) -> None:
+            response = params.response
+            self.record(response.status, time.monotonic() - ctx.started, response.headers.get("Retry-After"))
+
+        async def on_exception(session, ctx, params) -> None:
+            if not isinstance(params.exception, asyncio.CancelledError):
+                self.record_error(params.exception)
+
+        trace.on_request_start.append(on_start)
+        trace.on_request_end.append(on_end)
+        trace.on_request_exception.append(on_exception)
+        return trace
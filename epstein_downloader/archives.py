@@ -0,0 +1,267 @@
+"""Dataset ZIP catalogs and parallel, CRC-checked extraction."""
+
+import os
+import zipfile
+import zlib
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from rich.console import Console
+from rich.progress import BarColumn, DownloadColumn, Progress, TextColumn, TransferSpeedColumn
+
+from .layout import PARTIAL_SUFFIXES
+from .verify import find_archives
+
+console = Console()
+
+_COPY_BUFFER = 1024 * 1024
+# Members per pool task: each task opens the archive once
+_BATCH_MEMBERS = 64
+
+
+def complete_archives(output_dir: Path, dataset_num: int) -> List[Path]:
+    """The dataset's ZIPs that are not still being downloaded."""
+    return [
+        path for path in find_archives(output_dir, dataset_num)
+        if not any(path.with_name(path.name + s).exists() for s in PARTIAL_SUFFIXES)
+    ]
+
+
+def extract_dir(output_dir: Path, dataset_num: int) -> Path:
+    """Default destination for a dataset's extracted ZIP."""
+    return Path(output_dir) / "extracted" / f"DataSet{dataset_num}"
+
+
+class ZipCatalog:
+    """
+    The PDF members of one dataset ZIP, keyed by basename.
+
+    Only the central directory is read, so building the catalog for a 10 GB
+    archive costs a few hundred KB of I/O. ZIPs that are still downloading
+    or have a damaged central directory are ignored.
+    """
+
+    def __init__(self, zip_path: Path):
+        self.zip_path = Path(zip_path)
+        self.members: Dict[str, str] = {}
+        with zipfile.ZipFile(self.zip_path) as zf:
+            for info in zf.infolist():
+                if info.is_dir():
+                    continue
+                name = info.filename.rsplit("/", 1)[-1]
+                if name.lower().endswith(".pdf"):
+                    self.members.setdefault(name, info.filename)
+
+    @classmethod
+    def for_dataset(cls, output_dir: Path, dataset_num: int) -> Optional["ZipCatalog"]:
+        """Catalog of the dataset's first complete, readable ZIP (None if there is none)."""
+        for path in complete_archives(output_dir, dataset_num):
+            try:
+                return cls(path)
+            except (zipfile.BadZipFile, OSError) as e:
+                console.print(f"[yellow]Ignoring unreadable {path.name}: {e}[/yellow]")
+        return None
+
+    def __contains__(self, filename: str) -> bool:
+        return filename in self.members
+
+    def __len__(self) -> int:
+        return len(self.members)
+
+    def names(self) -> Iterable[str]:
+        return self.members.keys()
+
+    def extract(self, targets: List[Tuple[str, Path]], workers: Optional[int] = None) -> int:
+        """
+        Copy PDFs out of the ZIP in parallel.
+
+        Args:
+            targets: (basename, destination path) per file
+            workers: Extraction processes (default: CPU count)
+
+        Returns:
+            Number of files extracted
+        """
+        jobs = [(self.members[name], str(dest)) for name, dest in targets if name in self.members]
+        result = extract_members(self.zip_path, jobs, workers=workers, quiet=True)
+        return result.extracted
+
+
+@dataclass
+class ExtractResult:
+    """Outcome of an extraction run."""
+    extracted: int = 0
+    skipped: int = 0
+    failed: List[str] = field(default_factory=list)
+
+
+def _safe_dest(dest_dir: Path, member: str) -> Optional[Path]:
+    """Destination for a member, or None if its name would escape ``dest_dir``."""
+    parts = [p for p in member.replace("\\", "/").split("/") if p not in ("", ".")]
+    if not parts or ".." in parts or ":" in parts[0]:
+        return None
+    return dest_dir.joinpath(*parts)
+
+
+def extract_archive(
+    zip_path: Path,
+    dest_dir: Path,
+    workers: Optional[int] = None,
+    quiet: bool = False,
+) -> ExtractResult:
+    """
+    Extract a whole ZIP, keeping its internal paths, across a process pool.
+
+    Members already on disk with the same size and CRC-32 are skipped, so
+    an interrupted or repeated extraction only writes what is missing.
+
+    Args:
+        zip_path: Archive to extract
+        dest_dir: Directory to extract into
+        workers: Extraction processes (default: CPU count)
+        quiet: Hide the progress bar
+
+    Returns:
+        Counts of extracted / skipped members and names that failed
+    """
+    dest_dir = Path(dest_dir)
+    jobs: List[Tuple[str, str]] = []
+    unsafe: List[str] = []
+    with zipfile.ZipFile(zip_path) as zf:
+        for info in zf.infolist():
+            if info.is_dir():
+                continue
+            dest = _safe_dest(dest_dir, info.filename)
+            if dest is None:
+                unsafe.append(info.filename)
+            else:
+                jobs.append((info.filename, str(dest)))
+    for name in unsafe:
+        console.print(f"[red]Refusing to extract {name!r}: path escapes {dest_dir}[/red]")
+
+    result = extract_members(zip_path, jobs, workers=workers, quiet=quiet)
+    result.failed.extend(unsafe)
+    return result
+
+
+def extract_members(
+    zip_path: Path,
+    jobs: List[Tuple[str, str]],
+    workers: Optional[int] = None,
+    quiet: bool = False,
+) -> ExtractResult:
+    """
+    Stream ZIP members to disk on a process pool, checking CRC-32 as they go.
+
+    Members are dealt out largest-first to balance uncompressed bytes per
+    worker, then sent in small batches so each task opens the archive once
+    and the progress bar moves smoothly.
+
+    Args:
+        zip_path: Archive to read
+        jobs: (member name, destination path) pairs
+        workers: Extraction processes (default: CPU count)
+        quiet: Hide the progress bar
+
+    Returns:
+        Counts of extracted / skipped members and names that failed
+    """
+    result = ExtractResult()
+    if not jobs:
+        return result
+
+    with zipfile.ZipFile(zip_path) as zf:
+        sizes = {info.filename: info.file_size for info in zf.infolist()}
+    workers = max(1, min(workers or os.cpu_count() or 1, len(jobs)))
+
+    # Largest-first greedy split, then batches of ~_BATCH_MEMBERS per task
+    lanes: List[List[Tuple[str, str]]] = [[] for _ in range(workers)]
+    loads = [0] * workers
+    for job in sorted(jobs, key=lambda j: sizes.get(j[0], 0), reverse=True):
+        lane = loads.index(min(loads))
+        lanes[lane].append(job)
+        loads[lane] += sizes.get(job[0], 0)
+    batches = [lane[i:i + _BATCH_MEMBERS] for lane in lanes for i in range(0, len(lane), _BATCH_MEMBERS)]
+
+    with Progress(
+        TextColumn("[progress.description]{task.description}"),
+        BarColumn(),
+        DownloadColumn(),
+        TransferSpeedColumn(),
+        TextColumn("{task.fields[files]}"),
+        console=console,
+        disable=quiet,
+    ) as progress:
+        task = progress.add_task(
+            f"Extracting {Path(zip_path).name}", total=sum(loads), files=f"0/{len(jobs)} files",
+        )
+
+        def record(batch_result: Tuple[int, int, List[str], int]) -> None:
+            extracted, skipped, failed, nbytes = batch_result
+            result.extracted += extracted
+            result.skipped += skipped
+            result.failed.extend(failed)
+            done = result.extracted + result.skipped + len(result.failed)
+            progress.update(task, advance=nbytes, files=f"{done}/{len(jobs)} files")
+
+        if workers == 1:
+            for batch in batches:
+                record(_extract_batch(str(zip_path), batch))
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                futures = [pool.submit(_extract_batch, str(zip_path), batch) for batch in batches]
+                for future in as_completed(futures):
+                    record(future.result())
+
+    for name in result.failed:
+        console.print(f"[red]CRC/read error extracting {name}[/red]")
+    return result
+
+
+def _file_crc(path: Path) -> int:
+    crc = 0
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(_COPY_BUFFER), b""):
+            crc = zlib.crc32(chunk, crc)
+    return crc
+
+
+def _extract_batch(zip_path: str, jobs: List[Tuple[str, str]]) -> Tuple[int, int, List[str], int]:
+    """
+    Extract one batch of members with a single ZipFile handle.
+
+    Returns:
+        (extracted, skipped, failed member names, uncompressed bytes handled)
+    """
+    extracted = skipped = nbytes = 0
+    failed: List[str] = []
+    with zipfile.ZipFile(zip_path) as zf:
+        for member, dest in jobs:
+            info = zf.getinfo(member)
+            nbytes += info.file_size
+            dest_path = Path(dest)
+
+            if dest_path.is_file() and dest_path.stat().st_size == info.file_size:
+                if _file_crc(dest_path) == info.CRC:
+                    skipped += 1
+                    continue
+
+            dest_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = dest_path.with_name(dest_path.name + ".extracting")
+            crc = 0
+            try:
+                with zf.open(info) as src, open(tmp, "wb") as out:
+                    for chunk in iter(lambda: src.read(_COPY_BUFFER), b""):
+                        crc = zlib.crc32(chunk, crc)
+                        out.write(chunk)
+            except (zipfile.BadZipFile, OSError, EOFError, zlib.error):
+                crc = None
+            if crc != info.CRC:
+                tmp.unlink(missing_ok=True)
+                failed.append(member)
+                continue
+            os.replace(tmp, dest_path)
+            extracted += 1
+    return extracted, skipped, failed, nbytes
@@ -0,0 +1,267 @@
+"""Persistent aria2c daemon controlled over JSON-RPC."""
+
+import secrets
+import socket
+import subprocess
+import time
+from itertools import count
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+import requests
+from rich.console import Console
+from rich.progress import Progress, SpinnerColumn, TextColumn
+
+console = Console()
+
+# Options that only make sense for a foreground aria2c process
+_CONSOLE_ONLY_OPTIONS = {"console-log-level", "summary-interval", "input-file"}
+
+# Statuses after which aria2 will not touch a download again
+_FINAL_STATUSES = {"complete", "error", "removed"}
+
+# system.multicall batch size (keeps requests well under rpc-max-request-size)
+_MULTICALL_CHUNK = 500
+
+
+class Aria2RPCError(Exception):
+    """Raised when aria2 returns a JSON-RPC error."""
+
+
+def args_to_options(args: Iterable[str]) -> Dict[str, object]:
+    """
+    Convert aria2c command-line flags into an RPC options dict.
+
+    Positional URIs and console-only flags are dropped. Repeated flags
+    (e.g. ``--header``) become lists, as aria2 expects.
+    """
+    options: Dict[str, object] = {}
+    for arg in args:
+        if not arg.startswith("--"):
+            continue
+        key, _, value = arg[2:].partition("=")
+        if key in _CONSOLE_ONLY_OPTIONS:
+            continue
+        if key in options:
+            existing = options[key]
+            options[key] = (existing if isinstance(existing, list) else [existing]) + [value]
+        else:
+            options[key] = [value] if key == "header" else value
+    return options
+
+
+class Aria2RPCClient:
+    """Minimal aria2 JSON-RPC client."""
+
+    def __init__(self, url: str, secret: Optional[str] = None, timeout: float = 30):
+        self.url = url
+        self.secret = secret
+        self.timeout = timeout
+        self.session = requests.Session()
+        # next() on a count is atomic, so scheduler threads never share an id
+        self._ids = count(1)
+
+    def _params(self, params: tuple) -> list:
+        if self.secret:
+            return [f"token:{self.secret}", *params]
+        return list(params)
+
+    def call(self, method: str, *params):
+        """Call a single aria2 RPC method and return its result."""
+        payload = {
+            "jsonrpc": "2.0",
+            "id": str(next(self._ids)),
+            "method": method,
+            # system.* methods take no token; multicall carries it per call
+            "params": list(params) if method.startswith("system.") else self._params(params),
+        }
+        response = self.session.post(self.url, json=payload, timeout=self.timeout)
+        data = response.json()
+        if "error" in data:
+            raise Aria2RPCError(f"{method}: {data['error'].get('message')}")
+        return data["result"]
+
+    def multicall(self, calls: List[tuple]) -> list:
+        """
+        Issue many calls in one round trip via ``system.multicall``.
+
+        Args:
+            calls: (method, *params) tuples
+
+        Returns:
+            One entry per call: the result, or an Aria2RPCError instance
+        """
+        results: list = []
+        for i in range(0, len(calls), _MULTICALL_CHUNK):
+            chunk = calls[i:i + _MULTICALL_CHUNK]
+            methods = [
+                {"methodName": method, "params": self._params(tuple(params))}
+                for method, *params in chunk
+            ]
+            for item in self.call("system.multicall", methods):
+                if isinstance(item, list):
+                    results.append(item[0])
+                else:
+                    results.append(Aria2RPCError(item.get("faultString", "unknown error")))
+        return results
+
+    def add_uri(self, uris: List[str], options: Optional[dict] = None) -> str:
+        """Queue a download and return its GID."""
+        return self.call("aria2.addUri", uris, options or {})
+
+    def get_version(self) -> dict:
+        """Return the daemon version info (used as a liveness check)."""
+        return self.call("aria2.getVersion")
+
+    def get_global_stat(self) -> dict:
+        """Return global speed and active/waiting/stopped counts."""
+        return self.call("aria2.getGlobalStat")
+
+    def shutdown(self) -> None:
+        """Ask the daemon to exit."""
+        self.call("aria2.shutdown")
+
+    def wait(self, gids: List[str], poll_interval: float = 2.0, quiet: bool = False) -> Dict[str, str]:
+        """
+        Block until all downloads reach a final state.
+
+        Magnet and .torrent downloads hand over to new GIDs once metadata
+        arrives; those are followed via ``followedBy``.
+
+        Returns:
+            Final status for every tracked GID
+        """
+        pending = list(gids)
+        final: Dict[str, str] = {}
+
+        with Progress(
+            SpinnerColumn(),
+            TextColumn("{task.description}"),
+            console=console,
+            transient=True,
+            disable=quiet,
+        ) as progress:
+            task = progress.add_task("Waiting for aria2...", total=None)
+
+            while pending:
+                statuses = self.multicall([
+                    ("aria2.tellStatus", gid, ["gid", "status", "followedBy", "errorMessage"])
+                    for gid in pending
+                ])
+
+                still_pending = []
+                for gid, status in zip(pending, statuses):
+                    if isinstance(status, Aria2RPCError):
+                        final[gid] = "error"
+                        continue
+                    state = status.get("status", "error")
+                    followed = status.get("followedBy") or []
+                    if state == "complete" and followed:
+                        # Metadata finished; track the real payload instead
+                        still_pending.extend(followed)
+                    elif state in _FINAL_STATUSES:
+                        final[gid] = state
+                        if state == "error":
+                            console.print(f"[red]aria2 {gid}: {status.get('errorMessage', 'failed')}[/red]")
+                    else:
+                        still_pending.append(gid)
+                pending = still_pending
+
+                stat = self.get_global_stat()
+                speed = int(stat.get("downloadSpeed", 0)) / (1024 ** 2)
+                progress.update(
+                    task,
+                    description=(
+                        f"aria2: {stat.get('numActive', 0)} active, "
+                        f"{stat.get('numWaiting', 0)} waiting, "
+                        f"{len(final)} finished, {speed:.1f} MB/s"
+                    ),
+                )
+
+                if pending:
+                    time.sleep(poll_interval)
+
+        return final
+
+
+def _free_port() -> int:
+    """Pick an unused local TCP port."""
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+class Aria2Daemon:
+    """
+    Runs a single ``aria2c --enable-rpc`` process for the whole session.
+
+    Use as a context manager; ``client`` is available inside the block.
+    """
+
+    def __init__(
+        self,
+        download_dir: Path,
+        max_concurrent: int = 5,
+        port: Optional[int] = None,
+        startup_timeout: float = 15.0,
+    ):
+        self.download_dir = Path(download_dir)
+        self.max_concurrent = max_concurrent
+        self.port = port or _free_port()
+        self.secret = secrets.token_hex(16)
+        self.startup_timeout = startup_timeout
+        self.process: Optional[subprocess.Popen] = None
+        self.client = Aria2RPCClient(f"http://127.0.0.1:{self.port}/jsonrpc", self.secret)
+
+    def start(self) -> Aria2RPCClient:
+        """Start the daemon and wait until it answers RPC calls."""
+        self.download_dir.mkdir(parents=True, exist_ok=True)
+        args = [
+            "aria2c",
+            "--enable-rpc",
+            "--rpc-listen-all=false",
+            f"--rpc-listen-port={self.port}",
+            f"--rpc-secret={self.secret}",
+            "--rpc-max-request-size=64M",
+            f"--dir={self.download_dir}",
+            f"--max-concurrent-downloads={self.max_concurrent}",
+            "--continue=true",
+            "--auto-file-renaming=false",
+            "--seed-time=0",
+            "--console-log-level=warn",
+        ]
+        self.process = subprocess.Popen(args)
+
+        deadline = time.monotonic() + self.startup_timeout
+        while time.monotonic() < deadline:
+            if self.process.poll() is not None:
+                raise RuntimeError(f"aria2c exited with code {self.process.returncode}")
+            try:
+                version = self.client.get_version()
+                console.print(f"[dim]aria2c {version.get('version', '')} RPC daemon on port {self.port}[/dim]")
+                return self.client
+            except requests.RequestException:
+                time.sleep(0.2)
+
+        self.stop()
+        raise RuntimeError("aria2c RPC daemon did not start in time")
+
+    def stop(self) -> None:
+        """Shut the daemon down, killing it if it does not exit."""
+        if not self.process or self.process.poll() is not None:
+            return
+        try:
+            self.client.shutdown()
+            self.process.wait(timeout=10)
+        except (requests.RequestException, Aria2RPCError, subprocess.TimeoutExpired):
+            self.process.terminate()
+            try:
+                self.process.wait(timeout=5)
+            except subprocess.TimeoutExpired:
+                self.process.kill()
+
+    def __enter__(self) -> Aria2RPCClient:
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.stop()
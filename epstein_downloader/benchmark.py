@@ -0,0 +1,623 @@
+"""Offline benchmarks against a local mock of the DOJ site."""
+
+import asyncio
+import json
+import multiprocessing
+import random
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from itertools import count
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+import requests
+from aiohttp import web
+from rich.console import Console
+from rich.table import Table
+
+from .config import DATASETS
+
+console = Console()
+
+SUITES = ("scrape", "download", "index", "rpc")
+
+# Modules whose console output is muted while a benchmark runs
+_NOISY_MODULES = ("scraper", "partition", "downloader", "native", "manifest", "index_store", "aria2rpc")
+
+
+@dataclass
+class MockSiteConfig:
+    """Shape and failure behaviour of the mock DOJ site."""
+    dataset_num: int = 9
+    pages: int = 50
+    files_per_page: int = 50
+    # First EFTA number listed (default: the dataset's configured start, or 1)
+    efta_start: Optional[int] = None
+    # Past the last page: "wrap" repeats the last page (like the live site), "empty" serves no links
+    tail: str = "wrap"
+    pdf_size: int = 64 * 1024
+    # Seconds added to every response
+    latency: float = 0.0
+    # Fraction of requests answered with 429 (with Retry-After) or 503
+    error_rate: float = 0.0
+    retry_after: int = 1
+    seed: int = 0
+    # EFTA numbers left out of the listing; later files shift up, like a DOJ removal
+    removed: Tuple[int, ...] = ()
+
+    @property
+    def first_efta(self) -> int:
+        if self.efta_start is not None:
+            return self.efta_start
+        dataset = DATASETS.get(self.dataset_num)
+        return (dataset.efta_start if dataset else None) or 1
+
+    @property
+    def total_files(self) -> int:
+        return self.pages * self.files_per_page
+
+
+def _synthetic_pdf(size: int) -> bytes:
+    """A minimal PDF padded to ``size`` bytes."""
+    head = b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n"
+    tail = b"\n%%EOF\n"
+    return head + b"0" * max(size - len(head) - len(tail), 0) + tail
+
+
+def build_app(config: MockSiteConfig) -> web.Application:
+    """
+    aiohttp application serving listing pages and PDFs like justice.gov.
+
+    Listing links use the site's exact ``href="<origin>/epstein/files/DataSet%20N/EFTA........pdf"``
+    format, with the mock server's own origin, so ``DatasetScraper(base_url=...)``
+    parses them unchanged. PDFs honour single ``Range`` requests.
+    """
+    n = config.dataset_num
+    rng = random.Random(config.seed)
+    pdf = _synthetic_pdf(config.pdf_size)
+    errors = [0]
+    listed = None
+    if config.removed:
+        removed = set(config.removed)
+        listed = [num for num in range(config.first_efta, config.first_efta + config.total_files)
+                  if num not in removed]
+
+    async def fail_or_delay() -> Optional[web.Response]:
+        if config.latency:
+            await asyncio.sleep(config.latency)
+        if config.error_rate and rng.random() < config.error_rate:
+            errors[0] += 1
+            if errors[0] % 2:
+                return web.Response(status=429, headers={"Retry-After": str(config.retry_after)})
+            return web.Response(status=503)
+        return None
+
+    async def listing(request: web.Request) -> web.Response:
+        failure = await fail_or_delay()
+        if failure is not None:
+            return failure
+        page = int(request.query.get("page", "0"))
+        if page >= config.pages:
+            if config.tail == "empty" or not config.pages:
+                page = -1
+            else:
+                page = config.pages - 1
+        origin = f"{request.scheme}://{request.host}"
+        rows = []
+        if page >= 0:
+            first = config.first_efta + page * config.files_per_page
+            nums = range(first, first + config.files_per_page)
+            if listed is not None:
+                nums = listed[page * config.files_per_page:(page + 1) * config.files_per_page]
+            for num in nums:
+                rows.append(
+                    f'<li><a href="{origin}/epstein/files/DataSet%20{n}/EFTA{num:08d}.pdf">'
+                    f"EFTA{num:08d}.pdf</a></li>"
+                )
+        body = (
+            f"<html><head><title>Data Set {n} Files</title></head><body>"
+            f"<ul>{''.join(rows)}</ul></body></html>"
+        )
+        return web.Response(text=body, content_type="text/html")
+
+    async def pdf_file(request: web.Request) -> web.Response:
+        if request.match_info["dataset"] not in (f"DataSet {n}", f"DataSet%20{n}"):
+            raise web.HTTPNotFound()
+        failure = await fail_or_delay()
+        if failure is not None:
+            return failure
+        size = len(pdf)
+        range_header = request.headers.get("Range", "")
+        if range_header.startswith("bytes="):
+            start_s, _, end_s = range_header[6:].partition("-")
+            start = int(start_s or 0)
+            end = min(int(end_s), size - 1) if end_s else size - 1
+            if start >= size:
+                return web.Response(status=416, headers={"Content-Range": f"bytes */{size}"})
+            return web.Response(
+                status=206,
+                body=pdf[start:end + 1],
+                content_type="application/pdf",
+                headers={"Content-Range": f"bytes {start}-{end}/{size}", "Accept-Ranges": "bytes"},
+            )
+        return web.Response(body=pdf, content_type="application/pdf", headers={"Accept-Ranges": "bytes"})
+
+    app = web.Application()
+    app.router.add_get(f"/epstein/doj-disclosures/data-set-{n}-files", listing)
+    app.router.add_get("/epstein/files/{dataset}/{name}", pdf_file)
+    return app
+
+
+def _serve(config: MockSiteConfig, host: str, port: int, ready) -> None:
+    """Child-process entry point: run the mock site until terminated."""
+    async def main() -> None:
+        runner = web.AppRunner(build_app(config), access_log=None)
+        await runner.setup()
+        site = web.TCPSite(runner, host, port)
+        await site.start()
+        ready.put(runner.addresses[0][1])
+        while True:
+            await asyncio.sleep(3600)
+
+    asyncio.run(main())
+
+
+class MockDojServer:
+    """
+    Runs the mock site in a child process.
+
+    A separate process keeps the server's CPU time and memory out of the
+    numbers measured in the benchmarking process. Use as a context manager;
+    ``base_url`` is valid once entered.
+    """
+
+    def __init__(self, config: MockSiteConfig, host: str = "127.0.0.1", port: int = 0):
+        self.config = config
+        self.host = host
+        self.port = port
+        self._process = None
+
+    @property
+    def base_url(self) -> str:
+        return f"http://{self.host}:{self.port}"
+
+    def start(self) -> None:
+        ready = multiprocessing.Queue()
+        self._process = multiprocessing.Process(
+            target=_serve, args=(self.config, self.host, self.port, ready), daemon=True,
+        )
+        self._process.start()
+        self.port = ready.get(timeout=30)
+
+    def stop(self) -> None:
+        if self._process is not None:
+            self._process.terminate()
+            self._process.join()
+            self._process = None
+
+    def __enter__(self) -> "MockDojServer":
+        self.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+
+class FakeAria2Server:
+    """
+    In-process stand-in for ``aria2c --enable-rpc``.
+
+    Speaks the JSON-RPC subset the downloader uses (``addUri``,
+    ``tellStatus``, ``getGlobalStat``, ``getVersion``, ``shutdown`` and
+    ``system.multicall``), checks the ``token:`` secret, and "downloads"
+    each URI with a plain GET on a small thread pool into ``dir``/``out``.
+    Use as a context manager; ``client`` is an ``Aria2RPCClient`` for it.
+    """
+
+    def __init__(self, secret: str = "fake-secret", workers: int = 8):
+        self.secret = secret
+        self.statuses: Dict[str, dict] = {}
+        self._lock = threading.Lock()
+        self._gids = count(1)
+        self._pool = ThreadPoolExecutor(max_workers=workers)
+        self._server: Optional[ThreadingHTTPServer] = None
+        self.client = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/jsonrpc"
+
+    def _fetch(self, gid: str, uri: str, target: Path) -> None:
+        try:
+            response = requests.get(uri, timeout=30)
+            response.raise_for_status()
+            target.parent.mkdir(parents=True, exist_ok=True)
+            target.write_bytes(response.content)
+            update = {"status": "complete"}
+        except (requests.RequestException, OSError) as e:
+            update = {"status": "error", "errorMessage": str(e)}
+        with self._lock:
+            self.statuses[gid].update(update)
+
+    def _dispatch(self, method: str, params: list):
+        """Result of one call; raises ValueError with the aria2 error message."""
+        if not method.startswith("system."):
+            if not params or params[0] != f"token:{self.secret}":
+                raise ValueError("Unauthorized")
+            params = params[1:]
+        if method == "aria2.getVersion":
+            return {"version": "fake", "enabledFeatures": []}
+        if method == "aria2.addUri":
+            uris, options = params[0], (params[1] if len(params) > 1 else {})
+            gid = f"{next(self._gids):016x}"
+            target = Path(options.get("dir", ".")) / options.get("out", uris[0].split("/")[-1])
+            with self._lock:
+                self.statuses[gid] = {"gid": gid, "status": "active"}
+            self._pool.submit(self._fetch, gid, uris[0], target)
+            return gid
+        if method == "aria2.tellStatus":
+            with self._lock:
+                status = self.statuses.get(params[0])
+                if status is None:
+                    raise ValueError(f"GID {params[0]} is not found")
+                keys = params[1] if len(params) > 1 else status.keys()
+                return {k: status[k] for k in keys if k in status}
+        if method == "aria2.getGlobalStat":
+            with self._lock:
+                states = [st["status"] for st in self.statuses.values()]
+            return {"downloadSpeed": "0", "numActive": str(states.count("active")),
+                    "numWaiting": "0", "numStopped": str(len(states) - states.count("active"))}
+        if method == "aria2.shutdown":
+            return "OK"
+        if method == "system.multicall":
+            results = []
+            for call in params[0]:
+                try:
+                    results.append([self._dispatch(call["methodName"], call.get("params", []))])
+                except ValueError as e:
+                    results.append({"faultCode": 1, "faultString": str(e)})
+            return results
+        raise ValueError(f"No such method: {method}")
+
+    def start(self) -> None:
+        from .aria2rpc import Aria2RPCClient
+
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self) -> None:
+                request = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+                try:
+                    reply = {"result": fake._dispatch(request["method"], request.get("params", []))}
+                except ValueError as e:
+                    reply = {"error": {"code": 1, "message": str(e)}}
+                body = json.dumps({"jsonrpc": "2.0", "id": request.get("id"), **reply}).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args) -> None:
+                pass
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        self.client = Aria2RPCClient(self.url, self.secret)
+
+    def stop(self) -> None:
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+        self._pool.shutdown(wait=True)
+
+    def __enter__(self) -> "FakeAria2Server":
+        self.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+
+def serve_forever(config: MockSiteConfig, host: str = "127.0.0.1", port: int = 8000) -> None:
+    """Run the mock site in the foreground (for manual testing)."""
+    web.run_app(build_app(config), host=host, port=port, print=None, access_log=None)
+
+
+@dataclass
+class BenchResult:
+    """Throughput of one benchmark."""
+    name: str
+    seconds: float
+    pages: int = 0
+    files: int = 0
+    bytes: int = 0
+    # Peak resident set size during the run (None if the platform can't tell)
+    peak_rss: Optional[int] = None
+    rates: dict = field(default_factory=dict)
+
+    def __post_init__(self) -> None:
+        secs = self.seconds or 1e-9
+        if self.pages:
+            self.rates["pages/s"] = self.pages / secs
+        if self.files:
+            self.rates["files/s"] = self.files / secs
+        if self.bytes:
+            self.rates["MB/s"] = self.bytes / secs / (1024 * 1024)
+
+
+def _reset_peak_rss() -> None:
+    """Reset the kernel's peak-RSS counter (Linux only; elsewhere the process peak is kept)."""
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+    except OSError:
+        pass
+
+
+def _peak_rss() -> Optional[int]:
+    """Peak resident set size in bytes."""
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    try:
+        import resource
+    except ImportError:  # Windows
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+@contextmanager
+def _measure(result: dict) -> Iterator[None]:
+    _reset_peak_rss()
+    start = time.perf_counter()
+    yield
+    result["seconds"] = time.perf_counter() - start
+    result["peak_rss"] = _peak_rss()
+
+
+@contextmanager
+def _muted() -> Iterator[None]:
+    """Silence the package's own console output while a benchmark runs."""
+    modules = [sys.modules.get(f"{__package__}.{name}") for name in _NOISY_MODULES]
+    consoles = [m.console for m in modules if m is not None and hasattr(m, "console")]
+    previous = [c.quiet for c in consoles]
+    for c in consoles:
+        c.quiet = True
+    try:
+        yield
+    finally:
+        for c, quiet in zip(consoles, previous):
+            c.quiet = quiet
+
+
+def bench_scrape(base_url: str, config: MockSiteConfig, workdir: Path, concurrency: int = 1,
+                 partition: bool = False) -> BenchResult:
+    """Time ``DatasetScraper.scrape_pages`` over the whole mock listing."""
+    from .scraper import DatasetScraper
+
+    out = Path(tempfile.mkdtemp(dir=workdir))
+    scraper = DatasetScraper(out, config.dataset_num, quiet=True, skip_zipped=False, base_url=base_url)
+    stats: dict = {}
+    with _muted(), _measure(stats):
+        urls = scraper.scrape_pages(delay=0, concurrency=concurrency, partition=partition)
+    scraper.store.close()
+    mode = "partition" if partition else ("async" if concurrency > 1 else "sequential")
+    return BenchResult(f"scrape ({mode}, c={concurrency})", pages=config.pages, files=len(urls), **stats)
+
+
+def bench_download(base_url: str, config: MockSiteConfig, workdir: Path, engine: str = "native",
+                   concurrent: int = 16) -> BenchResult:
+    """Time ``Downloader.download_pdf_list`` for every file on the mock site."""
+    from .downloader import Downloader
+
+    out = Path(tempfile.mkdtemp(dir=workdir))
+    n = config.dataset_num
+    urls = [
+        f"{base_url}/epstein/files/DataSet%20{n}/EFTA{num:08d}.pdf"
+        for num in range(config.first_efta, config.first_efta + config.total_files)
+    ]
+    downloader = Downloader(out, concurrent=concurrent, engine=engine, quiet=True, layout="flat")
+    pdf_dir = out / f"dataset{n}-pdfs"
+    stats: dict = {}
+    with _muted(), _measure(stats):
+        downloader.download_pdf_list(urls, pdf_dir)
+    files = sum(1 for p in pdf_dir.glob("*.pdf") if p.stat().st_size == config.pdf_size)
+    return BenchResult(
+        f"download ({engine}, c={concurrent})", files=files, bytes=files * config.pdf_size, **stats,
+    )
+
+
+def bench_rpc(base_url: str, config: MockSiteConfig, workdir: Path) -> List[BenchResult]:
+    """
+    Queue every mock PDF on a ``FakeAria2Server`` and check the RPC path end to end.
+
+    Covers ``addUri`` / ``tellStatus`` on the raw client (including a wrong
+    secret) and the downloader's queue-then-``wait_all`` mode; raises
+    RuntimeError if any of them misbehaves.
+    """
+    from .aria2rpc import Aria2RPCClient, Aria2RPCError
+    from .downloader import Downloader
+
+    out = Path(tempfile.mkdtemp(dir=workdir))
+    n = config.dataset_num
+    urls = [
+        f"{base_url}/epstein/files/DataSet%20{n}/EFTA{num:08d}.pdf"
+        for num in range(config.first_efta, config.first_efta + config.total_files)
+    ]
+    pdf_dir = out / f"dataset{n}-pdfs"
+
+    with FakeAria2Server() as fake:
+        client = fake.client
+        gid = client.add_uri([urls[0]], {"dir": str(out / "probe"), "out": "one.pdf"})
+        if client.wait([gid], poll_interval=0.05, quiet=True) != {gid: "complete"}:
+            raise RuntimeError(f"fake aria2: {gid} did not complete: {client.call('aria2.tellStatus', gid)}")
+        try:
+            Aria2RPCClient(fake.url, "wrong-secret").get_version()
+            raise RuntimeError("fake aria2 accepted a wrong RPC secret")
+        except Aria2RPCError:
+            pass
+
+        downloader = Downloader(out, rpc=client, wait=False, quiet=True, layout="flat")
+        stats: dict = {}
+        with _muted(), _measure(stats):
+            queued = downloader.download_pdf_list(urls, pdf_dir)
+            done = downloader.wait_all()
+        files = sum(1 for p in pdf_dir.glob("*.pdf") if p.stat().st_size == config.pdf_size)
+        if not (queued and done) or files != len(urls):
+            raise RuntimeError(f"aria2 RPC path: {files}/{len(urls)} PDFs (queued={queued}, wait_all={done})")
+    return [BenchResult("download (aria2 rpc, fake daemon)", files=files, bytes=files * config.pdf_size, **stats)]
+
+
+def bench_index(config: MockSiteConfig, workdir: Path, backend: str) -> List[BenchResult]:
+    """Time adding, reloading and looking up ``total_files`` entries in one index backend."""
+    from .index_store import open_index_store
+
+    out = Path(tempfile.mkdtemp(dir=workdir))
+    n = config.dataset_num
+    names = [f"EFTA{num:08d}.pdf" for num in range(config.first_efta, config.first_efta + config.total_files)]
+    base = f"https://www.justice.gov/epstein/files/DataSet%20{n}/"
+    # The scraper stores unquoted URLs; get_pdf_url (the enumerator) quotes the space
+    scraped_base = base.replace("%20", " ")
+    # A non-canonical entry, which compact backends keep verbatim
+    odd_name, odd_url = "attachment-1.pdf", "https://mirror.example/attachment-1.pdf"
+    results = []
+
+    stats: dict = {}
+    with _muted(), _measure(stats):
+        store = open_index_store(out, n, backend)
+        for i, name in enumerate(names):
+            store.add(name, (scraped_base if i % 2 else base) + name)
+        store.add(odd_name, odd_url)
+        store.commit()
+        store.close()
+    results.append(BenchResult(f"index add+commit ({backend})", files=len(names), **stats))
+
+    # Look up the odd entry first on a freshly opened store, before anything else loads it
+    store = open_index_store(out, n, backend)
+    if odd_name not in store or store.get(odd_name) != odd_url or store.add(odd_name, odd_url):
+        raise RuntimeError(f"{backend} index lost {odd_name} after reopening")
+    if backend == "efta" and len(store.numbers()) != len(names):
+        raise RuntimeError(f"efta index kept {len(names) - len(store.numbers())} quoted/unquoted URLs as exceptions")
+    store.close()
+
+    stats = {}
+    with _muted(), _measure(stats):
+        store = open_index_store(out, n, backend)
+        count = store.count() - 1
+    results.append(BenchResult(f"index load ({backend})", files=count, **stats))
+
+    stats = {}
+    with _muted(), _measure(stats):
+        found = sum(1 for name in names if name in store)
+    store.close()
+    results.append(BenchResult(f"index lookup ({backend})", files=found, **stats))
+    return results
+
+
+def run_benchmarks(
+    config: MockSiteConfig,
+    suites: Iterable[str] = SUITES,
+    engine: str = "native",
+    concurrency: int = 8,
+    workdir: Optional[Path] = None,
+) -> List[BenchResult]:
+    """
+    Run the selected benchmark suites against a fresh mock server.
+
+    Args:
+        config: Mock site shape and failure behaviour
+        suites: Any of ``scrape``, ``download``, ``index``, ``rpc``
+        engine: Download engine for the download suite
+        concurrency: Listing pages / downloads in flight
+        workdir: Scratch directory (default: a temporary one, removed afterwards)
+
+    Returns:
+        One result per benchmark
+    """
+    from .index_store import BACKENDS
+
+    scratch = Path(tempfile.mkdtemp(prefix="epstein-bench-", dir=workdir))
+    results: List[BenchResult] = []
+    try:
+        with MockDojServer(config) as server:
+            if "scrape" in suites:
+                console.print("[dim]Benchmarking scrape_pages...[/dim]")
+                results.append(bench_scrape(server.base_url, config, scratch))
+                results.append(bench_scrape(server.base_url, config, scratch, concurrency=concurrency))
+            if "download" in suites:
+                console.print("[dim]Benchmarking download_pdf_list...[/dim]")
+                results.append(bench_download(server.base_url, config, scratch, engine, concurrency))
+            if "rpc" in suites:
+                console.print("[dim]Checking the aria2 RPC path against a fake daemon...[/dim]")
+                results.extend(bench_rpc(server.base_url, config, scratch))
+        if "index" in suites:
+            console.print("[dim]Benchmarking index operations...[/dim]")
+            for backend in BACKENDS:
+                results.extend(bench_index(config, scratch, backend))
+    finally:
+        shutil.rmtree(scratch, ignore_errors=True)
+    return results
+
+
+def results_table(results: List[BenchResult]) -> Table:
+    """Render results as a table."""
+    table = Table(title="Benchmarks")
+    table.add_column("Benchmark", style="cyan")
+    table.add_column("Time", justify="right")
+    table.add_column("Pages/s", justify="right")
+    table.add_column("Files/s", justify="right")
+    table.add_column("MB/s", justify="right")
+    table.add_column("Peak RSS", justify="right")
+    for r in results:
+        table.add_row(
+            r.name,
+            f"{r.seconds:.2f}s",
+            *(f"{r.rates[k]:,.1f}" if k in r.rates else "-" for k in ("pages/s", "files/s", "MB/s")),
+            f"{r.peak_rss / (1024 * 1024):.0f} MB" if r.peak_rss else "-",
+        )
+    return table
+
+
+def save_results(path: Path, results: List[BenchResult], config: MockSiteConfig) -> None:
+    """Write results as JSON (usable later as a ``compare_results`` baseline)."""
+    data = {"config": asdict(config), "results": [asdict(r) for r in results]}
+    Path(path).write_text(json.dumps(data, indent=2))
+
+
+def compare_results(results: List[BenchResult], baseline_path: Path, tolerance: float = 0.2) -> List[str]:
+    """
+    Compare rates with a saved baseline.
+
+    Args:
+        results: Fresh results
+        baseline_path: JSON written by ``save_results``
+        tolerance: Allowed fractional slowdown before a rate counts as a regression
+
+    Returns:
+        One description per regressed rate (empty if none)
+    """
+    with open(baseline_path) as f:
+        baseline = {r["name"]: r["rates"] for r in json.load(f)["results"]}
+
+    regressions = []
+    for r in results:
+        for key, rate in r.rates.items():
+            old = baseline.get(r.name, {}).get(key)
+            if old and rate < old * (1 - tolerance):
+                regressions.append(f"{r.name}: {key} {rate:,.1f} vs {old:,.1f} ({rate / old - 1:+.0%})")
+    return regressions
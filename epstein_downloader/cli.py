@@ -1,16 +1,43 @@
 """Command-line interface for the Epstein Files Downloader."""
 
 import sys
+import zipfile
+from contextlib import ExitStack
+from datetime import datetime
 from pathlib import Path
+from typing import List, Optional
 
 import click
 from rich.console import Console
 from rich.table import Table
 
 from . import __version__
-from .config import DATASETS, get_zip_url
+from .adaptive import AdaptiveController
+from .archives import complete_archives, extract_archive, extract_dir
+from .aria2rpc import Aria2Daemon
+from .benchmark import SUITES as BENCH_SUITES
+from .benchmark import MockSiteConfig, compare_results, results_table, run_benchmarks, save_results, serve_forever
+from .config import DATASETS, DOJ_BASE_URL, LISTING_DATASETS, get_zip_url
+from .delta_sync import DEFAULT_STOP_AFTER, DeltaSync
 from .downloader import Downloader, check_aria2c, get_aria2c_install_instructions
+from .efta_bitmap import format_intervals
+from .enumerator import EftaEnumerator
+from .index_store import BACKENDS as INDEX_BACKENDS
+from .index_store import detect_backend as detect_index_backend
+from .index_store import migrate_index
+from .layout import LAYOUTS as PDF_LAYOUTS, migrate_to_sharded
+from .leases import BACKENDS as LEASE_BACKENDS
+from .leases import DONE, FAILED, FREE, LEASED, ShardWorker, merge_partials, open_lease_store
+from .listing_cache import ListingCache
+from .manifest import Manifest, pdf_location
+from .metrics import open_event_log, start_metrics_server
+from .partition import PageRangeScraper
+from .pipeline import ScrapeDownloadPipeline
+from .scheduler import TORRENT_HOST, Job, JobScheduler
 from .scraper import DatasetScraper
+from .validate import QUARANTINE_SUFFIX, ValidationResult, quarantine, validate_pdfs
+from .verify import CACHE_FILENAME as VERIFY_CACHE_FILENAME
+from .verify import VerifyCache, check_hashes, find_archives, hash_files
 
 console = Console()
 
@@ -28,9 +55,18 @@ def print_banner():
 
 @click.group()
 @click.version_option(version=__version__)
-def main():
+@click.option("--metrics-port", default=None, type=int, help="Serve Prometheus metrics on this port while running")
+@click.option("--metrics-host", default="127.0.0.1", help="Address for the metrics endpoint")
+@click.option("--events", "events_file", default=None, type=click.Path(dir_okay=False),
+              help="Append a JSON-lines event log (pages, retries, downloads) to this file")
+@click.pass_context
+def main(ctx, metrics_port, metrics_host, events_file):
     """Epstein Files Downloader - Archive DOJ Epstein documents."""
-    pass
+    if metrics_port is not None:
+        server = start_metrics_server(metrics_port, metrics_host)
+        ctx.call_on_close(server.shutdown)
+    if events_file:
+        ctx.call_on_close(open_event_log(Path(events_file)).close)
 
 
 @main.command()
@@ -72,255 +108,476 @@ def list():
     console.print("[dim]Use torrents or PDF scraping to download these.[/dim]")
 
 
+def _legacy_dataset_flags(func):
+    """Add the hidden pre-``--dataset`` flags ``--scrape-dataset1`` ... ``--scrape-datasetN``."""
+    for ds_num in reversed(LISTING_DATASETS):
+        func = click.option(
+            f"--scrape-dataset{ds_num}", f"scrape_dataset{ds_num}", is_flag=True, hidden=True,
+            help=f"Scrape and download Dataset {ds_num} PDFs (same as --dataset {ds_num})",
+        )(func)
+    return func
+
+
 @main.command()
 @click.option("--output", "-o", default=".", help="Output directory")
 @click.option("--all", "download_all", is_flag=True, help="Download everything")
 @click.option("--torrents", is_flag=True, help="Download available torrents")
 @click.option("--zips", is_flag=True, help="Download available ZIPs")
-@click.option("--scrape-dataset1", is_flag=True, help="Scrape and download Dataset 1 PDFs")
-@click.option("--scrape-dataset2", is_flag=True, help="Scrape and download Dataset 2 PDFs")
-@click.option("--scrape-dataset3", is_flag=True, help="Scrape and download Dataset 3 PDFs")
-@click.option("--scrape-dataset4", is_flag=True, help="Scrape and download Dataset 4 PDFs")
-@click.option("--scrape-dataset5", is_flag=True, help="Scrape and download Dataset 5 PDFs")
-@click.option("--scrape-dataset6", is_flag=True, help="Scrape and download Dataset 6 PDFs")
-@click.option("--scrape-dataset7", is_flag=True, help="Scrape and download Dataset 7 PDFs")
-@click.option("--scrape-dataset8", is_flag=True, help="Scrape and download Dataset 8 PDFs")
-@click.option("--scrape-dataset9", is_flag=True, help="Scrape and download Dataset 9 PDFs")
-@click.option("--scrape-dataset10", is_flag=True, help="Scrape and download Dataset 10 PDFs")
-@click.option("--scrape-dataset11", is_flag=True, help="Scrape and download Dataset 11 PDFs")
-@click.option("--scrape-dataset12", is_flag=True, help="Scrape and download Dataset 12 PDFs")
-@click.option("--scrape-dataset13", is_flag=True, help="Scrape and download Dataset 13 PDFs")
+@click.option("--dataset", "-d", "datasets", type=click.IntRange(min(LISTING_DATASETS), max(LISTING_DATASETS)),
+              multiple=True, help="Scrape and download this dataset's PDFs (repeatable)")
+@_legacy_dataset_flags
 @click.option("--start-page", default=0, help="Start page for scraping")
 @click.option("--max-pages", default=None, type=int, help="Max pages to scrape")
 @click.option("--concurrent", "-c", default=5, help="Concurrent downloads for PDFs")
-def download(output, download_all, torrents, zips, scrape_dataset1, scrape_dataset2, scrape_dataset3, scrape_dataset4, scrape_dataset5, scrape_dataset6, scrape_dataset7, scrape_dataset8, scrape_dataset9, scrape_dataset10, scrape_dataset11, scrape_dataset12, scrape_dataset13, 
-             start_page, max_pages, concurrent):
+@click.option("--jobs", "-j", default=1, help="Torrent/ZIP/dataset jobs run at the same time")
+@click.option("--per-host", default=2, help="Max concurrent jobs against the DOJ site when --jobs > 1")
+@click.option("--scrape-concurrency", default=1, help="Listing pages fetched in parallel (>1 uses asyncio)")
+@click.option("--rate-limit", default=None, type=float, help="Max listing requests per second when scraping concurrently")
+@click.option("--partition", is_flag=True, help="Find the page count first, then scrape page chunks in parallel")
+@click.option("--pipeline", is_flag=True, help="Download PDFs while scraping instead of after")
+@click.option("--rpc", "use_rpc", is_flag=True, help="Run all jobs on one shared aria2c RPC daemon")
+@click.option("--engine", type=click.Choice(["auto", "aria2c", "native"]), default="auto",
+              help="Download engine (auto = aria2c if installed, else built-in)")
+@click.option("--index-backend", type=click.Choice(["auto", *INDEX_BACKENDS]), default="auto",
+              help="Index storage (auto = keep existing format; others migrate it)")
+@click.option("--listing-cache", is_flag=True, help="Re-fetch listing pages conditionally (ETag/Last-Modified)")
+@click.option("--cache-max-mb", default=256, help="Size cap for the listing cache in MB")
+@click.option("--no-zip-skip", is_flag=True, help="Download PDFs even if they are already inside a downloaded ZIP")
+@click.option("--extract-zipped", is_flag=True, help="Extract indexed PDFs from the dataset ZIP instead of downloading them")
+@click.option("--layout", type=click.Choice(["auto", *PDF_LAYOUTS]), default="auto",
+              help="PDF directory layout (auto = keep the existing one; sharded = EFTA0123/EFTA01234567.pdf)")
+@click.option("--adaptive", is_flag=True,
+              help="Adapt listing/PDF concurrency to server feedback (AIMD; honours Retry-After)")
+@click.option("--max-concurrency", default=32, help="Ceiling for --adaptive concurrency")
+@click.option("--extract", "extract_zips", is_flag=True, help="Extract each dataset ZIP after it downloads")
+@click.option("--extract-workers", default=None, type=int, help="Extraction processes (default: CPU count)")
+@click.option("--pdf-chunk", default=1000, help="PDFs per download batch (outcomes are recorded per file)")
+def download(output, download_all, torrents, zips, datasets, start_page, max_pages, concurrent, jobs, per_host,
+             scrape_concurrency, rate_limit, partition, pipeline, use_rpc, engine, index_backend,
+             listing_cache, cache_max_mb, no_zip_skip, extract_zipped, layout, adaptive, max_concurrency,
+             extract_zips, extract_workers, pdf_chunk, **legacy_flags):
     """Download datasets."""
     print_banner()
 
-    if not check_aria2c():
-        console.print("[red]ERROR: aria2c is required but not found![/red]")
-        console.print(get_aria2c_install_instructions())
-        sys.exit(1)
-
-    output_dir = Path(output).resolve()
-    console.print(f"[bold]Output directory:[/bold] {output_dir}\n")
+    selected = set(datasets)
+    selected.update(n for n in LISTING_DATASETS if legacy_flags.get(f"scrape_dataset{n}"))
+    if download_all:
+        selected.update(LISTING_DATASETS)
 
-    downloader = Downloader(output_dir, concurrent=concurrent)
-
-    if download_all or torrents:
-        console.print("\n[bold cyan]=== TORRENTS ===[/bold cyan]")
-        downloader.download_all_torrents()
-
-    if download_all or zips:
-        console.print("\n[bold cyan]=== ZIP FILES ===[/bold cyan]")
-        downloader.download_all_zips()
-
-    if download_all or scrape_dataset1:
-        console.print("\n[bold cyan]=== DATASET 1 PDF SCRAPING ===[/bold cyan]")
-        scraper = DatasetScraper(output_dir, 1)
-        new_urls = scraper.scrape_pages(start_page=start_page, max_pages=max_pages)
-        if new_urls:
-            console.print(f"\n[yellow]Downloading {len(new_urls)} new PDFs...[/yellow]")
-            pdf_dir = output_dir / "dataset1-pdfs"
-            downloader.download_pdf_list(new_urls, pdf_dir)
-
-    if download_all or scrape_dataset2:
-        console.print("\n[bold cyan]=== DATASET 2 PDF SCRAPING ===[/bold cyan]")
-        scraper = DatasetScraper(output_dir, 2)
-        new_urls = scraper.scrape_pages(start_page=start_page, max_pages=max_pages)
-        if new_urls:
-            console.print(f"\n[yellow]Downloading {len(new_urls)} new PDFs...[/yellow]")
-            pdf_dir = output_dir / "dataset2-pdfs"
-            downloader.download_pdf_list(new_urls, pdf_dir)
-
-    if download_all or scrape_dataset3:
-        console.print("\n[bold cyan]=== DATASET 3 PDF SCRAPING ===[/bold cyan]")
-        scraper = DatasetScraper(output_dir, 3)
-        new_urls = scraper.scrape_pages(start_page=start_page, max_pages=max_pages)
-        if new_urls:
-            console.print(f"\n[yellow]Downloading {len(new_urls)} new PDFs...[/yellow]")
-            pdf_dir = output_dir / "dataset3-pdfs"
-            downloader.download_pdf_list(new_urls, pdf_dir)
-
-    if download_all or scrape_dataset4:
-        console.print("\n[bold cyan]=== DATASET 4 PDF SCRAPING ===[/bold cyan]")
-        scraper = DatasetScraper(output_dir, 4)
-        new_urls = scraper.scrape_pages(start_page=start_page, max_pages=max_pages)
-        if new_urls:
-            console.print(f"\n[yellow]Downloading {len(new_urls)} new PDFs...[/yellow]")
-            pdf_dir = output_dir / "dataset4-pdfs"
-            downloader.download_pdf_list(new_urls, pdf_dir)
-
-    if download_all or scrape_dataset5:
-        console.print("\n[bold cyan]=== DATASET 5 PDF SCRAPING ===[/bold cyan]")
-        scraper = DatasetScraper(output_dir, 5)
-        new_urls = scraper.scrape_pages(start_page=start_page, max_pages=max_pages)
-        if new_urls:
-            console.print(f"\n[yellow]Downloading {len(new_urls)} new PDFs...[/yellow]")
-            pdf_dir = output_dir / "dataset5-pdfs"
-            downloader.download_pdf_list(new_urls, pdf_dir)
-
-    if download_all or scrape_dataset6:
-        console.print("\n[bold cyan]=== DATASET 6 PDF SCRAPING ===[/bold cyan]")
-        scraper = DatasetScraper(output_dir, 6)
-        new_urls = scraper.scrape_pages(start_page=start_page, max_pages=max_pages)
-        if new_urls:
-            console.print(f"\n[yellow]Downloading {len(new_urls)} new PDFs...[/yellow]")
-            pdf_dir = output_dir / "dataset6-pdfs"
-            downloader.download_pdf_list(new_urls, pdf_dir)
-
-    if download_all or scrape_dataset7:
-        console.print("\n[bold cyan]=== DATASET 7 PDF SCRAPING ===[/bold cyan]")
-        scraper = DatasetScraper(output_dir, 7)
-        new_urls = scraper.scrape_pages(start_page=start_page, max_pages=max_pages)
-        if new_urls:
-            console.print(f"\n[yellow]Downloading {len(new_urls)} new PDFs...[/yellow]")
-            pdf_dir = output_dir / "dataset7-pdfs"
-            downloader.download_pdf_list(new_urls, pdf_dir)
-
-    if download_all or scrape_dataset8:
-        console.print("\n[bold cyan]=== DATASET 8 PDF SCRAPING ===[/bold cyan]")
-        scraper = DatasetScraper(output_dir, 8)
-        new_urls = scraper.scrape_pages(start_page=start_page, max_pages=max_pages)
-        if new_urls:
-            console.print(f"\n[yellow]Downloading {len(new_urls)} new PDFs...[/yellow]")
-            pdf_dir = output_dir / "dataset8-pdfs"
-            downloader.download_pdf_list(new_urls, pdf_dir)
-
-    if download_all or scrape_dataset9:
-        console.print("\n[bold cyan]=== DATASET 9 PDF SCRAPING ===[/bold cyan]")
-        scraper = DatasetScraper(output_dir, 9)
-        new_urls = scraper.scrape_pages(start_page=start_page, max_pages=max_pages)
-        if new_urls:
-            console.print(f"\n[yellow]Downloading {len(new_urls)} new PDFs...[/yellow]")
-            pdf_dir = output_dir / "dataset9-pdfs"
-            downloader.download_pdf_list(new_urls, pdf_dir)
-
-    if download_all or scrape_dataset10:
-        console.print("\n[bold cyan]=== DATASET 10 PDF SCRAPING ===[/bold cyan]")
-        scraper = DatasetScraper(output_dir, 10)
-        new_urls = scraper.scrape_pages(start_page=start_page, max_pages=max_pages)
-        if new_urls:
-            console.print(f"\n[yellow]Downloading {len(new_urls)} new PDFs...[/yellow]")
-            pdf_dir = output_dir / "dataset10-pdfs"
-            downloader.download_pdf_list(new_urls, pdf_dir)
-
-    if download_all or scrape_dataset11:
-        console.print("\n[bold cyan]=== DATASET 11 PDF SCRAPING ===[/bold cyan]")
-        scraper = DatasetScraper(output_dir, 11)
-        new_urls = scraper.scrape_pages(start_page=start_page, max_pages=max_pages)
-        if new_urls:
-            console.print(f"\n[yellow]Downloading {len(new_urls)} new PDFs...[/yellow]")
-            pdf_dir = output_dir / "dataset11-pdfs"
-            downloader.download_pdf_list(new_urls, pdf_dir)
-
-    if download_all or scrape_dataset12:
-        console.print("\n[bold cyan]=== DATASET 12 PDF SCRAPING ===[/bold cyan]")
-        scraper = DatasetScraper(output_dir, 12)
-        new_urls = scraper.scrape_pages(start_page=start_page, max_pages=max_pages)
-        if new_urls:
-            console.print(f"\n[yellow]Downloading {len(new_urls)} new PDFs...[/yellow]")
-            pdf_dir = output_dir / "dataset12-pdfs"
-            downloader.download_pdf_list(new_urls, pdf_dir)
-
-    if download_all or scrape_dataset13:
-        console.print("\n[bold cyan]=== DATASET 13 PDF SCRAPING ===[/bold cyan]")
-        scraper = DatasetScraper(output_dir, 13)
-        new_urls = scraper.scrape_pages(start_page=start_page, max_pages=max_pages)
-        if new_urls:
-            console.print(f"\n[yellow]Downloading {len(new_urls)} new PDFs...[/yellow]")
-            pdf_dir = output_dir / "dataset13-pdfs"
-            downloader.download_pdf_list(new_urls, pdf_dir)
-
-    if not any([download_all, torrents, zips, scrape_dataset1, scrape_dataset2, scrape_dataset3, scrape_dataset4, scrape_dataset5, scrape_dataset6, scrape_dataset7, scrape_dataset8, scrape_dataset9, scrape_dataset10, scrape_dataset11, scrape_dataset12, scrape_dataset13]):
+    if not (download_all or torrents or zips or selected):
         console.print("[yellow]No download option specified. Use --help to see options.[/yellow]")
         console.print("\nQuick start:")
         console.print("  epstein-dl download --all        # Download everything")
         console.print("  epstein-dl download --torrents   # Just torrents (fastest)")
         console.print("  epstein-dl download --zips       # Just ZIP files")
+        console.print("  epstein-dl download -d 9 -d 10   # Scrape and download Datasets 9 and 10")
+        return
+
+    engine = _resolve_engine(engine, need_aria2c=use_rpc)
+
+    output_dir = Path(output).resolve()
+    console.print(f"[bold]Output directory:[/bold] {output_dir}\n")
+
+    scrape_kwargs = dict(
+        start_page=start_page,
+        max_pages=max_pages,
+        concurrency=scrape_concurrency,
+        rate_limit=rate_limit,
+        partition=partition,
+    )
+    zip_kwargs = dict(skip_zipped=not no_zip_skip, extract_zipped=extract_zipped)
+    parallel = jobs > 1
+
+    with ExitStack() as stack:
+        rpc = None
+        cache = None
+        if listing_cache:
+            cache = ListingCache(output_dir / "listing-cache.sqlite", max_bytes=cache_max_mb * 1024 * 1024)
+            stack.callback(cache.close)
+        if use_rpc:
+            rpc = stack.enter_context(Aria2Daemon(output_dir, max_concurrent=concurrent))
+        # With a daemon, sequential runs only queue jobs here and await them
+        # together below; scheduled jobs wait for their own downloads so the
+        # job table reflects real completion.
+        if adaptive and engine != "native":
+            console.print("[dim]--adaptive sizes listing requests and native-engine downloads; "
+                          "aria2c keeps its fixed -c[/dim]")
+        # One controller for justice.gov, shared by scraping and PDF downloads
+        controller = AdaptiveController(initial=concurrent, maximum=max_concurrency) if adaptive else None
+        downloader = Downloader(
+            output_dir, concurrent=concurrent, rpc=rpc, wait=parallel or not use_rpc,
+            engine=engine, quiet=parallel, layout=layout, controller=controller, pdf_chunk=pdf_chunk,
+        )
+
+        if parallel:
+            scheduler = JobScheduler(max_workers=jobs, host_limit=per_host)
+            _schedule_downloads(
+                scheduler, output_dir, downloader, download_all or torrents, download_all or zips,
+                sorted(selected), pipeline, index_backend, cache, scrape_kwargs, zip_kwargs,
+                extract_kwargs=dict(workers=extract_workers) if extract_zips else None,
+            )
+            results = scheduler.run()
+            failed = [name for name, ok in results.items() if not ok]
+            console.print(f"\n[green]{len(results) - len(failed)}/{len(results)} jobs succeeded[/green]")
+            if failed:
+                console.print(f"[red]Failed: {', '.join(failed)}[/red]")
+            return
+
+        if download_all or torrents:
+            console.print("\n[bold cyan]=== TORRENTS ===[/bold cyan]")
+            downloader.download_all_torrents()
+
+        zip_results = {}
+        if download_all or zips:
+            console.print("\n[bold cyan]=== ZIP FILES ===[/bold cyan]")
+            zip_results = downloader.download_all_zips()
+
+        for ds_num in sorted(selected):
+            _scrape_and_download(
+                output_dir,
+                downloader,
+                ds_num,
+                pipeline=pipeline,
+                index_backend=index_backend,
+                cache=cache,
+                **zip_kwargs,
+                **scrape_kwargs,
+            )
+
+        downloader.wait_all()
+
+        if extract_zips:
+            for num, ok in zip_results.items():
+                if ok:
+                    _extract_zip(output_dir, num, workers=extract_workers)
+
+
+def _extract_zip(output_dir: Path, dataset_num: int, workers: Optional[int] = None, quiet: bool = False) -> bool:
+    """Extract a dataset's downloaded ZIP into ``extracted/DataSet{N}``."""
+    archives = complete_archives(output_dir, dataset_num)
+    if not archives:
+        console.print(f"[red]Dataset {dataset_num}: no complete ZIP to extract[/red]")
+        return False
+
+    dest = extract_dir(output_dir, dataset_num)
+    if not quiet:
+        console.print(f"[yellow]Extracting {archives[0].name} -> {dest}[/yellow]")
+    try:
+        result = extract_archive(archives[0], dest, workers=workers, quiet=quiet)
+    except (zipfile.BadZipFile, OSError) as e:
+        console.print(f"[red]Cannot extract {archives[0].name}: {e}[/red]")
+        return False
+    if not quiet:
+        console.print(
+            f"[green]Dataset {dataset_num}: {result.extracted} extracted, "
+            f"{result.skipped} already up to date[/green]"
+        )
+    if result.failed:
+        console.print(f"[red]Dataset {dataset_num}: {len(result.failed)} members failed extraction[/red]")
+        return False
+    return True
+
+
+def _schedule_downloads(
+    scheduler: JobScheduler,
+    output_dir: Path,
+    downloader: Downloader,
+    torrents: bool,
+    zips: bool,
+    datasets: List[int],
+    pipeline: bool,
+    index_backend: str,
+    cache: Optional[ListingCache],
+    scrape_kwargs: dict,
+    zip_kwargs: dict,
+    extract_kwargs: Optional[dict] = None,
+) -> None:
+    """
+    Queue one scheduler job per torrent, ZIP and dataset PDF scrape.
+
+    A dataset's PDF job waits for its ZIP job so PDFs inside the ZIP can be
+    skipped rather than downloaded twice. With ``extract_kwargs`` each ZIP job
+    also extracts its archive once the download succeeds.
+    """
+    def _zip_job(job: Job, num: int) -> bool:
+        if not downloader.download_zip(num):
+            return False
+        if extract_kwargs is None:
+            return True
+        job.detail = "extracting"
+        return _extract_zip(output_dir, num, quiet=True, **extract_kwargs)
+
+    zip_jobs = {}
+    if torrents:
+        for num, dataset in DATASETS.items():
+            if dataset.magnet:
+                scheduler.add(
+                    f"torrent {num}",
+                    lambda job, num=num, magnet=dataset.magnet: downloader.download_torrent(
+                        magnet, f"DataSet{num}", dataset_num=num,
+                    ),
+                    host=TORRENT_HOST,
+                )
+
+    if zips:
+        for num, dataset in DATASETS.items():
+            if dataset.zip_available:
+                zip_jobs[num] = scheduler.add(f"zip {num}", lambda job, num=num: _zip_job(job, num))
+
+    for ds_num in datasets:
+        after = [zip_jobs[ds_num]] if ds_num in zip_jobs and zip_kwargs["skip_zipped"] else []
+        scheduler.add(
+            f"pdfs {ds_num}",
+            lambda job, ds_num=ds_num: _scrape_and_download(
+                output_dir, downloader, ds_num, pipeline=pipeline, index_backend=index_backend,
+                cache=cache, job=job, **zip_kwargs, **scrape_kwargs,
+            ),
+            after=after,
+        )
+
+
+def _resolve_engine(engine: str, need_aria2c: bool = False) -> str:
+    """Pick the download engine, exiting if aria2c is required but missing."""
+    if engine == "auto":
+        engine = "aria2c" if check_aria2c() else "native"
+        if engine == "native" and not need_aria2c:
+            console.print("[yellow]aria2c not found, using built-in downloader (torrents unavailable)[/yellow]")
+
+    if (engine == "aria2c" or need_aria2c) and not check_aria2c():
+        console.print("[red]ERROR: aria2c is required but not found![/red]")
+        console.print(get_aria2c_install_instructions())
+        sys.exit(1)
+    return engine
+
+
+def _scrape_and_download(
+    output_dir: Path,
+    downloader: Downloader,
+    ds_num: int,
+    pipeline: bool = False,
+    index_backend: str = "auto",
+    cache: Optional[ListingCache] = None,
+    job: Optional[Job] = None,
+    skip_zipped: bool = True,
+    extract_zipped: bool = False,
+    **scrape_kwargs,
+) -> bool:
+    """
+    Scrape one dataset's listing pages and download the new PDFs.
+
+    PDFs already inside the dataset's downloaded ZIP are skipped unless
+    ``skip_zipped`` is off; ``extract_zipped`` copies them out of the ZIP
+    instead. When run as a scheduler ``job``, console output is suppressed
+    and the job's detail line tracks progress instead.
+    """
+    quiet = job is not None
+    if not quiet:
+        console.print(f"\n[bold cyan]=== DATASET {ds_num} PDF SCRAPING ===[/bold cyan]")
+    scraper = DatasetScraper(
+        output_dir, ds_num, index_backend=index_backend, cache=cache, quiet=quiet,
+        layout=downloader.layout, skip_zipped=skip_zipped, controller=downloader.controller,
+    )
+    pdf_dir = output_dir / f"dataset{ds_num}-pdfs"
+
+    ok = _fetch_new_pdfs(scraper, downloader, pdf_dir, pipeline, job, scrape_kwargs)
+    if extract_zipped:
+        extracted = scraper.extract_zipped()
+        if job is not None:
+            job.detail += f", {extracted} extracted from ZIP"
+        elif extracted:
+            console.print(f"[green]Extracted {extracted} PDFs from ZIP[/green]")
+    return ok
+
+
+def _fetch_new_pdfs(
+    scraper: DatasetScraper,
+    downloader: Downloader,
+    pdf_dir: Path,
+    pipeline: bool,
+    job: Optional[Job],
+    scrape_kwargs: dict,
+) -> bool:
+    """Scrape, then download (or stream through the pipeline) the new URLs."""
+    if pipeline:
+        if job is not None:
+            job.detail = "scraping + downloading"
+        runner = ScrapeDownloadPipeline(scraper, downloader, pdf_dir)
+        new_count = runner.run(**scrape_kwargs)
+        if job is not None:
+            job.detail = f"{new_count} new, {runner.submitted} submitted, {runner.failed_batches} failed batches"
+        return runner.failed_batches == 0
+
+    if job is not None:
+        found = [0]
+
+        def on_new_urls(urls: List[str]) -> None:
+            found[0] += len(urls)
+            job.detail = f"scraping, {found[0]} new files"
+
+        scrape_kwargs = {**scrape_kwargs, "on_new_urls": on_new_urls}
+        job.detail = "scraping"
+
+    new_urls = scraper.scrape_pages(**scrape_kwargs)
+    if not new_urls:
+        if job is not None:
+            job.detail = "no new files"
+        return True
+    if job is not None:
+        job.detail = f"downloading {len(new_urls)} PDFs"
+    else:
+        console.print(f"\n[yellow]Downloading {len(new_urls)} new PDFs...[/yellow]")
+    ok = downloader.download_pdf_list(new_urls, pdf_dir)
+    if job is not None:
+        job.detail = f"{len(new_urls)} PDFs {'downloaded' if ok else 'with failures'}"
+    return ok
 
 
 @main.command()
 @click.option("--output", "-o", default=".", help="Output directory to check")
-def status(output):
+@click.option("--rescan", is_flag=True, help="Rebuild the download manifest from disk first")
+@click.option("--workers", default=16, help="Directories scanned in parallel by --rescan")
+def status(output, rescan, workers):
     """Check download status."""
     print_banner()
 
     output_dir = Path(output).resolve()
+    manifest = Manifest(output_dir)
+
+    if rescan or not manifest.exists():
+        console.print("[dim]Scanning output directory to build the manifest...[/dim]")
+        data = manifest.rescan(workers=workers)
+    else:
+        data = manifest.load()
+    locations = data["locations"]
 
     table = Table(title=f"Download Status: {output_dir}")
     table.add_column("Location", style="cyan")
     table.add_column("Files", justify="right")
     table.add_column("Size", justify="right")
 
-    # Check torrents directory
-    torrents_dir = output_dir / "torrents"
-    if torrents_dir.exists():
-        files = [f for f in torrents_dir.rglob("*")]
-        file_count = len([f for f in files if f.is_file()])
-        total_size = sum(f.stat().st_size for f in files if f.is_file())
-        table.add_row("torrents/", str(file_count), f"{total_size / (1024**3):.2f} GB")
-    else:
-        table.add_row("torrents/", "0", "0 GB")
-
-    # Check zips directory
-    zips_dir = output_dir / "zips"
-    if zips_dir.exists():
-        files = [f for f in zips_dir.glob("*.zip")]
-        file_count = len(files)
-        total_size = sum(f.stat().st_size for f in files)
-        table.add_row("zips/", str(file_count), f"{total_size / (1024**3):.2f} GB")
-    else:
-        table.add_row("zips/", "0", "0 GB")
-
-    # Check PDF directories
-    for ds_num in [1, 2, 3, 4, 5, 6, 7, 8, 9, 10, 11, 12, 13]:
-        pdf_dir = output_dir / f"dataset{ds_num}-pdfs"
-        if pdf_dir.exists():
-            files = [f for f in pdf_dir.glob("*.pdf")]
-            file_count = len(files)
-            total_size = sum(f.stat().st_size for f in files)
-            table.add_row(f"dataset{ds_num}-pdfs/", str(file_count), f"{total_size / (1024**3):.2f} GB")
-        else:
-            table.add_row(f"dataset{ds_num}-pdfs/", "0", "0 GB")
+    for location in ["torrents", "zips", *(pdf_location(n) for n in LISTING_DATASETS)]:
+        loc = locations.get(location, {"files": 0, "bytes": 0})
+        table.add_row(f"{location}/", str(loc["files"]), f"{loc['bytes'] / (1024**3):.2f} GB")
 
     console.print(table)
 
-    # Check for index files
+    # Scrape progress as last recorded by the scrapers
     console.print("\n[bold]Scrape Progress:[/bold]")
-    for ds_num in [1, 2, 3, 4, 5, 6, 7, 8, 9, 10, 11, 12, 13]:
-        index_file = output_dir / f"dataset{ds_num}-index.json"
-        if index_file.exists():
-            import json
-            with open(index_file) as f:
-                index = json.load(f)
-            file_count = len(index.get("files", {}))
-            last_page = index.get("last_page", 0)
-            complete = index.get("complete", False)
-            status_str = "[green]complete[/green]" if complete else f"page {last_page}"
-            console.print(f"  Dataset {ds_num}: {file_count} files indexed ({status_str})")
+    for ds_num in LISTING_DATASETS:
+        entry = data["datasets"].get(str(ds_num))
+        if entry:
+            status_str = "[green]complete[/green]" if entry["complete"] else f"page {entry['last_page']}"
+            downloaded = locations.get(pdf_location(ds_num), {"files": 0})["files"]
+            coverage = f", {downloaded / entry['indexed']:.0%} downloaded" if entry["indexed"] else ""
+            console.print(f"  Dataset {ds_num}: {entry['indexed']} files indexed ({status_str}){coverage}")
         else:
             console.print(f"  Dataset {ds_num}: [dim]not started[/dim]")
 
+    if data["updated"]:
+        updated = datetime.fromtimestamp(data["updated"]).strftime("%Y-%m-%d %H:%M:%S")
+        console.print(f"\n[dim]Manifest updated {updated}; run 'epstein-dl status --rescan' if files changed outside the tool[/dim]")
+
+
+@main.command()
+@click.option("--output", "-o", default=".", help="Output directory to check")
+@click.option("--workers", "-w", default=None, type=int, help="Hashing processes (default: CPU count)")
+@click.option("--no-cache", is_flag=True, help="Re-hash files even if unchanged since the last verify")
+@click.option("--sums", "sums_file", default=None, type=click.Path(dir_okay=False),
+              help="Write sha256sum-style lines for every hashed file")
+@click.argument("paths", nargs=-1, type=click.Path(exists=True))
+def verify(output, workers, no_cache, sums_file, paths):
+    """Verify archive checksums (or hash the given files/directories)."""
+    print_banner()
+
+    output_dir = Path(output).resolve()
+    cache = None if no_cache else VerifyCache(output_dir / VERIFY_CACHE_FILENAME)
+
+    if paths:
+        files = []
+        for p in paths:
+            p = Path(p)
+            files.extend(sorted(f for f in p.rglob("*") if f.is_file()) if p.is_dir() else [p])
+        hashes = hash_files(files, cache=cache, workers=workers)
+
+        table = Table(title=f"Hashed {len(files)} files")
+        table.add_column("File", style="cyan")
+        table.add_column("SHA-256")
+        table.add_column("MD5")
+        for f in files[:50]:
+            table.add_row(str(f), hashes[f].sha256, hashes[f].md5)
+        console.print(table)
+        if len(files) > 50:
+            console.print(f"[dim]... {len(files) - 50} more (use --sums to save all)[/dim]")
+        if sums_file:
+            _write_sums(Path(sums_file), hashes)
+        return
+
+    archives = {ds_num: find_archives(output_dir, ds_num) for ds_num in sorted(DATASETS)}
+    files = [f for found in archives.values() for f in found]
+    if not files:
+        console.print(f"[yellow]No dataset archives found under {output_dir}[/yellow]")
+        return
+    hashes = hash_files(files, cache=cache, workers=workers)
+
+    table = Table(title=f"Checksum Verification: {output_dir}")
+    table.add_column("Dataset", style="cyan")
+    table.add_column("File")
+    table.add_column("Size", justify="right")
+    table.add_column("Result")
+    failed = 0
+    for ds_num, found in archives.items():
+        for f in found:
+            result = check_hashes(ds_num, hashes[f])
+            if result is None:
+                result_str = f"[dim]no checksum (sha256 {hashes[f].sha256[:16]}...)[/dim]"
+            elif result:
+                result_str = "[green]OK[/green]"
+            else:
+                failed += 1
+                result_str = "[red]MISMATCH[/red]"
+            table.add_row(str(ds_num), str(f.relative_to(output_dir)), f"{f.stat().st_size / (1024**3):.2f} GB", result_str)
+    console.print(table)
+
+    if sums_file:
+        _write_sums(Path(sums_file), hashes)
+    if failed:
+        console.print(f"\n[red]{failed} archive(s) failed verification; delete and re-download them.[/red]")
+        sys.exit(1)
+
+
+def _write_sums(path: Path, hashes: dict) -> None:
+    """Write ``<sha256>  <path>`` lines, as produced by ``sha256sum``."""
+    with open(path, "w") as f:
+        for file_path, h in sorted(hashes.items()):
+            f.write(f"{h.sha256}  {file_path}\n")
+    console.print(f"[dim]Checksums saved to: {path}[/dim]")
+
 
 @main.command()
 @click.option("--output", "-o", default=".", help="Output directory")
+@click.option("--engine", type=click.Choice(["auto", "aria2c", "native"]), default="auto",
+              help="Download engine (auto = aria2c if installed, else built-in)")
+@click.option("--layout", type=click.Choice(["auto", *PDF_LAYOUTS]), default="auto",
+              help="PDF directory layout (auto = keep the existing one; sharded = EFTA0123/EFTA01234567.pdf)")
+@click.option("--no-zip-skip", is_flag=True, help="Also download PDFs that are inside the dataset's downloaded ZIP")
+@click.option("--rescan", is_flag=True, help="Find missing files by scanning the PDF directory, not the download outcomes")
+@click.option("--pdf-chunk", default=1000, help="PDFs per download batch")
+@click.option("--validate", "validate_first", is_flag=True,
+              help="Check PDFs on disk first and re-download empty or truncated ones")
 @click.argument("dataset", type=int)
-def resume(output, dataset):
+def resume(output, engine, layout, no_zip_skip, rescan, pdf_chunk, validate_first, dataset):
     """Resume downloading missing files for a dataset."""
     print_banner()
 
-    if not check_aria2c():
-        console.print("[red]ERROR: aria2c is required but not found![/red]")
-        console.print(get_aria2c_install_instructions())
-        sys.exit(1)
+    engine = _resolve_engine(engine)
 
     output_dir = Path(output).resolve()
-    scraper = DatasetScraper(output_dir, dataset)
-    downloader = Downloader(output_dir)
+    if validate_first:
+        _validate_dataset(output_dir, dataset)
+    scraper = DatasetScraper(output_dir, dataset, skip_zipped=not no_zip_skip)
+    downloader = Downloader(output_dir, engine=engine, layout=layout, pdf_chunk=pdf_chunk)
 
-    missing = scraper.get_missing_files()
+    missing = scraper.get_missing_files(rescan=rescan)
     if not missing:
         console.print(f"[green]No missing files for Dataset {dataset}![/green]")
         return
@@ -330,5 +587,468 @@ def resume(output, dataset):
     downloader.download_pdf_list(missing, pdf_dir)
 
 
+def _validate_dataset(output_dir: Path, dataset: int, workers: int = 32, use_cache: bool = True,
+                      dry_run: bool = False) -> ValidationResult:
+    """Validate one dataset's PDFs and, unless ``dry_run``, quarantine the invalid ones."""
+    pdf_dir = output_dir / pdf_location(dataset)
+    result = validate_pdfs(pdf_dir, workers=workers, use_cache=use_cache)
+    console.print(
+        f"Dataset {dataset}: {result.checked} checked, {result.cached} unchanged since last check, "
+        f"[{'red' if result.invalid else 'green'}]{len(result.invalid)} invalid[/]"
+    )
+    for path, reason in result.invalid[:20]:
+        console.print(f"  [red]{path.relative_to(pdf_dir)}[/red]: {reason}")
+    if len(result.invalid) > 20:
+        console.print(f"  [dim]... {len(result.invalid) - 20} more[/dim]")
+    if result.invalid and not dry_run:
+        moved = quarantine(pdf_dir, result.invalid)
+        Manifest(output_dir).rescan_location(pdf_location(dataset))
+        console.print(f"[yellow]Moved {moved} files aside as *.pdf{QUARANTINE_SUFFIX}; they will be re-downloaded[/yellow]")
+    return result
+
+
+@main.command()
+@click.option("--output", "-o", default=".", help="Output directory")
+@click.option("--workers", "-w", default=32, help="Files checked in parallel")
+@click.option("--no-cache", is_flag=True, help="Re-check files even if unchanged since the last run")
+@click.option("--dry-run", is_flag=True, help="Only report invalid files; leave them in place")
+@click.argument("datasets", type=int, nargs=-1)
+def validate(output, workers, no_cache, dry_run, datasets):
+    """Find empty or truncated PDFs (size, %PDF- header, %%EOF trailer) and flag them for re-download."""
+    print_banner()
+
+    output_dir = Path(output).resolve()
+    invalid = 0
+    for ds_num in datasets or DATASETS.keys():
+        if not (output_dir / pdf_location(ds_num)).is_dir():
+            if datasets:
+                console.print(f"[dim]Dataset {ds_num}: no PDF directory[/dim]")
+            continue
+        result = _validate_dataset(output_dir, ds_num, workers=workers, use_cache=not no_cache, dry_run=dry_run)
+        invalid += len(result.invalid)
+    if invalid:
+        if not dry_run:
+            console.print("Run [bold]epstein-dl resume <dataset>[/bold] to fetch them again.")
+        sys.exit(1)
+
+
+@main.command("delta-sync")
+@click.option("--output", "-o", default=".", help="Output directory")
+@click.option("--start-page", default=0, help="First listing page to check")
+@click.option("--max-pages", default=None, type=int, help="Maximum pages to check per dataset")
+@click.option("--stop-after", default=DEFAULT_STOP_AFTER, show_default=True,
+              help="Stop after this many consecutive unchanged pages")
+@click.option("--delay", default=0.3, help="Delay between page requests in seconds")
+@click.option("--report", "report_file", default=None, type=click.Path(dir_okay=False),
+              help="Write the JSON change report here (default: dataset{N}-delta-<time>.json; "
+                   "several datasets get one file each)")
+@click.option("--download", "download_changes", is_flag=True,
+              help="Download at-risk removed files first, then newly added ones")
+@click.option("--base-url", default=DOJ_BASE_URL, help="Site origin to scrape (e.g. a mock-server URL)")
+@click.argument("datasets", type=int, nargs=-1)
+def delta_sync(output, start_page, max_pages, stop_after, delay, report_file, download_changes, base_url, datasets):
+    """Re-check listing pages against stored fingerprints and report added and removed files."""
+    print_banner()
+
+    output_dir = Path(output).resolve()
+    selected = datasets or [n for n in LISTING_DATASETS if detect_index_backend(output_dir, n)]
+    if not selected:
+        console.print("[red]No indexed datasets; name the datasets to check[/red]")
+        return
+
+    for ds_num in selected:
+        scraper = DatasetScraper(output_dir, ds_num, base_url=base_url)
+        syncer = DeltaSync(scraper, stop_after=stop_after)
+        console.print(f"[bold]Delta sync of Dataset {ds_num}...[/bold]")
+        try:
+            report = syncer.run(start_page=start_page, max_pages=max_pages, delay=delay)
+        finally:
+            syncer.close()
+
+        if report_file and len(selected) == 1:
+            path = Path(report_file)
+        elif report_file:
+            path = Path(report_file).with_name(f"{Path(report_file).stem}-dataset{ds_num}.json")
+        else:
+            stamp = report.started.replace(":", "").replace("-", "")
+            path = output_dir / f"dataset{ds_num}-delta-{stamp}.json"
+        report.save(path)
+
+        last = "-" if report.last_page is None else report.last_page
+        console.print(
+            f"Dataset {ds_num}: pages {report.first_page}-{last} checked "
+            f"({report.pages_unchanged} unchanged), stopped: {report.stop_reason}"
+        )
+        console.print(
+            f"  [green]+{len(report.added)} added[/green]  [red]-{len(report.removed)} removed[/red]  "
+            f"[yellow]{len(report.at_risk)} removed and not downloaded[/yellow]"
+        )
+        for entry in report.at_risk[:20]:
+            console.print(f"    [yellow]{entry['file']}[/yellow] (page {entry['page']})")
+        if len(report.at_risk) > 20:
+            console.print(f"    [dim]... {len(report.at_risk) - 20} more[/dim]")
+        console.print(f"  [dim]Report saved to: {path}[/dim]")
+
+        urls = [entry["url"] for entry in report.at_risk if entry["url"]] + syncer.new_urls
+        if download_changes and urls:
+            downloader = Downloader(output_dir, engine=_resolve_engine("auto"))
+            downloader.download_pdf_list([*dict.fromkeys(urls)], output_dir / f"dataset{ds_num}-pdfs")
+
+
+@main.command()
+@click.option("--output", "-o", default=".", help="Output directory")
+@click.option("--ranges-file", default=None, type=click.Path(dir_okay=False),
+              help="Write missing EFTA ranges (one 'first-last' per line)")
+@click.option("--gaps", is_flag=True, help="Also report EFTA numbers in the dataset range that were never indexed")
+@click.argument("dataset", type=int)
+def missing(output, ranges_file, gaps, dataset):
+    """Show which indexed files of a dataset are not downloaded, as EFTA ranges."""
+    print_banner()
+
+    output_dir = Path(output).resolve()
+    if not detect_index_backend(output_dir, dataset):
+        console.print(f"[red]No index for Dataset {dataset}; scrape or enumerate it first[/red]")
+        return
+
+    scraper = DatasetScraper(output_dir, dataset)
+    coverage = scraper.coverage()
+    missing_map = coverage.missing
+    intervals = missing_map.intervals()
+
+    console.print(f"[bold]Dataset {dataset}[/bold] (EFTA {coverage.indexed.base}-{coverage.indexed.base + coverage.indexed.size - 1})")
+    console.print(f"  Indexed: {coverage.indexed.count()}")
+    console.print(f"  Downloaded: {(coverage.indexed & coverage.downloaded).count()}")
+    console.print(f"  Missing: {missing_map.count()} in {len(intervals)} ranges")
+    if coverage.irregular_missing:
+        console.print(f"  Missing (non-EFTA names): {len(coverage.irregular_missing)}")
+    for line in format_intervals(intervals[:20]):
+        console.print(f"    {line}")
+    if len(intervals) > 20:
+        console.print(f"    [dim]... {len(intervals) - 20} more ranges[/dim]")
+
+    if gaps:
+        gap_intervals = coverage.gaps.intervals()
+        console.print(f"  Never indexed: {coverage.gaps.count()} numbers in {len(gap_intervals)} ranges")
+
+    if ranges_file:
+        with open(ranges_file, "w") as f:
+            for line in format_intervals(intervals):
+                f.write(f"{line}\n")
+        console.print(f"\n[dim]Missing ranges saved to: {ranges_file}[/dim]")
+
+
+@main.command()
+@click.option("--output", "-o", default=".", help="Output directory")
+@click.option("--start", default=None, type=int, help="First EFTA number (default: resume / dataset start)")
+@click.option("--end", default=None, type=int, help="Last EFTA number (default: dataset end)")
+@click.option("--concurrency", default=16, help="Probe requests in flight")
+@click.option("--rate-limit", default=None, type=float, help="Max probe requests per second")
+@click.option("--miss-window", default=1000, help="Stop open-ended ranges after this many consecutive misses")
+@click.option("--index-backend", type=click.Choice(["auto", *INDEX_BACKENDS]), default="auto",
+              help="Index storage (auto = keep existing format; others migrate it)")
+@click.argument("dataset", type=int)
+def enumerate(output, start, end, concurrency, rate_limit, miss_window, index_backend, dataset):
+    """Index a dataset by probing its EFTA number range directly."""
+    print_banner()
+
+    output_dir = Path(output).resolve()
+    enumerator = EftaEnumerator(
+        output_dir,
+        dataset,
+        index_backend=index_backend,
+        concurrency=concurrency,
+        rate_limit=rate_limit,
+        miss_window=miss_window,
+    )
+    new_urls = enumerator.run(start=start, end=end)
+    if new_urls:
+        console.print(f"\nRun [bold]epstein-dl resume {dataset}[/bold] to download the indexed files.")
+
+
+@main.command()
+@click.option("--coord", required=True, type=click.Path(file_okay=False),
+              help="Coordination directory shared by all workers (local or shared filesystem)")
+@click.option("--coord-backend", type=click.Choice(["auto", *LEASE_BACKENDS]), default="auto",
+              help="Lease store (sqlite = leases.sqlite, file = lock-file guarded leases.json for NFS)")
+@click.option("--output", "-o", default=".", help="Output directory for downloaded PDFs")
+@click.option("--mode", type=click.Choice(["pages", "efta"]), default="pages",
+              help="Lease listing page ranges or EFTA number ranges")
+@click.option("--chunk", default=None, type=int, help="Range size when planning (default: 50 pages / 5000 EFTA numbers)")
+@click.option("--start", default=None, type=int, help="First EFTA number to plan (efta mode)")
+@click.option("--end", default=None, type=int, help="Last EFTA number to plan (efta mode)")
+@click.option("--replan", is_flag=True, help="Rediscover the page count and add ranges for new pages")
+@click.option("--retry-failed", is_flag=True, help="Return ranges that failed too often to the pool")
+@click.option("--ttl", default=120.0, help="Lease lifetime in seconds; renewed every third of it")
+@click.option("--worker-id", default=None, help="Name of this worker (default: host-pid)")
+@click.option("--concurrency", "-c", default=8, help="Requests in flight within a range")
+@click.option("--rate-limit", default=None, type=float, help="Max requests per second for this worker")
+@click.option("--no-download", is_flag=True, help="Only index; leave downloading to a later run")
+@click.option("--engine", type=click.Choice(["auto", "aria2c", "native"]), default="auto",
+              help="Download engine (auto = aria2c if installed, else built-in)")
+@click.option("--layout", type=click.Choice(["auto", *PDF_LAYOUTS]), default="auto",
+              help="PDF directory layout (auto = keep the existing one; sharded = EFTA0123/EFTA01234567.pdf)")
+@click.option("--adaptive", is_flag=True, help="Size requests in flight from server feedback (AIMD)")
+@click.option("--max-concurrency", default=32, help="Ceiling for --adaptive concurrency")
+@click.option("--base-url", default=DOJ_BASE_URL, help="Site origin to scrape (e.g. a mock-server URL)")
+@click.argument("dataset", type=int)
+def worker(coord, coord_backend, output, mode, chunk, start, end, replan, retry_failed, ttl, worker_id,
+           concurrency, rate_limit, no_download, engine, layout, adaptive, max_concurrency, base_url, dataset):
+    """Lease and process ranges of a dataset together with other workers."""
+    print_banner()
+
+    coord_dir = Path(coord).resolve()
+    output_dir = Path(output).resolve()
+    store = open_lease_store(coord_dir, coord_backend)
+    try:
+        if not store.ranges(dataset, mode) or replan:
+            if not _plan_ranges(store, output_dir, dataset, mode, chunk, start, end, base_url):
+                sys.exit(1)
+        if retry_failed:
+            console.print(f"[dim]{store.reset_failed(dataset, mode)} failed ranges back in the pool[/dim]")
+
+        controller = AdaptiveController(initial=concurrency, maximum=max_concurrency) if adaptive else None
+        downloader = None
+        if not no_download:
+            downloader = Downloader(
+                output_dir, concurrent=concurrency, engine=_resolve_engine(engine), layout=layout,
+                controller=controller,
+            )
+        shard_worker = ShardWorker(
+            store, coord_dir, output_dir, dataset, kind=mode, worker_id=worker_id, ttl=ttl,
+            concurrency=concurrency, rate_limit=rate_limit, downloader=downloader, base_url=base_url,
+            controller=controller,
+        )
+        ok = shard_worker.run()
+    finally:
+        store.close()
+    console.print(f"\nRun [bold]epstein-dl merge-partials --coord {coord} {dataset}[/bold] once all workers are done.")
+    if not ok:
+        sys.exit(1)
+
+
+def _plan_ranges(store, output_dir: Path, dataset: int, mode: str, chunk: Optional[int],
+                 start: Optional[int], end: Optional[int], base_url: str) -> bool:
+    """Add a dataset's page or EFTA ranges to the lease pool (idempotent)."""
+    if mode == "pages":
+        # Discovery only reads listing pages; the index is opened but never written
+        scraper = DatasetScraper(output_dir, dataset, quiet=True, base_url=base_url)
+        first, last = 0, PageRangeScraper(scraper).discover_last_page()
+        chunk = chunk or 50
+    else:
+        ds = DATASETS.get(dataset)
+        first = start if start is not None else (ds.efta_start if ds else None)
+        last = end if end is not None else (ds.efta_end if ds else None)
+        if first is None or last is None:
+            console.print(f"[red]Dataset {dataset} has no known EFTA range; pass --start and --end[/red]")
+            return False
+        chunk = chunk or 5000
+    if last < first:
+        console.print("[yellow]Nothing to plan: the range is empty.[/yellow]")
+        return True
+    added = store.plan(dataset, mode, first, last, chunk)
+    console.print(f"[dim]Planned {mode} {first}-{last}: {added} new ranges of {chunk}[/dim]")
+    return True
+
+
+@main.command("merge-partials")
+@click.option("--coord", required=True, type=click.Path(exists=True, file_okay=False),
+              help="Coordination directory the workers used")
+@click.option("--output", "-o", default=".", help="Output directory holding the canonical index")
+@click.option("--index-backend", type=click.Choice(["auto", *INDEX_BACKENDS]), default="auto",
+              help="Canonical index format (auto = keep the existing one)")
+@click.argument("dataset", type=int)
+def merge_partials_cmd(coord, output, index_backend, dataset):
+    """Merge the workers' partial indexes into the dataset index."""
+    print_banner()
+
+    added = merge_partials(Path(coord).resolve(), Path(output).resolve(), dataset, index_backend)
+    if not added:
+        console.print(f"[yellow]No partial indexes for Dataset {dataset} in {coord}[/yellow]")
+        return
+    for worker_id, count in added.items():
+        console.print(f"  {worker_id}: {count} new entries")
+    console.print(f"[green]Merged {sum(added.values())} entries into the Dataset {dataset} index[/green]")
+
+
+@main.command()
+@click.option("--coord", required=True, type=click.Path(exists=True, file_okay=False),
+              help="Coordination directory the workers use")
+@click.argument("dataset", type=int, required=False)
+def leases(coord, dataset):
+    """Show lease progress per dataset and who holds the active leases."""
+    print_banner()
+
+    store = open_lease_store(Path(coord).resolve())
+    try:
+        ranges = store.ranges(dataset)
+    finally:
+        store.close()
+    if not ranges:
+        console.print("[yellow]No ranges planned yet.[/yellow]")
+        return
+
+    table = Table(title="Lease Progress")
+    table.add_column("Dataset", style="cyan", justify="center")
+    table.add_column("Kind")
+    table.add_column("Done", justify="right", style="green")
+    table.add_column("Leased", justify="right", style="yellow")
+    table.add_column("Free", justify="right")
+    table.add_column("Failed", justify="right", style="red")
+    table.add_column("Holders", style="dim")
+    groups = sorted({(r.dataset, r.kind) for r in ranges})
+    now = datetime.now().timestamp()
+    for ds_num, kind in groups:
+        group = [r for r in ranges if (r.dataset, r.kind) == (ds_num, kind)]
+        counts = {state: sum(1 for r in group if r.state == state) for state in (DONE, LEASED, FREE, FAILED)}
+        holders = ", ".join(
+            f"{r.owner} {r.first}-{r.last} ({r.expires - now:.0f}s)" if not r.expired(now)
+            else f"{r.owner} {r.first}-{r.last} (expired)"
+            for r in group if r.state == LEASED
+        )
+        table.add_row(str(ds_num), kind, str(counts[DONE]), str(counts[LEASED]), str(counts[FREE]),
+                      str(counts[FAILED]), holders)
+    console.print(table)
+
+
+@main.command("shard-pdfs")
+@click.option("--output", "-o", default=".", help="Output directory")
+@click.option("--workers", default=8, help="File moves in flight")
+@click.argument("datasets", type=int, nargs=-1)
+def shard_pdfs(output, workers, datasets):
+    """Move flat dataset PDF directories into EFTA shard subdirectories."""
+    print_banner()
+
+    output_dir = Path(output).resolve()
+    for ds_num in datasets or LISTING_DATASETS:
+        pdf_dir = output_dir / f"dataset{ds_num}-pdfs"
+        if not pdf_dir.is_dir():
+            if datasets:
+                console.print(f"[dim]Dataset {ds_num}: no PDF directory[/dim]")
+            continue
+        console.print(f"[yellow]Sharding {pdf_dir.name}...[/yellow]")
+        moved, skipped = migrate_to_sharded(pdf_dir, workers=workers)
+        console.print(f"[green]Dataset {ds_num}: moved {moved} files[/green]")
+        if skipped:
+            console.print(f"[yellow]  {skipped} flat files left in place (a sharded copy already exists)[/yellow]")
+
+
+@main.command()
+@click.option("--output", "-o", default=".", help="Output directory")
+@click.option("--workers", "-w", default=None, type=int, help="Extraction processes (default: CPU count)")
+@click.argument("datasets", type=int, nargs=-1)
+def extract(output, workers, datasets):
+    """Extract downloaded dataset ZIPs, skipping files already extracted intact."""
+    print_banner()
+
+    output_dir = Path(output).resolve()
+    failed = []
+    for ds_num in datasets or DATASETS.keys():
+        if not complete_archives(output_dir, ds_num):
+            if datasets:
+                console.print(f"[dim]Dataset {ds_num}: no downloaded ZIP[/dim]")
+            continue
+        if not _extract_zip(output_dir, ds_num, workers=workers):
+            failed.append(ds_num)
+    if failed:
+        sys.exit(1)
+
+
+def _mock_site_options(func):
+    """Options shared by ``bench`` and ``mock-server`` describing the mock site."""
+    options = [
+        click.option("--dataset", "dataset_num", default=9, help="Dataset number the mock site serves"),
+        click.option("--pages", default=50, help="Listing pages with files"),
+        click.option("--files-per-page", default=50, help="PDF links per listing page"),
+        click.option("--tail", type=click.Choice(["wrap", "empty"]), default="wrap",
+                     help="What pages past the end return (wrap = repeat the last page, like the live site)"),
+        click.option("--pdf-kb", default=64, help="Size of each synthetic PDF in KB"),
+        click.option("--latency-ms", default=0.0, help="Delay added to every response"),
+        click.option("--error-rate", default=0.0, help="Fraction of requests answered with 429/503"),
+    ]
+    for option in reversed(options):
+        func = option(func)
+    return func
+
+
+def _mock_site_config(dataset_num, pages, files_per_page, tail, pdf_kb, latency_ms, error_rate) -> MockSiteConfig:
+    return MockSiteConfig(
+        dataset_num=dataset_num,
+        pages=pages,
+        files_per_page=files_per_page,
+        tail=tail,
+        pdf_size=pdf_kb * 1024,
+        latency=latency_ms / 1000,
+        error_rate=error_rate,
+    )
+
+
+@main.command()
+@_mock_site_options
+@click.option("--suite", "suites", type=click.Choice(BENCH_SUITES), multiple=True,
+              help="Benchmarks to run (repeatable, default: all)")
+@click.option("--engine", type=click.Choice(["native", "aria2c"]), default="native", help="Download engine to time")
+@click.option("--concurrency", "-c", default=8, help="Listing pages / downloads in flight")
+@click.option("--json", "json_file", default=None, type=click.Path(dir_okay=False), help="Save results as JSON")
+@click.option("--baseline", default=None, type=click.Path(exists=True, dir_okay=False),
+              help="Fail if any rate is slower than this saved --json result")
+@click.option("--tolerance", default=0.2, help="Allowed slowdown against --baseline (0.2 = 20%)")
+def bench(suites, engine, concurrency, json_file, baseline, tolerance, **site):
+    """Measure scraper, downloader and index throughput against a local mock DOJ site."""
+    print_banner()
+
+    if engine == "aria2c" and not check_aria2c():
+        console.print(get_aria2c_install_instructions(), style="red")
+        sys.exit(1)
+
+    config = _mock_site_config(**site)
+    console.print(
+        f"[dim]Mock site: {config.pages} pages x {config.files_per_page} files, "
+        f"{site['pdf_kb']} KB PDFs, {site['latency_ms']:g} ms latency, {config.error_rate:.0%} errors[/dim]"
+    )
+    results = run_benchmarks(config, suites=suites or BENCH_SUITES, engine=engine, concurrency=concurrency)
+    console.print(results_table(results))
+
+    if json_file:
+        save_results(Path(json_file), results, config)
+        console.print(f"[dim]Results saved to {json_file}[/dim]")
+    if baseline:
+        regressions = compare_results(results, Path(baseline), tolerance=tolerance)
+        for line in regressions:
+            console.print(f"[red]Regression: {line}[/red]")
+        if regressions:
+            sys.exit(1)
+        console.print(f"[green]No regressions against {baseline}[/green]")
+
+
+@main.command("mock-server")
+@_mock_site_options
+@click.option("--host", default="127.0.0.1", help="Address to listen on")
+@click.option("--port", default=8000, help="Port to listen on")
+def mock_server(host, port, **site):
+    """Serve a local mock of the DOJ listing and PDF URLs for offline testing."""
+    config = _mock_site_config(**site)
+    n = config.dataset_num
+    console.print(f"[bold]Mock DOJ site:[/bold] http://{host}:{port}/epstein/doj-disclosures/data-set-{n}-files?page=0")
+    console.print("[dim]Ctrl+C to stop[/dim]")
+    serve_forever(config, host=host, port=port)
+
+
+@main.command("migrate-index")
+@click.option("--output", "-o", default=".", help="Output directory")
+@click.option("--backend", type=click.Choice(INDEX_BACKENDS), default="sqlite", help="Target index format")
+@click.argument("datasets", type=int, nargs=-1)
+def migrate_index_cmd(output, backend, datasets):
+    """Convert dataset indexes to another storage format."""
+    print_banner()
+
+    output_dir = Path(output).resolve()
+    for ds_num in datasets or DATASETS.keys():
+        if not detect_index_backend(output_dir, ds_num):
+            continue
+        store = migrate_index(output_dir, ds_num, backend)
+        console.print(f"  Dataset {ds_num}: {store.count()} files in {store.path.name}")
+        store.close()
+
+
 if __name__ == "__main__":
     main()
@@ -9,7 +9,8 @@ DOJ_COOKIE = "justiceGovAgeVerified=true"
 # Base URLs
 DOJ_BASE_URL = "https://www.justice.gov"
 DOJ_FILES_URL = f"{DOJ_BASE_URL}/epstein/files"
-DOJ_LISTING_URL = f"{DOJ_BASE_URL}/epstein/doj-disclosures"
+LISTING_PATH = "/epstein/doj-disclosures"
+DOJ_LISTING_URL = f"{DOJ_BASE_URL}{LISTING_PATH}"
 
 # Archive.org trackers for torrents
 TRACKERS = [
@@ -44,6 +45,8 @@ DATASETS = {
         magnet_size_gb=None,
         efta_start=1,
         efta_end=39024,
+        # Published SHA-256 duplicates DataSet_9.tar.xz's, so only MD5 is trusted
+        checksum_md5="9B1FD6A2C97582A8DD2C93EF6CD226C6",
     ),
     2: DatasetInfo(
         number=2,
@@ -53,6 +56,8 @@ DATASETS = {
         magnet_size_gb=None,
         efta_start=None,
         efta_end=None,
+        checksum_sha256="24CEBBAEFE9D49BCA57726B5A4B531FF20E6A97C370BA87A7593DD8DBDB77BFF",
+        checksum_md5="0C043B6362E493E9134159BB2699E943",
     ),
     3: DatasetInfo(
         number=3,
@@ -62,6 +67,8 @@ DATASETS = {
         magnet_size_gb=None,
         efta_start=None,
         efta_end=None,
+        checksum_sha256="1C5587152328BD45A68BAEFEB5FBA1D55677BE4FF0B381D721F37C7B3DA9055E",
+        checksum_md5="4BCBBE3BB4280B262171817B93005878",
     ),
     4: DatasetInfo(
         number=4,
@@ -71,6 +78,8 @@ DATASETS = {
         magnet_size_gb=None,
         efta_start=None,
         efta_end=None,
+        checksum_sha256="979154842BAC356EF36BB2D0E72F78E0F6B771D79E02DD6934CFF699944E2B71",
+        checksum_md5="1EE427147464F516F486CA47BB8A369A",
     ),
     5: DatasetInfo(
         number=5,
@@ -80,6 +89,8 @@ DATASETS = {
         magnet_size_gb=None,
         efta_start=None,
         efta_end=None,
+        checksum_sha256="7317E2AD089C82A59378A9C038E964FEAB246BE62ECC24663B741617AF3DA709",
+        checksum_md5="89F3DAA4F52B37C100D12EB088FB4B8C",
     ),
     6: DatasetInfo(
         number=6,
@@ -89,6 +100,8 @@ DATASETS = {
         magnet_size_gb=None,
         efta_start=None,
         efta_end=None,
+        checksum_sha256="D54D26D94127B9A277CF3F7D9EEAF9A7271F118757997EDAC3BC6E1039ED6555",
+        checksum_md5="8E4690A38F77E7A34DBC5908A5032CCD",
     ),
     7: DatasetInfo(
         number=7,
@@ -98,6 +111,8 @@ DATASETS = {
         magnet_size_gb=None,
         efta_start=None,
         efta_end=None,
+        checksum_sha256="51E1961B3BCF18A21AFD9BCF697FDB54DAC97D1B64CF88297F4C5BE268D26B8E",
+        checksum_md5="AD35BF46A5613DDFBF37E120DEA4A45C",
     ),
     8: DatasetInfo(
         number=8,
@@ -107,6 +122,8 @@ DATASETS = {
         magnet_size_gb=None,
         efta_start=None,
         efta_end=None,
+        checksum_sha256="8CB7345BF7A0B32F183658AC170FB0B6527895C95F0233D7B99D544579567294",
+        checksum_md5="F86494C617EA79B7A290B48AE8B1C708",
     ),
     9: DatasetInfo(
         number=9,
@@ -136,6 +153,8 @@ DATASETS = {
         magnet_size_gb=None,
         efta_start=2205655,
         efta_end=2730264,
+        checksum_sha256="9714273B9E325F0A1F406063C795DB32F5DA2095B75E602D4C4FBABA5DE3ED80",
+        checksum_md5="D29AEDBA383B94ACF4B1B473800332E0",
     ),
     12: DatasetInfo(
         number=12,
@@ -145,10 +164,16 @@ DATASETS = {
         magnet_size_gb=0.114,
         efta_start=2730265,
         efta_end=None,
+        checksum_sha256="B5314B7EFCA98E25D8B35E4B7FAC3EBB3CA2E6CFD0937AA2300CA8B71543BBE2",
+        checksum_md5="B1206186332BB1AF021E86D68468F9FE",
     ),
 }
 
 
+# Datasets that have DOJ listing pages (13 is listed but has no ZIP/torrent yet)
+LISTING_DATASETS = list(range(1, 14))
+
+
 def get_zip_url(dataset_num: int) -> str:
     """Get the ZIP download URL for a dataset."""
     return f"{DOJ_FILES_URL}/DataSet%20{dataset_num}.zip"
@@ -159,9 +184,10 @@ def get_pdf_url(dataset_num: int, efta_num: int) -> str:
     return f"{DOJ_FILES_URL}/DataSet%20{dataset_num}/EFTA{efta_num:08d}.pdf"
 
 
-def get_listing_url(dataset_num: int, page: int = 0) -> str:
-    """Get the file listing page URL."""
-    return f"{DOJ_LISTING_URL}/data-set-{dataset_num}-files?page={page}"
+def get_listing_url(dataset_num: int, page: int = 0, base_url: Optional[str] = None) -> str:
+    """Get the file listing page URL (``base_url`` points elsewhere, e.g. a mock site)."""
+    listing_url = f"{base_url}{LISTING_PATH}" if base_url else DOJ_LISTING_URL
+    return f"{listing_url}/data-set-{dataset_num}-files?page={page}"
 
 
 def get_magnet_with_trackers(magnet: str) -> str:
@@ -0,0 +1,309 @@
+"""Delta sync: re-check listing pages against stored fingerprints to find added and removed files."""
+
+import hashlib
+import json
+import sqlite3
+import time
+from dataclasses import asdict, dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Set, Tuple
+
+import requests
+from rich.console import Console
+
+from . import metrics
+from .layout import pdf_path, resolve_layout
+from .manifest import Manifest
+from .outcomes import completed_size
+from .scraper import DatasetScraper, PageWalk
+from .transport import retry_delay
+
+console = Console()
+
+# Consecutive unchanged pages after which the listing is assumed unchanged
+DEFAULT_STOP_AFTER = 50
+
+
+def fingerprint(names: List[str]) -> str:
+    """Hash of a page's filenames in listing order."""
+    return hashlib.sha256("\n".join(names).encode("utf-8")).hexdigest()[:32]
+
+
+class PageFingerprints:
+    """
+    Filenames and fingerprint of each listing page (``dataset{N}-pages.sqlite``).
+
+    Unlike the ``ListingCache`` this is never evicted: it is the baseline
+    the next delta sync compares against.
+    """
+
+    def __init__(self, output_dir: Path, dataset_num: int):
+        self.path = Path(output_dir) / f"dataset{dataset_num}-pages.sqlite"
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(str(self.path))
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute(
+            """CREATE TABLE IF NOT EXISTS pages (
+                page INTEGER PRIMARY KEY,
+                hash TEXT NOT NULL,
+                names TEXT NOT NULL,
+                checked REAL NOT NULL
+            )"""
+        )
+
+    def get(self, page: int) -> Optional[Tuple[str, List[str]]]:
+        """Stored ``(fingerprint, filenames)`` of a page, or None if never seen."""
+        row = self.conn.execute("SELECT hash, names FROM pages WHERE page = ?", (page,)).fetchone()
+        if row is None:
+            return None
+        return row[0], row[1].split("\n") if row[1] else []
+
+    def put(self, page: int, digest: str, names: List[str]) -> None:
+        self.conn.execute(
+            "INSERT OR REPLACE INTO pages VALUES (?, ?, ?, ?)", (page, digest, "\n".join(names), time.time()),
+        )
+
+    def touch(self, page: int) -> None:
+        """Mark an unchanged page as checked now."""
+        self.conn.execute("UPDATE pages SET checked = ? WHERE page = ?", (time.time(), page))
+
+    def pages_after(self, page: int) -> Iterator[Tuple[int, List[str]]]:
+        """Stored pages numbered above ``page`` with their filenames."""
+        for number, names in self.conn.execute(
+            "SELECT page, names FROM pages WHERE page > ? ORDER BY page", (page,)
+        ).fetchall():
+            yield number, names.split("\n") if names else []
+
+    def drop_after(self, page: int) -> None:
+        self.conn.execute("DELETE FROM pages WHERE page > ?", (page,))
+
+    def count(self) -> int:
+        return self.conn.execute("SELECT COUNT(*) FROM pages").fetchone()[0]
+
+    def commit(self) -> None:
+        self.conn.commit()
+
+    def close(self) -> None:
+        self.conn.commit()
+        self.conn.close()
+
+
+@dataclass
+class PageChange:
+    """What changed on one listing page since its stored fingerprint."""
+    page: int
+    # "new" (no stored fingerprint), "changed", or "gone" (past the end of the listing now)
+    status: str
+    added: List[str] = field(default_factory=list)
+    removed: List[str] = field(default_factory=list)
+    # Files that only shifted here from another page
+    moved: int = 0
+
+
+@dataclass
+class DeltaReport:
+    """Machine-readable result of one delta sync of a dataset."""
+    dataset: int
+    started: str
+    finished: str = ""
+    first_page: int = 0
+    last_page: Optional[int] = None
+    pages_checked: int = 0
+    pages_unchanged: int = 0
+    # "unchanged-run", "end-of-listing" or "max-pages"
+    stop_reason: str = ""
+    added: List[str] = field(default_factory=list)
+    removed: List[str] = field(default_factory=list)
+    # Removed files that are not downloaded: ``{"file", "url", "page"}``
+    at_risk: List[dict] = field(default_factory=list)
+    pages: List[PageChange] = field(default_factory=list)
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+    def save(self, path: Path) -> None:
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, "w") as f:
+            json.dump(self.to_dict(), f, indent=2)
+
+
+class DeltaSync:
+    """
+    Re-fetches a dataset's listing pages in order and diffs each against
+    its stored fingerprint.
+
+    New files are added to the index as in a scrape. A file that vanished
+    from one page but shows up on another checked page only shifted
+    (removals push later files up a page) and is counted as moved; the
+    rest are reported as removed, with the ones not yet downloaded listed
+    as at risk. Removed files stay in the index so they can still be
+    fetched while their URLs work. The walk stops after ``stop_after``
+    consecutive unchanged pages, at the end of the listing, or after
+    ``max_pages``.
+    """
+
+    def __init__(self, scraper: DatasetScraper, stop_after: int = DEFAULT_STOP_AFTER):
+        self.scraper = scraper
+        self.stop_after = max(1, stop_after)
+        self.fingerprints = PageFingerprints(scraper.output_dir, scraper.dataset_num)
+        # Newly indexed URLs that still need downloading
+        self.new_urls: List[str] = []
+
+    def run(self, start_page: int = 0, max_pages: Optional[int] = None, delay: float = 0.3) -> DeltaReport:
+        """
+        Check pages from ``start_page`` until a stop condition is met.
+
+        Args:
+            start_page: First listing page to check
+            max_pages: Maximum number of pages to check (None = no limit)
+            delay: Delay between requests in seconds
+
+        Returns:
+            The change report
+        """
+        scraper = self.scraper
+        store = scraper.store
+        report = DeltaReport(
+            dataset=scraper.dataset_num,
+            started=datetime.now().isoformat(timespec="seconds"),
+            first_page=start_page,
+        )
+        walk = PageWalk(start_page)
+        seen: Set[str] = set()
+        vanished: Dict[str, int] = {}
+        changes: List[PageChange] = []
+        last_listed = start_page - 1
+        unchanged_run = 0
+        attempt = 0
+        page = start_page
+
+        if self.fingerprints.count() == 0:
+            console.print(f"[dim]No page fingerprints for Dataset {scraper.dataset_num} yet; "
+                          f"this pass records the baseline[/dim]")
+
+        while True:
+            if max_pages and page >= start_page + max_pages:
+                report.stop_reason = "max-pages"
+                break
+
+            if scraper.controller:
+                scraper.controller.wait_sync()
+            try:
+                links = scraper._fetch_page(page)
+            except requests.RequestException as e:
+                console.print(f"[red]Error on page {page}: {e}[/red]")
+                metrics.retried("scrape", f"page {page}", e)
+                attempt += 1
+                time.sleep(retry_delay(attempt, scraper.controller, base=2.0))
+                continue
+            attempt = 0
+
+            result = walk.feed(page, links)
+            if result in ("stop-empty", "stop-wrap"):
+                report.stop_reason = "end-of-listing"
+                break
+            if walk.wrap_count:
+                page += 1  # The site repeating its last page past the end
+                continue
+
+            names = [url.split("/")[-1] for url in links]
+            report.pages_checked += 1
+            report.last_page = page
+            seen.update(names)
+            if names:
+                last_listed = page
+
+            stored = self.fingerprints.get(page)
+            digest = fingerprint(names)
+            if stored is not None and stored[0] == digest:
+                self.fingerprints.touch(page)
+                report.pages_unchanged += 1
+                unchanged_run += 1
+                if unchanged_run >= self.stop_after:
+                    report.stop_reason = "unchanged-run"
+                    break
+            else:
+                unchanged_run = 0
+                old = stored[1] if stored else []
+                old_set = set(old)
+                current = set(names)
+                added = [name for name in names if name not in store]
+                shifted_in = sum(1 for name in names if name not in old_set and name in store) if stored else 0
+                for name in old:
+                    if name not in current:
+                        vanished.setdefault(name, page)
+                if stored or added:
+                    changes.append(PageChange(page, "changed" if stored else "new", added=added, moved=shifted_in))
+                self.new_urls.extend(scraper._index_urls(links))
+                self.fingerprints.put(page, digest, names)
+
+            if page % 100 == 0:
+                store.commit()
+                self.fingerprints.commit()
+            page += 1
+            if delay:
+                time.sleep(delay)
+
+        if report.stop_reason == "end-of-listing":
+            # Pages the listing no longer reaches (trailing empty pages were diffed above)
+            diffed = {change.page for change in changes}
+            for number, names in self.fingerprints.pages_after(last_listed):
+                for name in names:
+                    vanished.setdefault(name, number)
+                if names and number not in diffed:
+                    changes.append(PageChange(number, "gone"))
+            for change in changes:
+                if change.page > last_listed:
+                    change.status = "gone"
+            self.fingerprints.drop_after(last_listed)
+
+        self._finish(report, changes, seen, vanished)
+        return report
+
+    def _finish(self, report: DeltaReport, changes: List[PageChange], seen: Set[str],
+                vanished: Dict[str, int]) -> None:
+        """Net out moves, find at-risk files and save the index and fingerprints."""
+        scraper = self.scraper
+        store = scraper.store
+        removed = {name: page for name, page in vanished.items() if name not in seen}
+        by_page: Dict[int, List[str]] = {}
+        for name, page in removed.items():
+            by_page.setdefault(page, []).append(name)
+
+        for change in changes:
+            change.removed = sorted(by_page.get(change.page, []))
+        report.pages = changes
+        report.added = [name for change in changes for name in change.added]
+        report.removed = sorted(removed)
+
+        pdf_dir = scraper.output_dir / f"dataset{scraper.dataset_num}-pdfs"
+        layout = resolve_layout(pdf_dir, scraper.layout)
+        catalog = scraper.zip_catalog
+        for name in report.removed:
+            if catalog is not None and name in catalog:
+                continue
+            if completed_size(pdf_path(pdf_dir, name, layout)) is None:
+                report.at_risk.append({"file": name, "url": store.get(name), "page": removed[name]})
+
+        store.commit()
+        self.fingerprints.commit()
+        if scraper.cache:
+            scraper.cache.commit()
+        Manifest(scraper.output_dir).update_index(
+            scraper.dataset_num,
+            store.count(),
+            last_page=store.meta.get("last_page", 0),
+            complete=store.meta.get("complete", False),
+        )
+        report.finished = datetime.now().isoformat(timespec="seconds")
+        metrics.event(
+            "delta_sync_done", dataset=scraper.dataset_num, pages=report.pages_checked,
+            added=len(report.added), removed=len(report.removed), at_risk=len(report.at_risk),
+            stop=report.stop_reason,
+        )
+
+    def close(self) -> None:
+        self.fingerprints.close()
@@ -4,11 +4,19 @@ import os
 import subprocess
 import shutil
 from pathlib import Path
-from typing import List, Optional
+from typing import List, Optional, Tuple
 
 from rich.console import Console
 from rich.progress import Progress, SpinnerColumn, TextColumn
 
+from . import metrics
+from .adaptive import AdaptiveController
+from .aria2rpc import Aria2RPCClient, Aria2RPCError, args_to_options
+from .layout import PARTIAL_SUFFIXES, pdf_path, resolve_layout
+from .manifest import Manifest
+from .native import NativeEngine
+from .outcomes import OutcomeLog
+from .verify import CACHE_FILENAME, VerifyCache, find_archives, verify_file
 from .config import (
     DATASETS,
     DOJ_COOKIE,
@@ -38,11 +46,62 @@ Linux (yum):       sudo yum install aria2
 
 
 class Downloader:
-    """Handles all download operations."""
-
-    def __init__(self, output_dir: Path, concurrent: int = 5):
+    """
+    Handles all download operations.
+
+    By default every job runs its own foreground aria2c process. When an
+    ``Aria2RPCClient`` is given, jobs are submitted to a shared daemon
+    instead; with ``wait=False`` the ``download_*`` methods return as soon
+    as the job is queued and ``wait_all`` blocks until everything is done,
+    so torrents, ZIPs and PDF batches run side by side.
+
+    With ``engine="native"`` ZIPs and PDFs are fetched by the pure-Python
+    ``NativeEngine`` and aria2c is not needed (torrents still require it).
+
+    ``quiet`` suppresses aria2c console output and progress bars, for when
+    several jobs run at once under the scheduler's combined display.
+
+    ``layout`` places PDFs flat or in EFTA shards (``EFTA0123/EFTA01234567.pdf``);
+    ``auto`` follows whatever the target directory already uses.
+
+    PDF lists are fetched in chunks of ``pdf_chunk`` files with per-file
+    outcomes recorded next to the PDF directory (see ``download_pdf_list``).
+
+    A shared ``AdaptiveController`` makes the native engine size its file
+    concurrency from server feedback instead of ``concurrent``; aria2c
+    keeps its fixed settings and its own retry handling.
+    """
+
+    def __init__(
+        self,
+        output_dir: Path,
+        concurrent: int = 5,
+        rpc: Optional[Aria2RPCClient] = None,
+        wait: bool = True,
+        engine: str = "aria2c",
+        quiet: bool = False,
+        layout: str = "auto",
+        controller: Optional[AdaptiveController] = None,
+        pdf_chunk: int = 1000,
+    ):
         self.output_dir = Path(output_dir)
         self.concurrent = concurrent
+        self.rpc = rpc
+        self.quiet = quiet
+        self.layout = layout
+        self.controller = controller
+        self.native = (
+            NativeEngine(concurrent=concurrent, quiet=quiet, controller=controller) if engine == "native" else None
+        )
+        self.wait = wait
+        self.pending_gids: List[str] = []
+        # Targets of queued (not yet awaited) RPC jobs, counted by wait_all
+        self.pending_targets: List[Tuple[str, List[Path]]] = []
+        # Outcome logs to update for queued PDF chunks, filled in by wait_all
+        self.pending_outcomes: List[Tuple[Path, List[Path]]] = []
+        self.pdf_chunk = pdf_chunk
+        self.manifest = Manifest(self.output_dir)
+        self.verify_cache = VerifyCache(self.output_dir / CACHE_FILENAME)
         self.torrents_dir = self.output_dir / "torrents"
         self.zips_dir = self.output_dir / "zips"
 
@@ -50,10 +109,89 @@ class Downloader:
         self.torrents_dir.mkdir(parents=True, exist_ok=True)
         self.zips_dir.mkdir(parents=True, exist_ok=True)
 
-    def download_torrent(self, magnet: str, name: str) -> bool:
-        """Download a torrent using aria2c."""
-        if not check_aria2c():
-            console.print(get_aria2c_install_instructions(), style="red")
+    def _aria2_ready(self) -> bool:
+        """Check that aria2c (or an RPC daemon / native engine) is available."""
+        if self.rpc or self.native or check_aria2c():
+            return True
+        console.print(get_aria2c_install_instructions(), style="red")
+        return False
+
+    def _run_aria2c(self, args: List[str]) -> subprocess.CompletedProcess:
+        """Run a foreground aria2c process."""
+        if self.quiet:
+            args = args + ["--quiet=true"]
+        return subprocess.run(args, check=False)
+
+    def _submit(self, jobs: List[Tuple[List[str], dict]]) -> bool:
+        """
+        Queue jobs on the RPC daemon.
+
+        Args:
+            jobs: (uris, options) per download
+
+        Returns:
+            True if every job was accepted (and, when waiting, completed)
+        """
+        try:
+            results = self.rpc.multicall([("aria2.addUri", uris, opts) for uris, opts in jobs])
+        except Exception as e:
+            console.print(f"[red]Error submitting to aria2 RPC: {e}[/red]")
+            return False
+
+        gids = [r for r in results if not isinstance(r, Aria2RPCError)]
+        rejected = len(results) - len(gids)
+        if rejected:
+            console.print(f"[red]aria2 rejected {rejected} of {len(results)} downloads[/red]")
+
+        if not self.wait:
+            self.pending_gids.extend(gids)
+            return rejected == 0
+
+        final = self.rpc.wait(gids, quiet=self.quiet)
+        return rejected == 0 and all(state == "complete" for state in final.values())
+
+    def _record(self, location: str, targets: List[Path]) -> None:
+        """Count completed new targets in the manifest (deferred for queued RPC jobs)."""
+        if not targets:
+            return
+        if self.rpc and not self.wait:
+            self.pending_targets.append((location, targets))
+        else:
+            self.manifest.add_files(location, targets)
+
+    @metrics.instrument_download("wait_all", lambda: {})
+    def wait_all(self) -> bool:
+        """Wait for every job queued with ``wait=False``."""
+        if not self.rpc or not self.pending_gids:
+            return True
+        console.print(f"[yellow]Waiting for {len(self.pending_gids)} queued aria2 downloads...[/yellow]")
+        final = self.rpc.wait(self.pending_gids)
+        self.pending_gids = []
+        for location, targets in self.pending_targets:
+            self.manifest.add_files(location, targets)
+        self.pending_targets = []
+        for path, targets in self.pending_outcomes:
+            outcomes = OutcomeLog(path)
+            outcomes.record_from_disk(targets)
+            outcomes.close()
+        self.pending_outcomes = []
+        failed = [gid for gid, state in final.items() if state != "complete"]
+        if failed:
+            console.print(f"[red]{len(failed)} downloads did not complete[/red]")
+        return not failed
+
+    @metrics.instrument_download("torrent", lambda magnet, name, dataset_num=None: {"name": name})
+    def download_torrent(self, magnet: str, name: str, dataset_num: Optional[int] = None) -> bool:
+        """
+        Download a torrent using aria2c.
+
+        When ``dataset_num`` is given, archives in the payload are checked
+        against the dataset's published checksums once the download ends.
+        """
+        if self.native and not self.rpc and not check_aria2c():
+            console.print(f"[red]Torrents require aria2c; skipping {name}[/red]")
+            return False
+        if not self._aria2_ready():
             return False
 
         magnet_full = get_magnet_with_trackers(magnet)
@@ -75,18 +213,29 @@ class Downloader:
             "--summary-interval=10",
         ]
 
-        try:
-            # Run in foreground so user can see progress
-            result = subprocess.run(args, check=False)
-            return result.returncode == 0
-        except Exception as e:
-            console.print(f"[red]Error downloading torrent: {e}[/red]")
-            return False
-
+        if self.rpc:
+            ok = self._submit([([magnet_full], args_to_options(args))])
+            if not self.wait:
+                return ok
+        else:
+            try:
+                # Run in foreground so user can see progress
+                ok = self._run_aria2c(args).returncode == 0
+            except Exception as e:
+                console.print(f"[red]Error downloading torrent: {e}[/red]")
+                return False
+
+        if ok and dataset_num is not None:
+            for path in find_archives(self.output_dir, dataset_num):
+                ok = verify_file(path, dataset_num, cache=self.verify_cache, quiet=self.quiet) and ok
+        # Payload names aren't known up front, so re-total the torrents directory
+        self.manifest.rescan_location("torrents")
+        return ok
+
+    @metrics.instrument_download("zip", lambda dataset_num: {"dataset": dataset_num})
     def download_zip(self, dataset_num: int) -> bool:
         """Download a ZIP file directly."""
-        if not check_aria2c():
-            console.print(get_aria2c_install_instructions(), style="red")
+        if not self._aria2_ready():
             return False
 
         dataset = DATASETS.get(dataset_num)
@@ -98,11 +247,13 @@ class Downloader:
         filename = f"DataSet{dataset_num}.zip"
         output_path = self.zips_dir / filename
 
-        if output_path.exists():
+        # A sidecar next to the ZIP means an interrupted download: resume it rather than verify a partial file
+        partial = any(output_path.with_name(filename + s).exists() for s in PARTIAL_SUFFIXES)
+        if output_path.exists() and not partial:
             console.print(f"[dim]SKIP: {filename} already exists[/dim]")
-            return True
+            return verify_file(output_path, dataset_num, cache=self.verify_cache, quiet=self.quiet)
 
-        console.print(f"[yellow]Downloading: {filename}[/yellow]")
+        console.print(f"[yellow]{'Resuming' if partial else 'Downloading'}: {filename}[/yellow]")
         if dataset.zip_size_mb:
             console.print(f"[dim]  Size: ~{dataset.zip_size_mb} MB[/dim]")
 
@@ -124,12 +275,25 @@ class Downloader:
             "--summary-interval=10",
         ]
 
-        try:
-            result = subprocess.run(args, check=False)
-            return result.returncode == 0
-        except Exception as e:
-            console.print(f"[red]Error downloading ZIP: {e}[/red]")
-            return False
+        if self.rpc:
+            ok = self._submit([([url], args_to_options(args))])
+            # Queued without waiting: checked by a later run or 'epstein-dl verify'
+            if not self.wait:
+                self._record("zips", [output_path])
+                return ok
+        elif self.native:
+            ok = self.native.download_file(url, output_path, segments=8)
+        else:
+            try:
+                ok = self._run_aria2c(args).returncode == 0
+            except Exception as e:
+                console.print(f"[red]Error downloading ZIP: {e}[/red]")
+                return False
+
+        ok = ok and verify_file(output_path, dataset_num, cache=self.verify_cache, quiet=self.quiet)
+        if ok:
+            self._record("zips", [output_path])
+        return ok
 
     def download_all_zips(self) -> dict:
         """Download all available ZIP files."""
@@ -147,32 +311,102 @@ class Downloader:
             if dataset.magnet:
                 console.print(f"\n[bold]Dataset {num} (Torrent)[/bold]")
                 results[num] = self.download_torrent(
-                    dataset.magnet, f"DataSet{num}"
+                    dataset.magnet, f"DataSet{num}", dataset_num=num
                 )
         return results
 
+    @staticmethod
+    def _read_session_urls(session_file: Path) -> List[str]:
+        """URLs an aria2c ``--save-session`` file lists as unfinished."""
+        if not session_file.exists():
+            return []
+        with open(session_file, "r") as f:
+            return [line.split("\t")[0].strip() for line in f if line.strip() and not line[0].isspace()]
+
+    @metrics.instrument_download("pdf_list", lambda urls, output_dir: {"files": len(urls), "dir": Path(output_dir).name})
     def download_pdf_list(self, urls: List[str], output_dir: Path) -> bool:
-        """Download a list of PDF URLs using aria2c."""
-        if not check_aria2c():
-            console.print(get_aria2c_install_instructions(), style="red")
+        """
+        Download a list of PDF URLs in chunks of ``pdf_chunk``.
+
+        Each file's outcome (success, size, and for the native engine its
+        duration) goes into the directory's ``OutcomeLog`` as soon as it is
+        known, so a failed file no longer fails the whole list and
+        ``get_missing_files`` can retry only what did not complete. aria2c
+        runs persist a ``--save-session`` file; if a run is killed, the
+        downloads it left unfinished are picked up by the next call.
+
+        Returns:
+            True if every file completed (queued, for RPC with ``wait=False``)
+        """
+        if not self._aria2_ready():
             return False
 
+        output_dir.mkdir(parents=True, exist_ok=True)
+        session_file = output_dir.with_name(f"{output_dir.name}.aria2-session")
+        requested = set(urls)
+        interrupted = [u for u in self._read_session_urls(session_file) if u not in requested]
+        if interrupted:
+            console.print(f"[yellow]Resuming {len(interrupted)} downloads from an interrupted aria2c session[/yellow]")
+            urls = interrupted + list(urls)
+
         if not urls:
             console.print("[dim]No URLs to download[/dim]")
             return True
 
-        output_dir.mkdir(parents=True, exist_ok=True)
-
-        # Create URL list file for aria2c
-        url_list_file = self.output_dir / "pdf-urls-temp.txt"
+        layout = resolve_layout(output_dir, self.layout)
+        outcomes = OutcomeLog.for_pdf_dir(output_dir)
+        jobs = [(url, pdf_path(output_dir, url.split("/")[-1], layout)) for url in urls]
+        chunks = [jobs[i:i + self.pdf_chunk] for i in range(0, len(jobs), self.pdf_chunk)]
+
+        failed = 0
+        for number, chunk in enumerate(chunks, 1):
+            if len(chunks) > 1:
+                console.print(f"[dim]Chunk {number}/{len(chunks)}: {len(chunk)} PDFs[/dim]")
+            # Only targets absent now can be newly counted in the manifest
+            fresh = [p for _, p in chunk if not p.exists()]
+            try:
+                if self.rpc:
+                    failed += self._download_pdf_chunk_rpc(chunk, outcomes)
+                elif self.native:
+                    failed += self._download_pdf_chunk_native(chunk, outcomes)
+                else:
+                    failed += self._download_pdf_chunk_aria2c(chunk, output_dir, session_file, outcomes)
+            except Exception as e:
+                console.print(f"[red]Error downloading PDFs: {e}[/red]")
+                failed += len(chunk)
+            self._record(output_dir.name, fresh)
+
+        outcomes.compact()
+        outcomes.close()
+        if failed:
+            console.print(f"[red]{failed} of {len(jobs)} PDFs failed; 'resume' retries only those[/red]")
+        return failed == 0
+
+    def _download_pdf_chunk_native(self, chunk: List[Tuple[str, Path]], outcomes: OutcomeLog) -> int:
+        """Fetch one chunk with the native engine; returns the number of failures."""
+        def on_result(url: str, path: Path, ok: bool, seconds: float, expected: Optional[int]) -> None:
+            outcomes.record(
+                path.name, ok, size=path.stat().st_size if ok else None, seconds=seconds, expected=expected,
+            )
+
+        console.print(f"[yellow]Downloading {len(chunk)} PDFs...[/yellow]")
+        results = self.native.download_files(chunk, on_result=on_result)
+        return sum(1 for ok in results.values() if not ok)
+
+    def _download_pdf_chunk_aria2c(
+        self, chunk: List[Tuple[str, Path]], output_dir: Path, session_file: Path, outcomes: OutcomeLog,
+    ) -> int:
+        """Fetch one chunk with a foreground aria2c; returns the number of failures."""
+        # Create URL list file for aria2c (one per target directory so
+        # overlapping batches for different datasets don't collide)
+        url_list_file = self.output_dir / f"{output_dir.name}-urls-temp.txt"
         with open(url_list_file, "w") as f:
-            for url in urls:
-                filename = url.split("/")[-1]
+            for url, target in chunk:
                 f.write(f"{url}\n")
-                f.write(f"  dir={output_dir}\n")
-                f.write(f"  out={filename}\n")
+                f.write(f"  dir={target.parent}\n")
+                f.write(f"  out={target.name}\n")
 
-        console.print(f"[yellow]Downloading {len(urls)} PDFs...[/yellow]")
+        console.print(f"[yellow]Downloading {len(chunk)} PDFs...[/yellow]")
 
         args = [
             "aria2c",
@@ -187,13 +421,40 @@ class Downloader:
             "--retry-wait=3",
             "--console-log-level=notice",
             "--summary-interval=30",
+            f"--save-session={session_file}",
+            "--save-session-interval=30",
         ]
 
-        try:
-            result = subprocess.run(args, check=False)
-            # Clean up temp file
-            url_list_file.unlink(missing_ok=True)
-            return result.returncode == 0
-        except Exception as e:
-            console.print(f"[red]Error downloading PDFs: {e}[/red]")
-            return False
+        result = self._run_aria2c(args)
+        url_list_file.unlink(missing_ok=True)
+        if result.returncode != 0:
+            console.print(f"[yellow]aria2c exited with code {result.returncode}[/yellow]")
+        # Outcomes are recorded now; the session only matters if this process dies first
+        failed = outcomes.record_from_disk([p for _, p in chunk])
+        session_file.unlink(missing_ok=True)
+        return failed
+
+    def _download_pdf_chunk_rpc(self, chunk: List[Tuple[str, Path]], outcomes: OutcomeLog) -> int:
+        """Queue one chunk on the RPC daemon; returns failures (rejections only, when not waiting)."""
+        urls = [url for url, _ in chunk]
+        targets = [path for _, path in chunk]
+        ok = self._download_pdf_list_rpc(urls, targets)
+        if not self.wait:
+            self.pending_outcomes.append((outcomes.path, targets))
+            return 0 if ok else len(chunk)
+        return outcomes.record_from_disk(targets)
+
+    def _download_pdf_list_rpc(self, urls: List[str], targets: List[Path]) -> bool:
+        """Queue a PDF list on the RPC daemon, one download per URL."""
+        common = args_to_options([
+            f"--header=Cookie: {DOJ_COOKIE}",
+            "--max-connection-per-server=4",
+            "--timeout=60",
+            "--max-tries=5",
+            "--retry-wait=3",
+        ])
+        console.print(f"[yellow]Queueing {len(urls)} PDFs on aria2 daemon...[/yellow]")
+        return self._submit([
+            ([url], {**common, "dir": str(target.parent), "out": target.name})
+            for url, target in zip(urls, targets)
+        ])
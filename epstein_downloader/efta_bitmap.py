@@ -0,0 +1,216 @@
+"""Compact per-EFTA-number flags for indexed / downloaded coverage."""
+
+from array import array
+from dataclasses import dataclass
+from typing import Iterable, Iterator, List, Optional, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # optional; the bytearray path gives the same results
+    np = None
+
+
+def parse_efta(filename: str) -> Optional[int]:
+    """EFTA number of a canonical ``EFTA{8 digits}.pdf`` name, else None."""
+    # Plain string checks: this runs once per file on million-entry indexes
+    if len(filename) == 16 and filename.startswith("EFTA") and filename.endswith(".pdf"):
+        digits = filename[4:12]
+        if digits.isdigit() and digits.isascii():
+            return int(digits)
+    return None
+
+
+def efta_filename(num: int) -> str:
+    return f"EFTA{num:08d}.pdf"
+
+
+class EftaBitmap:
+    """
+    One flag per EFTA number in ``base .. base + size - 1``.
+
+    Flags are a NumPy bool array when NumPy is installed, otherwise a
+    ``bytearray`` of 0/1 — either way one byte per number, so dataset 9's
+    1.2M numbers take about 1.2 MB instead of a set of filename strings.
+    Set operations and run extraction are vectorized (NumPy) or done with
+    C-level bytes scans (``int`` bitwise ops, ``bytes.find``).
+    """
+
+    def __init__(self, base: int, size: int):
+        self.base = base
+        self.size = max(size, 0)
+        if np is not None:
+            self.flags = np.zeros(self.size, dtype=bool)
+        else:
+            self.flags = bytearray(self.size)
+
+    @classmethod
+    def from_numbers(cls, numbers: Iterable[int], base: int, size: int) -> "EftaBitmap":
+        """Build a bitmap with the given numbers set (out-of-range ones ignored)."""
+        bitmap = cls(base, size)
+        if np is not None:
+            nums = np.fromiter(numbers, dtype=np.int64) - base
+            bitmap.flags[nums[(nums >= 0) & (nums < bitmap.size)]] = True
+        else:
+            flags = bitmap.flags
+            for n in numbers:
+                if 0 <= n - base < bitmap.size:
+                    flags[n - base] = 1
+        return bitmap
+
+    def _like(self, flags) -> "EftaBitmap":
+        bitmap = EftaBitmap.__new__(EftaBitmap)
+        bitmap.base = self.base
+        bitmap.size = self.size
+        bitmap.flags = flags
+        return bitmap
+
+    def _check(self, other: "EftaBitmap") -> None:
+        if (self.base, self.size) != (other.base, other.size):
+            raise ValueError("EftaBitmap ranges differ")
+
+    def __contains__(self, num: int) -> bool:
+        off = num - self.base
+        return 0 <= off < self.size and bool(self.flags[off])
+
+    def add(self, num: int) -> None:
+        off = num - self.base
+        if not 0 <= off < self.size:
+            raise ValueError(f"EFTA{num} outside {self.base}..{self.base + self.size - 1}")
+        self.flags[off] = 1
+
+    def count(self) -> int:
+        """Number of set flags."""
+        if np is not None:
+            return int(np.count_nonzero(self.flags))
+        return self.flags.count(1)
+
+    def __and__(self, other: "EftaBitmap") -> "EftaBitmap":
+        self._check(other)
+        if np is not None:
+            return self._like(self.flags & other.flags)
+        a = int.from_bytes(self.flags, "little")
+        b = int.from_bytes(other.flags, "little")
+        return self._like(bytearray((a & b).to_bytes(self.size, "little")))
+
+    def __sub__(self, other: "EftaBitmap") -> "EftaBitmap":
+        """Numbers set here but not in ``other``."""
+        self._check(other)
+        if np is not None:
+            return self._like(self.flags & ~other.flags)
+        a = int.from_bytes(self.flags, "little")
+        b = int.from_bytes(other.flags, "little")
+        # Each byte is 0 or 1, so a & ~b == a & (b ^ 1) bytewise
+        ones = int.from_bytes(b"\x01" * self.size, "little")
+        return self._like(bytearray((a & (b ^ ones)).to_bytes(self.size, "little")))
+
+    def __invert__(self) -> "EftaBitmap":
+        """Numbers in range that are not set."""
+        if np is not None:
+            return self._like(~self.flags)
+        return self._like(bytearray(self.flags.translate(bytes([1, 0]) + bytes(254))))
+
+    def intervals(self) -> List[Tuple[int, int]]:
+        """Runs of set flags as inclusive ``(first, last)`` EFTA numbers."""
+        if not self.size:
+            return []
+        if np is not None:
+            padded = np.concatenate(([False], self.flags, [False])).astype(np.int8)
+            edges = np.flatnonzero(np.diff(padded))
+            starts, ends = edges[0::2], edges[1::2] - 1
+            return [(int(s) + self.base, int(e) + self.base) for s, e in zip(starts, ends)]
+
+        runs: List[Tuple[int, int]] = []
+        data = bytes(self.flags)
+        pos = data.find(1)
+        while pos != -1:
+            end = data.find(0, pos)
+            if end == -1:
+                end = self.size
+            runs.append((pos + self.base, end - 1 + self.base))
+            pos = data.find(1, end)
+        return runs
+
+    def numbers(self) -> Iterator[int]:
+        """Set EFTA numbers in ascending order."""
+        for first, last in self.intervals():
+            yield from range(first, last + 1)
+
+
+def format_intervals(intervals: Iterable[Tuple[int, int]]) -> List[str]:
+    """``a-b`` lines (or ``a`` for single numbers) for exporting ranges."""
+    return [f"{a}-{b}" if a != b else str(a) for a, b in intervals]
+
+
+@dataclass
+class Coverage:
+    """Indexed vs. downloaded state of one dataset."""
+    indexed: EftaBitmap
+    downloaded: EftaBitmap
+    # Index entries that aren't canonical EFTA names and aren't on disk
+    irregular_missing: List[str]
+
+    @property
+    def missing(self) -> EftaBitmap:
+        """Indexed but not downloaded."""
+        return self.indexed - self.downloaded
+
+    @property
+    def gaps(self) -> EftaBitmap:
+        """Numbers in the dataset's range that were never indexed."""
+        return ~self.indexed
+
+
+def build_coverage(
+    filenames: Iterable[str],
+    pdf_names: Iterable[str],
+    efta_start: Optional[int] = None,
+    efta_end: Optional[int] = None,
+) -> Coverage:
+    """
+    Build indexed/downloaded bitmaps from index filenames and files on disk.
+
+    The range starts at ``efta_start`` (or the lowest indexed number) and
+    ends at the larger of ``efta_end`` and the highest indexed number.
+    Index numbers are collected in a compact ``array('q')`` rather than a
+    set of strings.
+
+    Args:
+        filenames: Filenames in the dataset index
+        pdf_names: Filenames present in the PDF directory
+        efta_start: First EFTA number of the dataset, if known
+        efta_end: Last EFTA number of the dataset, if known
+
+    Returns:
+        Coverage for the dataset
+    """
+    indexed_nums = array("q")
+    irregular: List[str] = []
+    for name in filenames:
+        num = parse_efta(name)
+        if num is None:
+            irregular.append(name)
+        else:
+            indexed_nums.append(num)
+
+    downloaded_nums = array("q")
+    downloaded_irregular = set()
+    for name in pdf_names:
+        num = parse_efta(name)
+        if num is None:
+            downloaded_irregular.add(name)
+        else:
+            downloaded_nums.append(num)
+
+    if indexed_nums:
+        base = min(efta_start, min(indexed_nums)) if efta_start is not None else min(indexed_nums)
+        top = max(efta_end or 0, max(indexed_nums))
+    else:
+        base = efta_start or 0
+        top = efta_end if efta_end is not None else base - 1
+    size = top - base + 1
+
+    return Coverage(
+        indexed=EftaBitmap.from_numbers(indexed_nums, base, size),
+        downloaded=EftaBitmap.from_numbers(downloaded_nums, base, size),
+        irregular_missing=[name for name in irregular if name not in downloaded_irregular],
+    )
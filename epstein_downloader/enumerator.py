@@ -0,0 +1,267 @@
+"""Direct EFTA-range enumeration: discover files without walking listing pages."""
+
+import asyncio
+import json
+import os
+from bisect import bisect_right
+from pathlib import Path
+from typing import Dict, List, Optional, Set
+
+import aiohttp
+from rich.console import Console
+from rich.progress import BarColumn, Progress, TextColumn, TimeRemainingColumn
+
+from .config import DATASETS, get_pdf_url
+from .index_store import IndexStore, open_index_store
+from .manifest import Manifest
+from .scraper import RateLimiter
+from .transport import async_session, backoff_delay
+
+console = Console()
+
+
+def _add_to_ranges(ranges: List[List[int]], num: int) -> None:
+    """Insert ``num`` into a sorted list of disjoint inclusive intervals, merging neighbours."""
+    # Ranges starting at or before num; the common in-order case lands at the end
+    i = bisect_right(ranges, [num, float("inf")])
+    prev = ranges[i - 1] if i else None
+    nxt = ranges[i] if i < len(ranges) else None
+    if prev and prev[1] >= num:
+        return
+    joins_prev = prev is not None and prev[1] == num - 1
+    joins_next = nxt is not None and nxt[0] == num + 1
+    if joins_prev and joins_next:
+        prev[1] = nxt[1]
+        del ranges[i]
+    elif joins_prev:
+        prev[1] = num
+    elif joins_next:
+        nxt[0] = num
+    else:
+        ranges.insert(i, [num, num])
+
+
+class EftaEnumerator:
+    """
+    Builds a dataset index by probing ``EFTA{n}.pdf`` URLs directly.
+
+    Each candidate in ``efta_start..efta_end`` costs one HEAD request (or a
+    ``Range: bytes=0-0`` GET if HEAD is refused). Hits go into the normal
+    dataset index; misses and the highest contiguously probed number are
+    kept in ``dataset{N}-probe.json`` so runs resume where they stopped.
+
+    Datasets with an open-ended range (``efta_end=None``) are probed forward
+    until ``miss_window`` consecutive numbers are missing.
+    """
+
+    def __init__(
+        self,
+        output_dir: Path,
+        dataset_num: int,
+        index_backend: str = "auto",
+        concurrency: int = 16,
+        rate_limit: Optional[float] = None,
+        miss_window: int = 1000,
+    ):
+        self.output_dir = Path(output_dir)
+        self.dataset_num = dataset_num
+        self.dataset = DATASETS.get(dataset_num)
+        self.store: IndexStore = open_index_store(self.output_dir, dataset_num, index_backend)
+        self.state_file = self.output_dir / f"dataset{dataset_num}-probe.json"
+        self.concurrency = concurrency
+        self.rate_limit = rate_limit
+        self.miss_window = miss_window
+
+    def load_state(self) -> dict:
+        """Load probe progress (``probed_to`` watermark and ``missing`` ranges)."""
+        if self.state_file.exists():
+            with open(self.state_file, "r") as f:
+                return json.load(f)
+        return {"probed_to": None, "missing": []}
+
+    def save_state(self, state: dict) -> None:
+        """Atomically save probe progress."""
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        tmp = self.state_file.with_name(self.state_file.name + ".tmp")
+        with open(tmp, "w") as f:
+            json.dump(state, f)
+        os.replace(tmp, self.state_file)
+
+    def run(self, start: Optional[int] = None, end: Optional[int] = None) -> List[str]:
+        """
+        Probe the EFTA range and index every file that exists.
+
+        Args:
+            start: First EFTA number (default: resume point or efta_start)
+            end: Last EFTA number (default: efta_end; None = open-ended)
+
+        Returns:
+            List of newly indexed PDF URLs
+        """
+        if not self.dataset or self.dataset.efta_start is None:
+            console.print(f"[red]Dataset {self.dataset_num} has no known EFTA range; use listing-page scraping[/red]")
+            return []
+        return asyncio.run(self.run_async(start, end))
+
+    async def run_async(self, start: Optional[int] = None, end: Optional[int] = None) -> List[str]:
+        """Async implementation of ``run``."""
+        state = self.load_state()
+        watermark = state.get("probed_to")
+        if start is None:
+            start = watermark + 1 if watermark is not None else self.dataset.efta_start
+        if end is None:
+            end = self.dataset.efta_end
+
+        console.print(f"[bold]Enumerating Dataset {self.dataset_num} EFTA numbers...[/bold]")
+        range_desc = f"{start}-{end}" if end is not None else f"{start}- (open-ended)"
+        console.print(f"[dim]Range {range_desc}, {self.store.count()} files already indexed[/dim]")
+
+        limiter = RateLimiter(self.rate_limit)
+        new_urls: List[str] = []
+        results: Dict[int, bool] = {}
+        in_flight: Set[asyncio.Task] = set()
+        next_num = start
+        cursor = start
+        consecutive_misses = 0
+        last_hit = start - 1
+        stopped = False
+        hits = misses = 0
+        # Keep dispatch close to the in-order cursor so the open-ended stop
+        # condition doesn't over-probe far past the end of the data.
+        window = self.concurrency * 4
+
+        async with async_session(limit=self.concurrency) as session:
+            with Progress(
+                TextColumn("[progress.description]{task.description}"),
+                BarColumn(),
+                TextColumn("{task.completed}/{task.total}" if end is not None else "{task.completed}"),
+                TextColumn("•"),
+                TextColumn("{task.fields[hits]} hits, {task.fields[misses]} misses"),
+                TimeRemainingColumn(),
+                console=console,
+            ) as progress:
+                task = progress.add_task(
+                    f"EFTA {start}",
+                    total=(end - start + 1) if end is not None else None,
+                    hits=0,
+                    misses=0,
+                )
+                try:
+                    while True:
+                        while (
+                            not stopped
+                            and len(in_flight) < self.concurrency
+                            and next_num - cursor < window
+                            and (end is None or next_num <= end)
+                        ):
+                            in_flight.add(asyncio.ensure_future(self._probe(session, limiter, next_num)))
+                            next_num += 1
+
+                        if not in_flight:
+                            break
+
+                        finished, in_flight = await asyncio.wait(in_flight, return_when=asyncio.FIRST_COMPLETED)
+                        for t in finished:
+                            num, exists = t.result()
+                            results[num] = exists
+
+                        while cursor in results:
+                            exists = results.pop(cursor)
+                            if exists:
+                                hits += 1
+                                consecutive_misses = 0
+                                last_hit = cursor
+                                url = get_pdf_url(self.dataset_num, cursor)
+                                if self.store.add(url.split("/")[-1], url):
+                                    new_urls.append(url)
+                            else:
+                                misses += 1
+                                consecutive_misses += 1
+                                _add_to_ranges(state["missing"], cursor)
+                            if state["probed_to"] is None or cursor > state["probed_to"]:
+                                state["probed_to"] = cursor
+                            cursor += 1
+
+                            if cursor % 1000 == 0:
+                                self._checkpoint(state)
+
+                            if end is None and consecutive_misses >= self.miss_window:
+                                stopped = True
+
+                        progress.update(
+                            task,
+                            completed=cursor - start,
+                            description=f"EFTA {cursor}",
+                            hits=hits,
+                            misses=misses,
+                        )
+                finally:
+                    for t in in_flight:
+                        t.cancel()
+                    if in_flight:
+                        await asyncio.gather(*in_flight, return_exceptions=True)
+                    if stopped:
+                        # Forget the trailing miss run so the next run probes
+                        # past the last hit again and picks up new releases;
+                        # never below what an earlier run already covered
+                        floor = last_hit if watermark is None else max(last_hit, watermark)
+                        state["probed_to"] = floor
+                        while state["missing"] and state["missing"][-1][0] > floor:
+                            state["missing"].pop()
+                        if state["missing"] and state["missing"][-1][1] > floor:
+                            state["missing"][-1][1] = floor
+                    self._checkpoint(state)
+
+        Manifest(self.output_dir).update_index(
+            self.dataset_num,
+            self.store.count(),
+            last_page=self.store.meta.get("last_page", 0),
+            complete=self.store.meta.get("complete", False),
+        )
+
+        if stopped:
+            console.print(f"\n[yellow]{self.miss_window} consecutive misses after EFTA {last_hit}, stopping.[/yellow]")
+
+        console.print(f"\n[green]Enumeration complete![/green]")
+        console.print(f"  Probed: {hits + misses} ({hits} found, {misses} missing)")
+        console.print(f"  New files indexed: {len(new_urls)}")
+        console.print(f"  Total files indexed: {self.store.count()}")
+        console.print(f"  Missing ranges saved to: {self.state_file}")
+        return new_urls
+
+    def _checkpoint(self, state: dict) -> None:
+        self.store.commit()
+        self.save_state(state)
+
+    async def _probe(self, session: aiohttp.ClientSession, limiter: RateLimiter, num: int) -> tuple:
+        """Return ``(num, exists)``, retrying transient errors."""
+        url = get_pdf_url(self.dataset_num, num)
+        use_head = True
+        attempt = 0
+        while True:
+            await limiter.wait()
+            try:
+                if use_head:
+                    request = session.head(url, allow_redirects=False)
+                else:
+                    request = session.get(url, headers={"Range": "bytes=0-0"}, allow_redirects=False)
+                async with request as response:
+                    if response.status in (200, 206):
+                        return num, True
+                    if response.status in (404, 410):
+                        return num, False
+                    if response.status in (405, 501) and use_head:
+                        use_head = False
+                        continue
+                    if 300 <= response.status < 400:
+                        # The DOJ site redirects missing files to an error page
+                        return num, False
+                    if response.status != 429 and response.status < 500:
+                        # Other 4xx (401, 403, ...) won't go away by retrying
+                        console.print(f"[red]EFTA{num:08d}: HTTP {response.status}, counted as missing[/red]")
+                        return num, False
+                    response.raise_for_status()
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                console.print(f"[red]Error probing EFTA{num:08d}: {e}[/red]")
+                attempt += 1
+                await asyncio.sleep(backoff_delay(attempt, base=2.0))
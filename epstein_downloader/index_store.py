@@ -0,0 +1,606 @@
+"""Pluggable storage backends for dataset indexes."""
+
+import heapq
+import json
+import os
+import sqlite3
+import sys
+import zlib
+from array import array
+from bisect import bisect_left
+from itertools import accumulate, chain
+from operator import sub
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Set, Tuple
+from urllib.parse import unquote
+
+from rich.console import Console
+
+from .efta_bitmap import efta_filename, parse_efta
+
+console = Console()
+
+BACKENDS = ("json", "log", "sqlite", "efta")
+
+# Bytes read from the end of a log index to find the latest summary record
+_LOG_TAIL_BYTES = 64 * 1024
+
+
+def _default_meta() -> dict:
+    return {"last_page": 0, "complete": False}
+
+
+class IndexStore:
+    """
+    Base class for a dataset index: ``filename -> url`` plus scrape metadata.
+
+    ``meta`` holds ``last_page`` and ``complete`` (plus any other
+    JSON-serializable scrape state) and is loaded on first access. Changes become durable on ``commit()``; backends are free to
+    buffer until then.
+    """
+
+    suffix = ""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self._meta: Optional[dict] = None
+
+    @property
+    def meta(self) -> dict:
+        if self._meta is None:
+            self._meta = _default_meta()
+            self._load_meta()
+        return self._meta
+
+    def _load_meta(self) -> None:
+        """Populate ``self._meta`` from disk (subclasses)."""
+
+    def exists(self) -> bool:
+        """Whether the backing file exists on disk."""
+        return self.path.exists()
+
+    def __contains__(self, filename: str) -> bool:
+        raise NotImplementedError
+
+    def get(self, filename: str) -> Optional[str]:
+        """Return the URL for ``filename``, or None."""
+        raise NotImplementedError
+
+    def add(self, filename: str, url: str) -> bool:
+        """Add an entry; returns False if it was already present."""
+        raise NotImplementedError
+
+    def items(self) -> Iterator[Tuple[str, str]]:
+        """Iterate over ``(filename, url)`` pairs."""
+        raise NotImplementedError
+
+    def filenames(self) -> Iterator[str]:
+        for filename, _ in self.items():
+            yield filename
+
+    def urls(self) -> Iterator[str]:
+        for _, url in self.items():
+            yield url
+
+    def count(self) -> int:
+        """Number of indexed files."""
+        raise NotImplementedError
+
+    def commit(self) -> None:
+        """Make all changes durable."""
+        raise NotImplementedError
+
+    def close(self) -> None:
+        """Release resources (does not commit)."""
+
+    def to_dict(self) -> dict:
+        """Legacy ``{"files": {...}, "last_page", "complete"}`` representation."""
+        return {"files": dict(self.items()), **self.meta}
+
+
+class JSONIndexStore(IndexStore):
+    """
+    The original single-file ``dataset{N}-index.json`` format.
+
+    Every commit rewrites the whole file, so it is only suitable for small
+    datasets; kept as the default for compatibility with existing archives.
+    """
+
+    suffix = ".json"
+
+    def __init__(self, path: Path):
+        super().__init__(path)
+        self._files: Optional[Dict[str, str]] = None
+
+    @property
+    def files(self) -> Dict[str, str]:
+        if self._files is None:
+            self._files = {}
+            if self.path.exists():
+                with open(self.path, "r") as f:
+                    data = json.load(f)
+                self._files = data.pop("files", {})
+                self._meta = {**_default_meta(), **data}
+        return self._files
+
+    def _load_meta(self) -> None:
+        self.files
+
+    def __contains__(self, filename: str) -> bool:
+        return filename in self.files
+
+    def get(self, filename: str) -> Optional[str]:
+        return self.files.get(filename)
+
+    def add(self, filename: str, url: str) -> bool:
+        if filename in self.files:
+            return False
+        self.files[filename] = url
+        return True
+
+    def items(self) -> Iterator[Tuple[str, str]]:
+        return iter(list(self.files.items()))
+
+    def count(self) -> int:
+        return len(self.files)
+
+    def commit(self) -> None:
+        files = self.files
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_name(self.path.name + ".tmp")
+        with open(tmp, "w") as f:
+            json.dump({"files": files, **self.meta}, f, indent=2)
+        os.replace(tmp, self.path)
+
+
+class LogIndexStore(IndexStore):
+    """
+    Append-only JSON-lines index (``dataset{N}-index.log``).
+
+    Entries are appended as ``{"f": filename, "u": url}``; each commit
+    appends a ``{"meta": {...}}`` summary record and fsyncs, so inserts
+    are O(1) and ``count()`` only needs to read the file's tail while that
+    summary is the last record. A torn final line from a crash is ignored
+    on load.
+    """
+
+    suffix = ".log"
+
+    def __init__(self, path: Path):
+        super().__init__(path)
+        self._files: Optional[Dict[str, str]] = None
+        self._handle = None
+
+    def _load(self) -> Dict[str, str]:
+        if self._files is not None:
+            return self._files
+        self._files = {}
+        log_meta: dict = {}
+        if self.path.exists():
+            good_size = 0
+            with open(self.path, "rb") as f:
+                for raw in f:
+                    try:
+                        record = json.loads(raw)
+                    except ValueError:
+                        break  # Torn write from a crash; drop the tail
+                    if not raw.endswith(b"\n"):
+                        break
+                    good_size += len(raw)
+                    if "meta" in record:
+                        log_meta = record["meta"]
+                    else:
+                        self._files[record["f"]] = record["u"]
+            if good_size != self.path.stat().st_size:
+                with open(self.path, "r+b") as f:
+                    f.truncate(good_size)
+        if self._meta is None:
+            self._meta = _default_meta()
+            self._meta.update({k: v for k, v in log_meta.items() if k != "count"})
+        return self._files
+
+    def _load_meta(self) -> None:
+        if self._files is not None:
+            return
+        summary = self._read_summary()
+        if summary is not None:
+            self._meta.update({k: v for k, v in summary.items() if k != "count"})
+
+    def _read_summary(self, last_only: bool = False) -> Optional[dict]:
+        """
+        Return the most recent meta record without loading the whole log.
+
+        With ``last_only`` it is returned only if no entries were appended
+        after it (as when a crash hits between ``add`` and ``commit``), so
+        its count is still accurate.
+        """
+        if not self.path.exists():
+            return None
+        with open(self.path, "rb") as f:
+            f.seek(0, os.SEEK_END)
+            size = f.tell()
+            f.seek(max(0, size - _LOG_TAIL_BYTES))
+            tail = f.read()
+        lines = tail.splitlines(keepends=True)
+        if lines and not lines[-1].endswith(b"\n"):
+            lines.pop()  # Torn write, dropped on load
+        for raw in reversed(lines):
+            if raw.startswith(b'{"meta"'):
+                try:
+                    return json.loads(raw)["meta"]
+                except ValueError:
+                    continue
+            if last_only and raw.strip():
+                return None
+        return None
+
+    def _append(self, record: dict) -> None:
+        if self._handle is None:
+            self._load()
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._handle = open(self.path, "a", encoding="utf-8")
+        self._handle.write(json.dumps(record, separators=(",", ":")) + "\n")
+
+    def __contains__(self, filename: str) -> bool:
+        return filename in self._load()
+
+    def get(self, filename: str) -> Optional[str]:
+        return self._load().get(filename)
+
+    def add(self, filename: str, url: str) -> bool:
+        files = self._load()
+        if filename in files:
+            return False
+        files[filename] = url
+        self._append({"f": filename, "u": url})
+        return True
+
+    def items(self) -> Iterator[Tuple[str, str]]:
+        return iter(list(self._load().items()))
+
+    def count(self) -> int:
+        if self._files is None:
+            summary = self._read_summary(last_only=True)
+            if summary is not None and "count" in summary:
+                return summary["count"]
+        return len(self._load())
+
+    def commit(self) -> None:
+        self._append({"meta": {**self.meta, "count": len(self._load())}})
+        self._handle.flush()
+        os.fsync(self._handle.fileno())
+
+    def close(self) -> None:
+        if self._handle is not None:
+            self._handle.close()
+            self._handle = None
+
+
+class SQLiteIndexStore(IndexStore):
+    """SQLite index (``dataset{N}-index.sqlite``) in WAL mode."""
+
+    suffix = ".sqlite"
+
+    def __init__(self, path: Path):
+        super().__init__(path)
+        self._conn: Optional[sqlite3.Connection] = None
+
+    @property
+    def conn(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute("CREATE TABLE IF NOT EXISTS files (name TEXT PRIMARY KEY, url TEXT NOT NULL)")
+            self._conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL)")
+        return self._conn
+
+    def _load_meta(self) -> None:
+        for key, value in self.conn.execute("SELECT key, value FROM meta"):
+            self._meta[key] = json.loads(value)
+
+    def __contains__(self, filename: str) -> bool:
+        return self.conn.execute("SELECT 1 FROM files WHERE name = ?", (filename,)).fetchone() is not None
+
+    def get(self, filename: str) -> Optional[str]:
+        row = self.conn.execute("SELECT url FROM files WHERE name = ?", (filename,)).fetchone()
+        return row[0] if row else None
+
+    def add(self, filename: str, url: str) -> bool:
+        cursor = self.conn.execute("INSERT OR IGNORE INTO files (name, url) VALUES (?, ?)", (filename, url))
+        return cursor.rowcount == 1
+
+    def items(self) -> Iterator[Tuple[str, str]]:
+        return iter(self.conn.execute("SELECT name, url FROM files ORDER BY name"))
+
+    def count(self) -> int:
+        return self.conn.execute("SELECT COUNT(*) FROM files").fetchone()[0]
+
+    def commit(self) -> None:
+        self.conn.executemany(
+            "INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)",
+            [(key, json.dumps(value)) for key, value in self.meta.items()],
+        )
+        self.conn.commit()
+
+    def close(self) -> None:
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+
+def _encode_numbers(nums: array) -> bytes:
+    """Sorted EFTA numbers as zlib-compressed little-endian ``uint32`` deltas."""
+    deltas = array("I", nums[:1])
+    deltas.extend(map(sub, nums[1:], nums[:-1]))
+    if sys.byteorder == "big":
+        deltas.byteswap()
+    return zlib.compress(deltas.tobytes(), 6)
+
+
+def _decode_numbers(body: bytes) -> array:
+    deltas = array("I")
+    deltas.frombytes(zlib.decompress(body))
+    if sys.byteorder == "big":
+        deltas.byteswap()
+    return array("I", accumulate(deltas))
+
+
+class EftaIndexStore(IndexStore):
+    """
+    Compact index keyed by EFTA number (``dataset{N}-index.efta``).
+
+    Canonical ``EFTA{8 digits}.pdf`` entries whose URL is the dataset's
+    shared prefix plus the filename are kept only as a sorted
+    ``array('I')`` of numbers; their URLs are rebuilt on access. The prefix
+    comes from the first such URL added and is compared unquoted, the form
+    the scraper stores, so ``get_pdf_url``'s ``DataSet%20N`` URLs share it
+    with scraped ``DataSet N`` ones. Anything else is kept verbatim as an
+    exception. A million
+    entries take about 4 MB in memory and a few KB on disk.
+
+    The file is a JSON header line (prefix, meta, exceptions, body length),
+    the numbers as zlib-compressed deltas, then one JSON line per commit
+    with the numbers added since the snapshot. Once that journal grows
+    past an eighth of the snapshot, commit rewrites the file. A torn final
+    journal line is ignored on load, like ``LogIndexStore``.
+    """
+
+    suffix = ".efta"
+    # Journaled numbers before a commit rewrites the snapshot
+    _COMPACT_MIN = 65536
+
+    def __init__(self, path: Path):
+        super().__init__(path)
+        self._nums: Optional[array] = None
+        # Added but not yet merged into the sorted array
+        self._pending: Set[int] = set()
+        # Added since the last commit
+        self._unjournaled: List[int] = []
+        self._new_exceptions: Dict[str, str] = {}
+        self._exceptions: Dict[str, str] = {}
+        self._journaled = 0
+        self.prefix: Optional[str] = None
+        self._handle = None
+
+    def _load(self) -> array:
+        if self._nums is not None:
+            return self._nums
+        self._nums = array("I")
+        meta = _default_meta()
+        if self.path.exists():
+            with open(self.path, "rb") as f:
+                header = json.loads(f.readline())
+                prefix = header.get("prefix")
+                self.prefix = unquote(prefix) if prefix is not None else None
+                self._exceptions = header.get("x", {})
+                meta.update(header.get("meta", {}))
+                self._nums = _decode_numbers(f.read(header["body"]))
+                good_size = f.tell()
+                for raw in f:
+                    try:
+                        record = json.loads(raw)
+                    except ValueError:
+                        break  # Torn write from a crash; drop the tail
+                    if not raw.endswith(b"\n"):
+                        break
+                    good_size += len(raw)
+                    self._pending.update(record.get("n", ()))
+                    self._exceptions.update(record.get("x", {}))
+                    self._journaled += len(record.get("n", ()))
+                    if "meta" in record:
+                        meta.update(record["meta"])
+            if good_size != self.path.stat().st_size:
+                with open(self.path, "r+b") as f:
+                    f.truncate(good_size)
+            self._merge()
+        if self._meta is None:
+            meta.pop("count", None)
+            self._meta = meta
+        return self._nums
+
+    def _load_meta(self) -> None:
+        if self._nums is None:
+            self._load()
+
+    def _merge(self) -> None:
+        """Fold pending numbers into the sorted array."""
+        if self._pending:
+            self._nums = array("I", sorted(chain(self._nums, self._pending)))
+            self._pending = set()
+
+    def _has_number(self, num: int) -> bool:
+        nums = self._load()
+        if num in self._pending:
+            return True
+        i = bisect_left(nums, num)
+        return i < len(nums) and nums[i] == num
+
+    def __contains__(self, filename: str) -> bool:
+        self._load()
+        if filename in self._exceptions:
+            return True
+        num = parse_efta(filename)
+        return num is not None and self._has_number(num)
+
+    def get(self, filename: str) -> Optional[str]:
+        self._load()
+        if filename in self._exceptions:
+            return self._exceptions[filename]
+        num = parse_efta(filename)
+        if num is not None and self._has_number(num):
+            return self.prefix + filename
+        return None
+
+    def add(self, filename: str, url: str) -> bool:
+        if filename in self:
+            return False
+        num = parse_efta(filename)
+        plain = unquote(url)
+        if num is not None and self.prefix is None and plain.endswith("/" + filename):
+            self.prefix = plain[: -len(filename)]
+        if num is not None and plain == f"{self.prefix}{filename}":
+            self._pending.add(num)
+            self._unjournaled.append(num)
+            if len(self._pending) >= self._COMPACT_MIN:
+                self._merge()
+        else:
+            self._exceptions[filename] = url
+            self._new_exceptions[filename] = url
+        return True
+
+    def numbers(self) -> array:
+        """Sorted EFTA numbers of the compact (non-exception) entries."""
+        self._load()
+        self._merge()
+        return self._nums
+
+    def items(self) -> Iterator[Tuple[str, str]]:
+        prefix = self.prefix
+        compact = ((name, prefix + name) for name in map(efta_filename, array("I", self.numbers())))
+        exceptions = sorted(self._exceptions.items())
+        return heapq.merge(compact, exceptions)
+
+    def filenames(self) -> Iterator[str]:
+        return heapq.merge(map(efta_filename, array("I", self.numbers())), sorted(self._exceptions))
+
+    def count(self) -> int:
+        return len(self._load()) + len(self._pending) + len(self._exceptions)
+
+    def commit(self) -> None:
+        self._load()
+        if not self.path.exists() or self._journaled + len(self._unjournaled) > max(
+            self._COMPACT_MIN, len(self._nums) // 8
+        ):
+            self._write_snapshot()
+            return
+        if self._handle is None:
+            self._handle = open(self.path, "ab")
+        record = {"meta": {**self.meta, "count": self.count()}}
+        if self._unjournaled:
+            record["n"] = sorted(self._unjournaled)
+        if self._new_exceptions:
+            record["x"] = self._new_exceptions
+        self._handle.write(json.dumps(record, separators=(",", ":")).encode() + b"\n")
+        self._handle.flush()
+        os.fsync(self._handle.fileno())
+        self._journaled += len(self._unjournaled)
+        self._unjournaled = []
+        self._new_exceptions = {}
+
+    def _write_snapshot(self) -> None:
+        self.close()
+        self._merge()
+        body = _encode_numbers(self._nums)
+        header = {
+            "format": "efta-index",
+            "version": 1,
+            "prefix": self.prefix,
+            "meta": {**self.meta, "count": self.count()},
+            "x": self._exceptions,
+            "body": len(body),
+        }
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_name(self.path.name + ".tmp")
+        with open(tmp, "wb") as f:
+            f.write(json.dumps(header, separators=(",", ":")).encode() + b"\n")
+            f.write(body)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self.path)
+        self._journaled = 0
+        self._unjournaled = []
+        self._new_exceptions = {}
+
+    def close(self) -> None:
+        if self._handle is not None:
+            self._handle.close()
+            self._handle = None
+
+
+_STORE_CLASSES = {
+    "json": JSONIndexStore,
+    "log": LogIndexStore,
+    "sqlite": SQLiteIndexStore,
+    "efta": EftaIndexStore,
+}
+
+
+def index_path(output_dir: Path, dataset_num: int, backend: str) -> Path:
+    """Path of a dataset's index file for the given backend."""
+    return Path(output_dir) / f"dataset{dataset_num}-index{_STORE_CLASSES[backend].suffix}"
+
+
+def detect_backend(output_dir: Path, dataset_num: int) -> Optional[str]:
+    """Return the backend of an existing index, preferring the newest formats."""
+    for backend in ("efta", "sqlite", "log", "json"):
+        if index_path(output_dir, dataset_num, backend).exists():
+            return backend
+    return None
+
+
+def open_index_store(output_dir: Path, dataset_num: int, backend: str = "auto") -> IndexStore:
+    """
+    Open a dataset's index.
+
+    Args:
+        output_dir: Output directory holding the index files
+        dataset_num: Dataset number
+        backend: "json", "log", "sqlite", "efta", or "auto" (use whichever index
+            already exists, falling back to json). Choosing a backend other
+            than the existing one migrates the old index into it.
+    """
+    existing = detect_backend(output_dir, dataset_num)
+    if backend == "auto":
+        backend = existing or "json"
+    elif existing and existing != backend:
+        return migrate_index(output_dir, dataset_num, backend)
+    return _STORE_CLASSES[backend](index_path(output_dir, dataset_num, backend))
+
+
+def migrate_index(output_dir: Path, dataset_num: int, backend: str) -> IndexStore:
+    """
+    Copy an existing index into ``backend`` and retire the old file.
+
+    The old file is renamed to ``<name>.migrated`` only after the new store
+    has been committed, so an interrupted migration can simply be re-run.
+    """
+    source_backend = detect_backend(output_dir, dataset_num)
+    target = _STORE_CLASSES[backend](index_path(output_dir, dataset_num, backend))
+    if source_backend is None or source_backend == backend:
+        return target
+
+    source = _STORE_CLASSES[source_backend](index_path(output_dir, dataset_num, source_backend))
+    console.print(f"[yellow]Migrating {source.path.name} -> {target.path.name}...[/yellow]")
+
+    for filename, url in source.items():
+        target.add(filename, url)
+    target.meta.update(source.meta)
+    target.commit()
+    count = target.count()
+    source.close()
+
+    os.replace(source.path, source.path.with_name(source.path.name + ".migrated"))
+    console.print(f"[green]Migrated {count} entries[/green]")
+    return target
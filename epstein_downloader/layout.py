@@ -0,0 +1,147 @@
+"""On-disk layouts for dataset PDF directories."""
+
+import os
+import re
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Iterator, List, Tuple
+
+from rich.console import Console
+
+from .efta_bitmap import parse_efta
+
+console = Console()
+
+LAYOUTS = ("flat", "sharded")
+
+# Shard directories hold 10,000 consecutive EFTA numbers: EFTA0123/EFTA01234567.pdf
+_SHARD_RE = re.compile(r"^EFTA\d{4}$")
+
+# Sidecars written next to a file while it downloads: the aria2c control
+# file, and the native engine's partial data and segment state. Their
+# presence means the download has not finished.
+ARIA2_CONTROL_SUFFIX = ".aria2"
+PART_SUFFIX = ".part"
+PART_STATE_SUFFIX = ".part.json"
+PARTIAL_SUFFIXES = (ARIA2_CONTROL_SUFFIX, PART_SUFFIX, PART_STATE_SUFFIX)
+
+
+def shard_name(filename: str) -> str:
+    """Shard directory for a canonical EFTA filename ("" for other names)."""
+    return filename[:8] if parse_efta(filename) is not None else ""
+
+
+def detect_layout(pdf_dir: Path) -> str:
+    """``sharded`` if the directory already contains shard subdirectories."""
+    if not pdf_dir.is_dir():
+        return "flat"
+    with os.scandir(pdf_dir) as it:
+        for entry in it:
+            if _SHARD_RE.match(entry.name) and entry.is_dir():
+                return "sharded"
+    return "flat"
+
+
+def resolve_layout(pdf_dir: Path, layout: str = "auto") -> str:
+    """Turn ``auto`` into the layout the directory already uses."""
+    return detect_layout(pdf_dir) if layout == "auto" else layout
+
+
+def pdf_path(pdf_dir: Path, filename: str, layout: str = "flat") -> Path:
+    """
+    Where a PDF lives (or should be written) under a given layout.
+
+    An existing copy in the other layout wins, so switching layouts never
+    downloads a file twice. Names outside the EFTA scheme always stay flat.
+    """
+    flat = pdf_dir / filename
+    shard = shard_name(filename)
+    if not shard:
+        return flat
+    sharded = pdf_dir / shard / filename
+    if layout == "sharded":
+        return flat if flat.exists() else sharded
+    return sharded if sharded.exists() else flat
+
+
+def scan_pdf_entries(pdf_dir: Path) -> Iterator[os.DirEntry]:
+    """``os.DirEntry`` of every ``*.pdf`` file in a dataset's PDF directory, in either layout."""
+    if not pdf_dir.is_dir():
+        return
+    shards: List[str] = []
+    with os.scandir(pdf_dir) as it:
+        for entry in it:
+            if entry.name.endswith(".pdf") and entry.is_file():
+                yield entry
+            elif _SHARD_RE.match(entry.name) and entry.is_dir():
+                shards.append(entry.path)
+    for shard in shards:
+        with os.scandir(shard) as it:
+            for entry in it:
+                if entry.name.endswith(".pdf") and entry.is_file():
+                    yield entry
+
+
+def scan_pdf_names(pdf_dir: Path) -> Iterator[str]:
+    """Names of ``*.pdf`` files in a dataset's PDF directory, in either layout."""
+    for entry in scan_pdf_entries(pdf_dir):
+        yield entry.name
+
+
+def _move(src: Path, dst: Path) -> bool:
+    """Move a PDF and its sidecars, or just the sidecars of an unfinished one."""
+    if dst.exists():
+        return False
+    if src.exists():
+        os.replace(src, dst)
+    for suffix in PARTIAL_SUFFIXES:
+        side = src.with_name(src.name + suffix)
+        if side.exists():
+            os.replace(side, dst.with_name(dst.name + suffix))
+    return True
+
+
+def _pdf_name(name: str) -> str:
+    """PDF filename a directory entry belongs to ("" if it is neither a PDF nor a sidecar)."""
+    if name.endswith(".pdf"):
+        return name
+    # ".part.json" before ".part" so X.pdf.part.json maps to X.pdf
+    for suffix in sorted(PARTIAL_SUFFIXES, key=len, reverse=True):
+        if name.endswith(suffix) and name[: -len(suffix)].endswith(".pdf"):
+            return name[: -len(suffix)]
+    return ""
+
+
+def migrate_to_sharded(pdf_dir: Path, workers: int = 8) -> Tuple[int, int]:
+    """
+    Move a flat PDF directory into EFTA shards.
+
+    Shard directories are created up front, then renames (with any
+    ``.aria2`` / ``.part`` sidecars) run on a thread pool. Sidecars of
+    downloads that have not finished yet are moved too, so the download
+    resumes in the shard instead of restarting. Renames stay on
+    one filesystem, so an interrupted migration leaves every file intact
+    in one place or the other and can simply be re-run.
+
+    Args:
+        pdf_dir: Dataset PDF directory
+        workers: Renames in flight
+
+    Returns:
+        (PDFs or partial downloads moved, ones skipped because the shard
+        copy already exists)
+    """
+    with os.scandir(pdf_dir) as it:
+        names = {_pdf_name(e.name) for e in it if e.is_file()}
+    names.discard("")
+    moves = [(pdf_dir / n, pdf_dir / shard_name(n) / n) for n in sorted(names) if shard_name(n)]
+    if not moves:
+        return 0, 0
+
+    for shard in {dst.parent for _, dst in moves}:
+        shard.mkdir(exist_ok=True)
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        results = [ok for ok in pool.map(lambda m: _move(*m), moves, chunksize=256)]
+    moved = sum(results)
+    return moved, len(results) - moved
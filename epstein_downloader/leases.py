@@ -0,0 +1,500 @@
+"""Lease-based work sharing so several machines can build one dataset together."""
+
+import json
+import os
+import socket
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import asdict, astuple, dataclass
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from rich.console import Console
+
+from . import metrics
+from .adaptive import AdaptiveController
+from .config import DOJ_BASE_URL
+from .downloader import Downloader
+from .enumerator import EftaEnumerator
+from .index_store import detect_backend, open_index_store
+from .layout import pdf_path, resolve_layout
+from .manifest import Manifest
+from .partition import PageRangeScraper
+from .scraper import DatasetScraper
+
+console = Console()
+
+BACKENDS = ("sqlite", "file")
+KINDS = ("pages", "efta")
+
+FREE = "free"
+LEASED = "leased"
+DONE = "done"
+FAILED = "failed"
+
+# A range is given up on after this many leases ended without completing it
+MAX_ATTEMPTS = 3
+# A file-store lock older than this is assumed to belong to a dead process
+_STALE_LOCK_SECONDS = 30.0
+
+
+@dataclass
+class Lease:
+    """One range of pages or EFTA numbers and who, if anyone, is working on it."""
+    dataset: int
+    kind: str
+    first: int
+    last: int
+    state: str = FREE
+    owner: str = ""
+    expires: float = 0.0
+    attempts: int = 0
+
+    @property
+    def key(self) -> Tuple[int, str, int]:
+        return (self.dataset, self.kind, self.first)
+
+    def expired(self, now: float) -> bool:
+        return self.state == LEASED and self.expires <= now
+
+
+class LeaseStore:
+    """
+    Base class for the coordination store shared by all workers.
+
+    Every operation runs as one read-modify-write transaction under the
+    backend's lock, so a range is only ever handed to one live worker. A
+    lease that is not renewed before it expires goes back to the pool and
+    the next ``acquire`` may hand it to someone else.
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+
+    def _transaction(self):
+        """Context manager yielding every range under the store lock; changes are saved on exit."""
+        raise NotImplementedError
+
+    def plan(self, dataset: int, kind: str, first: int, last: int, chunk: int) -> int:
+        """
+        Split ``first..last`` into ranges of ``chunk`` and add them to the pool.
+
+        Idempotent: ranges that already exist are kept with their state, and
+        a plan that reaches further than before only adds the new tail.
+
+        Returns:
+            Number of ranges added
+        """
+        with self._transaction() as ranges:
+            planned = [r for r in ranges if r.dataset == dataset and r.kind == kind]
+            if planned:
+                first = max(first, max(r.last for r in planned) + 1)
+            added = 0
+            for start in range(first, last + 1, chunk):
+                ranges.append(Lease(dataset, kind, start, min(start + chunk - 1, last)))
+                added += 1
+        return added
+
+    def acquire(self, dataset: int, kind: str, worker: str, ttl: float) -> Optional[Lease]:
+        """Lease the lowest free (or expired) range, or None if none is available."""
+        now = time.time()
+        with self._transaction() as ranges:
+            for lease in sorted(ranges, key=lambda r: r.first):
+                if lease.dataset != dataset or lease.kind != kind:
+                    continue
+                if lease.state != FREE and not lease.expired(now):
+                    continue
+                if lease.attempts >= MAX_ATTEMPTS:
+                    lease.state, lease.owner = FAILED, ""
+                    continue
+                if lease.state == LEASED:
+                    metrics.event("lease_expired", dataset=dataset, kind=kind, first=lease.first,
+                                  owner=lease.owner)
+                lease.state, lease.owner, lease.expires = LEASED, worker, now + ttl
+                lease.attempts += 1
+                return Lease(**asdict(lease))
+        return None
+
+    def _update(self, lease: Lease, apply) -> bool:
+        with self._transaction() as ranges:
+            for current in ranges:
+                if current.key == lease.key:
+                    return apply(current)
+        return False
+
+    def renew(self, lease: Lease, ttl: float) -> bool:
+        """Extend a lease; False if it expired and was handed to someone else."""
+        def apply(current: Lease) -> bool:
+            if current.state != LEASED or current.owner != lease.owner:
+                return False
+            current.expires = time.time() + ttl
+            return True
+        return self._update(lease, apply)
+
+    def complete(self, lease: Lease) -> bool:
+        """Mark a range done (also if its lease lapsed meanwhile: the work is still valid)."""
+        def apply(current: Lease) -> bool:
+            current.state, current.owner, current.expires = DONE, lease.owner, 0.0
+            return True
+        return self._update(lease, apply)
+
+    def release(self, lease: Lease) -> bool:
+        """Give a range back unfinished; it fails for good after ``MAX_ATTEMPTS`` leases."""
+        def apply(current: Lease) -> bool:
+            if current.state != LEASED or current.owner != lease.owner:
+                return False
+            current.state = FAILED if current.attempts >= MAX_ATTEMPTS else FREE
+            current.owner, current.expires = "", 0.0
+            return True
+        return self._update(lease, apply)
+
+    def reset_failed(self, dataset: int, kind: str) -> int:
+        """Put failed ranges back into the pool with a fresh attempt budget."""
+        with self._transaction() as ranges:
+            failed = [r for r in ranges if r.dataset == dataset and r.kind == kind and r.state == FAILED]
+            for lease in failed:
+                lease.state, lease.attempts = FREE, 0
+        return len(failed)
+
+    def ranges(self, dataset: Optional[int] = None, kind: Optional[str] = None) -> List[Lease]:
+        """Snapshot of the planned ranges, in order."""
+        with self._transaction() as ranges:
+            selected = [
+                Lease(**asdict(r)) for r in ranges
+                if (dataset is None or r.dataset == dataset) and (kind is None or r.kind == kind)
+            ]
+        return sorted(selected, key=lambda r: (r.dataset, r.kind, r.first))
+
+    def close(self) -> None:
+        """Release any open handles."""
+
+
+class SQLiteLeaseStore(LeaseStore):
+    """
+    Leases in a SQLite database, locked with ``BEGIN IMMEDIATE``.
+
+    Use on a local disk (several workers on one machine) or a shared
+    filesystem with working POSIX locks.
+    """
+
+    suffix = ".sqlite"
+
+    def __init__(self, path: Path):
+        super().__init__(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(str(self.path), timeout=60, isolation_level=None, check_same_thread=False)
+        self._lock = threading.Lock()
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS ranges ("
+            " dataset INTEGER, kind TEXT, first INTEGER, last INTEGER, state TEXT,"
+            " owner TEXT, expires REAL, attempts INTEGER, PRIMARY KEY (dataset, kind, first))"
+        )
+
+    @contextmanager
+    def _transaction(self) -> Iterator[List[Lease]]:
+        with self._lock:
+            self.conn.execute("BEGIN IMMEDIATE")
+            try:
+                rows = self.conn.execute(
+                    "SELECT dataset, kind, first, last, state, owner, expires, attempts FROM ranges"
+                ).fetchall()
+                ranges = [Lease(*row) for row in rows]
+                before = {lease.key: astuple(lease) for lease in ranges}
+                yield ranges
+                changed = [astuple(r) for r in ranges if before.get(r.key) != astuple(r)]
+                self.conn.executemany("INSERT OR REPLACE INTO ranges VALUES (?, ?, ?, ?, ?, ?, ?, ?)", changed)
+                self.conn.execute("COMMIT")
+            except BaseException:
+                self.conn.execute("ROLLBACK")
+                raise
+
+    def close(self) -> None:
+        self.conn.close()
+
+
+class FileLeaseStore(LeaseStore):
+    """
+    Leases in a JSON file, locked with an exclusively created ``.lock`` file.
+
+    For shared filesystems such as NFS where SQLite's byte-range locks are
+    unreliable; the file is rewritten atomically on every change.
+    """
+
+    suffix = ".json"
+
+    def __init__(self, path: Path):
+        super().__init__(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.lock_path = self.path.with_name(self.path.name + ".lock")
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def _locked(self) -> Iterator[None]:
+        while True:
+            try:
+                fd = os.open(self.lock_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+                break
+            except FileExistsError:
+                try:
+                    if time.time() - self.lock_path.stat().st_mtime > _STALE_LOCK_SECONDS:
+                        self.lock_path.unlink(missing_ok=True)
+                        continue
+                except FileNotFoundError:
+                    continue
+                time.sleep(0.05)
+        try:
+            os.write(fd, f"{socket.gethostname()} {os.getpid()}".encode())
+            os.close(fd)
+            yield
+        finally:
+            self.lock_path.unlink(missing_ok=True)
+
+    @contextmanager
+    def _transaction(self) -> Iterator[List[Lease]]:
+        with self._lock, self._locked():
+            ranges: List[Lease] = []
+            if self.path.exists():
+                with open(self.path, "r") as f:
+                    ranges = [Lease(**r) for r in json.load(f).get("ranges", [])]
+            yield ranges
+            tmp = self.path.with_name(self.path.name + ".tmp")
+            with open(tmp, "w") as f:
+                json.dump({"ranges": [asdict(r) for r in ranges]}, f)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp, self.path)
+
+
+_STORE_CLASSES = {"sqlite": SQLiteLeaseStore, "file": FileLeaseStore}
+
+
+def open_lease_store(coord_dir: Path, backend: str = "auto") -> LeaseStore:
+    """
+    Open the lease store in a coordination directory.
+
+    Args:
+        coord_dir: Directory every worker can reach (local or shared filesystem)
+        backend: "sqlite", "file", or "auto" (whichever exists, else sqlite)
+    """
+    coord_dir = Path(coord_dir)
+    if backend == "auto":
+        backend = next(
+            (b for b in BACKENDS if (coord_dir / f"leases{_STORE_CLASSES[b].suffix}").exists()), "sqlite",
+        )
+    store_class = _STORE_CLASSES[backend]
+    return store_class(coord_dir / f"leases{store_class.suffix}")
+
+
+def default_worker_id() -> str:
+    """``host-pid``: unique per process across the machines sharing a store."""
+    return f"{socket.gethostname()}-{os.getpid()}"
+
+
+def partial_dir(coord_dir: Path, worker: str) -> Path:
+    """Where a worker keeps the partial index of the files it found."""
+    return Path(coord_dir) / "partials" / worker
+
+
+class LeaseKeeper:
+    """
+    Renews a lease from a background thread every third of its TTL.
+
+    ``lost`` turns true if a renewal finds the range was handed to another
+    worker (this one stalled past the TTL).
+    """
+
+    def __init__(self, store: LeaseStore, lease: Lease, ttl: float):
+        self.store = store
+        self.lease = lease
+        self.ttl = ttl
+        self.lost = False
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.ttl / 3):
+            try:
+                if not self.store.renew(self.lease, self.ttl):
+                    self.lost = True
+                    console.print(
+                        f"[yellow]Lost lease on {self.lease.kind} {self.lease.first}-{self.lease.last}[/yellow]"
+                    )
+                    return
+            except (sqlite3.Error, OSError) as e:
+                console.print(f"[yellow]Lease renewal failed: {e}[/yellow]")
+
+    def __enter__(self) -> "LeaseKeeper":
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._stop.set()
+        self._thread.join()
+
+
+class ShardWorker:
+    """
+    Leases ranges of one dataset until none are left, indexing and downloading each.
+
+    Listing pages (``kind="pages"``) are scraped with ``PageRangeScraper``;
+    EFTA ranges (``kind="efta"``) are probed with ``EftaEnumerator``. Found
+    files go into this worker's partial index under the coordination
+    directory and are downloaded into ``output_dir`` as usual; run
+    ``merge_partials`` once the pool is drained to build the canonical
+    index. Workers share no state besides the lease store, so throughput
+    grows with the number of machines (each with its own egress and
+    per-IP rate limit).
+    """
+
+    def __init__(
+        self,
+        store: LeaseStore,
+        coord_dir: Path,
+        output_dir: Path,
+        dataset_num: int,
+        kind: str = "pages",
+        worker_id: Optional[str] = None,
+        ttl: float = 120.0,
+        concurrency: int = 8,
+        rate_limit: Optional[float] = None,
+        downloader: Optional[Downloader] = None,
+        base_url: str = DOJ_BASE_URL,
+        controller: Optional[AdaptiveController] = None,
+    ):
+        self.store = store
+        self.output_dir = Path(output_dir)
+        self.dataset_num = dataset_num
+        self.kind = kind
+        self.worker_id = worker_id or default_worker_id()
+        self.ttl = ttl
+        self.concurrency = concurrency
+        self.rate_limit = rate_limit
+        self.downloader = downloader
+        self.base_url = base_url
+        self.controller = controller
+        self.partial_dir = partial_dir(coord_dir, self.worker_id)
+        self.partial_dir.mkdir(parents=True, exist_ok=True)
+        self.pdf_dir = self.output_dir / f"dataset{dataset_num}-pdfs"
+        self.completed = 0
+        self.released = 0
+
+    def run(self) -> bool:
+        """
+        Work until every range is done or failed.
+
+        While other workers still hold leases, wait for them: a lease that
+        expires (its worker died) is picked up here.
+
+        Returns:
+            True if no range this worker leased had to be released
+        """
+        console.print(f"[bold]Worker {self.worker_id}: Dataset {self.dataset_num} {self.kind} ranges[/bold]")
+        while True:
+            lease = self.store.acquire(self.dataset_num, self.kind, self.worker_id, self.ttl)
+            if lease is None:
+                if any(r.state in (FREE, LEASED) for r in self.store.ranges(self.dataset_num, self.kind)):
+                    time.sleep(min(5.0, self.ttl / 3))
+                    continue
+                break
+
+            console.print(f"[cyan]Leased {lease.kind} {lease.first}-{lease.last}[/cyan] (attempt {lease.attempts})")
+            metrics.event("lease", dataset=self.dataset_num, kind=lease.kind, first=lease.first,
+                          last=lease.last, worker=self.worker_id, attempt=lease.attempts)
+            with LeaseKeeper(self.store, lease, self.ttl) as keeper:
+                try:
+                    ok = self._work(lease)
+                except Exception as e:
+                    console.print(f"[red]Error on {lease.kind} {lease.first}-{lease.last}: {e}[/red]")
+                    ok = False
+
+            if ok:
+                self.store.complete(lease)
+                self.completed += 1
+            else:
+                self.store.release(lease)
+                self.released += 1
+            metrics.event("lease_done", dataset=self.dataset_num, kind=lease.kind, first=lease.first,
+                          worker=self.worker_id, ok=ok, lost=keeper.lost)
+
+        console.print(
+            f"[green]Worker {self.worker_id}: {self.completed} ranges completed[/green]"
+            + (f", [red]{self.released} released[/red]" if self.released else "")
+        )
+        return self.released == 0
+
+    def _work(self, lease: Lease) -> bool:
+        """Index one range into the partial index, then download what it found."""
+        if lease.kind == "pages":
+            scraper = DatasetScraper(
+                self.partial_dir, self.dataset_num, index_backend="log", quiet=True,
+                base_url=self.base_url, controller=self.controller,
+            )
+            span = lease.last - lease.first + 1
+            chunk = max(1, -(-span // self.concurrency))
+            new_urls = PageRangeScraper(scraper, chunk_size=chunk).scrape_range(
+                lease.first, lease.last, workers=self.concurrency, rate_limit=self.rate_limit,
+            )
+            store = scraper.store
+        else:
+            enumerator = EftaEnumerator(
+                self.partial_dir, self.dataset_num, index_backend="log",
+                concurrency=self.concurrency, rate_limit=self.rate_limit,
+            )
+            new_urls = enumerator.run(start=lease.first, end=lease.last)
+            store = enumerator.store
+
+        if self.downloader is None:
+            return True
+        if lease.attempts > 1:
+            # An earlier attempt may have indexed files without downloading them
+            new_urls = new_urls + self._undownloaded(store, set(new_urls))
+        return self.downloader.download_pdf_list(new_urls, self.pdf_dir)
+
+    def _undownloaded(self, store, skip: set) -> List[str]:
+        """Partial-index URLs whose files are not in the PDF directory."""
+        layout = resolve_layout(self.pdf_dir, self.downloader.layout)
+        return [
+            url for name, url in store.items()
+            if url not in skip and not pdf_path(self.pdf_dir, name, layout).exists()
+        ]
+
+
+def merge_partials(coord_dir: Path, output_dir: Path, dataset_num: int, index_backend: str = "auto") -> Dict[str, int]:
+    """
+    Merge every worker's partial index for a dataset into the canonical index.
+
+    Safe to re-run: entries already present are skipped. The canonical index
+    is marked complete once all of the dataset's page ranges are done.
+
+    Returns:
+        ``{worker: entries added}``
+    """
+    output_dir = Path(output_dir)
+    target = open_index_store(output_dir, dataset_num, index_backend)
+    added: Dict[str, int] = {}
+    partials = Path(coord_dir) / "partials"
+    for worker_dir in sorted(p for p in partials.iterdir() if p.is_dir()) if partials.is_dir() else []:
+        backend = detect_backend(worker_dir, dataset_num)
+        if backend is None:
+            continue
+        source = open_index_store(worker_dir, dataset_num, backend)
+        added[worker_dir.name] = sum(1 for name, url in source.items() if target.add(name, url))
+        target.meta["last_page"] = max(target.meta.get("last_page", 0), source.meta.get("last_page", 0))
+        source.close()
+
+    store = open_lease_store(coord_dir)
+    try:
+        pages = store.ranges(dataset_num, "pages")
+    finally:
+        store.close()
+    if pages and all(r.state == DONE for r in pages):
+        target.meta["complete"] = True
+    target.commit()
+    Manifest(output_dir).update_index(
+        dataset_num, target.count(),
+        last_page=target.meta.get("last_page", 0), complete=target.meta.get("complete", False),
+    )
+    target.close()
+    return added
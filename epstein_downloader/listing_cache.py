@@ -0,0 +1,147 @@
+"""On-disk HTTP validator cache for listing pages."""
+
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional
+
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+
+@dataclass
+class CachedPage:
+    """Validators and extracted links from the last fetch of a listing page."""
+    etag: Optional[str]
+    last_modified: Optional[str]
+    content_hash: str
+    links: List[str]
+
+
+def content_hash(body: bytes) -> str:
+    """Hash of a listing page body used to detect unchanged content."""
+    return hashlib.sha256(body).hexdigest()
+
+
+class ListingCache:
+    """
+    Stores ETag / Last-Modified / content hash and extracted links per
+    ``(dataset, page)`` in ``listing-cache.sqlite``.
+
+    Re-scrapes send ``If-None-Match`` / ``If-Modified-Since``; on a 304 (or
+    a 200 whose body hashes the same) the cached links are reused and link
+    extraction is skipped. Entries are evicted least-recently-used once the
+    stored size exceeds ``max_bytes``. Safe to share between scraper threads.
+    """
+
+    def __init__(self, path: Path, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.path = Path(path)
+        self.max_bytes = max_bytes
+        self._lock = threading.RLock()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute(
+            """CREATE TABLE IF NOT EXISTS pages (
+                dataset INTEGER NOT NULL,
+                page INTEGER NOT NULL,
+                etag TEXT,
+                last_modified TEXT,
+                content_hash TEXT NOT NULL,
+                links TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                last_used REAL NOT NULL,
+                PRIMARY KEY (dataset, page)
+            )"""
+        )
+        self.conn.execute("CREATE INDEX IF NOT EXISTS pages_lru ON pages (last_used)")
+        self.total_bytes = self.conn.execute("SELECT COALESCE(SUM(size), 0) FROM pages").fetchone()[0]
+
+    def get(self, dataset: int, page: int) -> Optional[CachedPage]:
+        """Return the cached entry for a page, marking it recently used."""
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT etag, last_modified, content_hash, links FROM pages WHERE dataset = ? AND page = ?",
+                (dataset, page),
+            ).fetchone()
+            if row is None:
+                return None
+            self.conn.execute(
+                "UPDATE pages SET last_used = ? WHERE dataset = ? AND page = ?",
+                (time.time(), dataset, page),
+            )
+        return CachedPage(etag=row[0], last_modified=row[1], content_hash=row[2], links=json.loads(row[3]))
+
+    def put(
+        self,
+        dataset: int,
+        page: int,
+        etag: Optional[str],
+        last_modified: Optional[str],
+        body_hash: str,
+        links: List[str],
+    ) -> None:
+        """Store validators and links for a freshly fetched page."""
+        links_json = json.dumps(links, separators=(",", ":"))
+        size = len(links_json) + len(body_hash) + len(etag or "") + len(last_modified or "")
+
+        with self._lock:
+            old = self.conn.execute(
+                "SELECT size FROM pages WHERE dataset = ? AND page = ?", (dataset, page),
+            ).fetchone()
+            if old:
+                self.total_bytes -= old[0]
+
+            self.conn.execute(
+                "INSERT OR REPLACE INTO pages VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (dataset, page, etag, last_modified, body_hash, links_json, size, time.time()),
+            )
+            self.total_bytes += size
+            if self.total_bytes > self.max_bytes:
+                self.evict()
+
+    def evict(self, target_ratio: float = 0.9) -> int:
+        """Drop least-recently-used entries until under ``target_ratio`` of the cap."""
+        target = self.max_bytes * target_ratio
+        evicted = 0
+        with self._lock:
+            while self.total_bytes > target:
+                rows = self.conn.execute(
+                    "SELECT dataset, page, size FROM pages ORDER BY last_used LIMIT 500"
+                ).fetchall()
+                if not rows:
+                    break
+                for dataset, page, size in rows:
+                    self.conn.execute("DELETE FROM pages WHERE dataset = ? AND page = ?", (dataset, page))
+                    self.total_bytes -= size
+                    evicted += 1
+                    if self.total_bytes <= target:
+                        break
+            self.conn.commit()
+        return evicted
+
+    def commit(self) -> None:
+        """Flush pending cache writes."""
+        with self._lock:
+            self.conn.commit()
+
+    def close(self) -> None:
+        with self._lock:
+            self.conn.commit()
+            self.conn.close()
+
+
+def conditional_headers(entry: Optional[CachedPage]) -> Dict[str, str]:
+    """Request headers that let the server answer 304 Not Modified."""
+    headers: Dict[str, str] = {}
+    if entry is None:
+        return headers
+    if entry.etag:
+        headers["If-None-Match"] = entry.etag
+    if entry.last_modified:
+        headers["If-Modified-Since"] = entry.last_modified
+    return headers
@@ -0,0 +1,240 @@
+"""Download manifest: running file/byte totals so ``status`` needn't walk the tree."""
+
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Tuple
+
+from rich.console import Console
+
+from . import metrics
+from .config import LISTING_DATASETS
+from .index_store import detect_backend, open_index_store
+from .layout import PARTIAL_SUFFIXES
+
+console = Console()
+
+MANIFEST_FILENAME = "manifest.json"
+
+# One lock per manifest file, shared by every Manifest instance in the
+# process (scheduler jobs each hold their own Downloader / scraper)
+_locks: Dict[str, threading.Lock] = {}
+_locks_guard = threading.Lock()
+
+
+def _lock_for(path: Path) -> threading.Lock:
+    key = str(Path(path).resolve())
+    with _locks_guard:
+        return _locks.setdefault(key, threading.Lock())
+
+
+def pdf_location(dataset_num: int) -> str:
+    """Manifest location key for a dataset's PDF directory."""
+    return f"dataset{dataset_num}-pdfs"
+
+
+def _is_complete(path: Path) -> bool:
+    """A file counts once it exists and no partial-download marker remains."""
+    if not path.is_file():
+        return False
+    return not any(path.with_name(path.name + s).exists() for s in PARTIAL_SUFFIXES)
+
+
+class Manifest:
+    """
+    Maintains ``manifest.json`` in the output directory.
+
+    Download paths add the files they complete (count and bytes per
+    location) and scrapers record their index size and completion, so
+    ``status`` reads one small JSON file instead of stat-ing every PDF and
+    loading every index. ``rescan`` rebuilds it from disk when it has
+    drifted (files deleted by hand, downloads queued without waiting).
+
+    Layout::
+
+        {"updated": 1700000000.0,
+         "locations": {"zips": {"files": 9, "bytes": 123}, "dataset9-pdfs": {...}},
+         "datasets": {"9": {"indexed": 1000, "last_page": 20, "complete": false}}}
+    """
+
+    def __init__(self, output_dir: Path):
+        self.output_dir = Path(output_dir)
+        self.path = self.output_dir / MANIFEST_FILENAME
+        self._lock = _lock_for(self.path)
+
+    def exists(self) -> bool:
+        return self.path.exists()
+
+    def load(self) -> dict:
+        """Return the manifest (empty skeleton if missing or unreadable)."""
+        data = {}
+        if self.path.exists():
+            try:
+                with open(self.path, "r") as f:
+                    data = json.load(f)
+            except (OSError, ValueError):
+                data = {}
+        data.setdefault("updated", None)
+        data.setdefault("locations", {})
+        data.setdefault("datasets", {})
+        return data
+
+    def _write(self, data: dict) -> None:
+        data["updated"] = time.time()
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_name(self.path.name + ".tmp")
+        with open(tmp, "w") as f:
+            json.dump(data, f, indent=2)
+        os.replace(tmp, self.path)
+
+    def _update(self, mutate: Callable[[dict], None]) -> None:
+        with self._lock:
+            data = self.load()
+            mutate(data)
+            self._write(data)
+
+    def add_files(self, location: str, paths: Iterable[Path]) -> int:
+        """
+        Count newly completed downloads into a location's totals.
+
+        Callers pass only targets that did not exist before the download,
+        so files are never counted twice; targets that failed or are still
+        partial are ignored.
+
+        Returns:
+            Number of files added
+        """
+        complete = [Path(p) for p in paths if _is_complete(Path(p))]
+        if not complete:
+            return 0
+        added_bytes = sum(p.stat().st_size for p in complete)
+        metrics.FILES_COMPLETED.inc(len(complete), location=location)
+        metrics.BYTES_COMPLETED.inc(added_bytes, location=location)
+
+        def mutate(data: dict) -> None:
+            loc = data["locations"].setdefault(location, {"files": 0, "bytes": 0})
+            loc["files"] += len(complete)
+            loc["bytes"] += added_bytes
+
+        self._update(mutate)
+        return len(complete)
+
+    def set_location(self, location: str, files: int, total_bytes: int) -> None:
+        """Replace a location's totals (after scanning it)."""
+        def mutate(data: dict) -> None:
+            data["locations"][location] = {"files": files, "bytes": total_bytes}
+
+        self._update(mutate)
+
+    def update_index(self, dataset_num: int, indexed: int, last_page: int = 0, complete: bool = False) -> None:
+        """Record a dataset's index size and scrape progress."""
+        def mutate(data: dict) -> None:
+            data["datasets"][str(dataset_num)] = {
+                "indexed": indexed,
+                "last_page": last_page,
+                "complete": complete,
+            }
+
+        self._update(mutate)
+
+    def _targets(self) -> Dict[str, Tuple[Path, str, bool]]:
+        """Location name -> (directory, filename suffix, recurse)."""
+        targets = {
+            "torrents": (self.output_dir / "torrents", "", True),
+            "zips": (self.output_dir / "zips", ".zip", False),
+        }
+        for n in LISTING_DATASETS:
+            # Recurse so sharded layouts (EFTA0123/...) are counted too
+            targets[pdf_location(n)] = (self.output_dir / pdf_location(n), ".pdf", True)
+        return targets
+
+    def _scan(self, names: List[str], workers: int = 16) -> Dict[str, Tuple[int, int]]:
+        """
+        Total completed files and bytes for the named locations.
+
+        Directories are listed with ``os.scandir`` on a thread pool (one task
+        per directory, recursing into subdirectories where the location
+        allows), which keeps many stat calls in flight on network storage.
+        """
+        targets = self._targets()
+        totals: Dict[str, List[int]] = {name: [0, 0] for name in names}
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            pending = [
+                pool.submit(_scan_dir, targets[name][0], targets[name][1], targets[name][2], name)
+                for name in names
+                if targets[name][0].is_dir()
+            ]
+            while pending:
+                name, files, total_bytes, subdirs = pending.pop().result()
+                totals[name][0] += files
+                totals[name][1] += total_bytes
+                suffix, recursive = targets[name][1], targets[name][2]
+                pending += [pool.submit(_scan_dir, d, suffix, recursive, name) for d in subdirs]
+        return {name: (f, b) for name, (f, b) in totals.items()}
+
+    def rescan_location(self, location: str) -> None:
+        """Re-total a single location from disk."""
+        files, total_bytes = self._scan([location])[location]
+        self.set_location(location, files, total_bytes)
+
+    def rescan(self, workers: int = 16) -> dict:
+        """
+        Rebuild the whole manifest from disk.
+
+        Args:
+            workers: Directory scans run in parallel
+
+        Returns:
+            The rebuilt manifest
+        """
+        totals = self._scan([*self._targets()], workers=workers)
+
+        datasets: Dict[str, dict] = {}
+        for n in LISTING_DATASETS:
+            if detect_backend(self.output_dir, n):
+                store = open_index_store(self.output_dir, n)
+                datasets[str(n)] = {
+                    "indexed": store.count(),
+                    "last_page": store.meta.get("last_page", 0),
+                    "complete": store.meta.get("complete", False),
+                }
+                store.close()
+
+        data = {
+            "locations": {name: {"files": f, "bytes": b} for name, (f, b) in totals.items()},
+            "datasets": datasets,
+        }
+        with self._lock:
+            self._write(data)
+        return data
+
+
+def _scan_dir(path: Path, suffix: str, recursive: bool, name: str) -> Tuple[str, int, int, List[Path]]:
+    """Count completed files in one directory; return subdirectories to scan."""
+    files = 0
+    total_bytes = 0
+    subdirs: List[Path] = []
+    names = set()
+    entries = []
+    with os.scandir(path) as it:
+        for entry in it:
+            names.add(entry.name)
+            entries.append(entry)
+
+    for entry in entries:
+        if entry.is_dir(follow_symlinks=False):
+            if recursive:
+                subdirs.append(Path(entry.path))
+            continue
+        if suffix and not entry.name.endswith(suffix):
+            continue
+        if entry.name.endswith(PARTIAL_SUFFIXES):
+            continue
+        if any(entry.name + s in names for s in PARTIAL_SUFFIXES):
+            continue
+        files += 1
+        total_bytes += entry.stat(follow_symlinks=False).st_size
+    return name, files, total_bytes, subdirs
@@ -0,0 +1,315 @@
+"""Run metrics: Prometheus text exposition and a JSON-lines event log."""
+
+import functools
+import json
+import threading
+import time
+from bisect import bisect_left
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from rich.console import Console
+
+console = Console()
+
+# Seconds; wide enough for both listing pages and multi-hour torrents
+DEFAULT_BUCKETS = (
+    0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 300, 900, 3600, 14400,
+)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+class _Metric:
+    """A named metric with one value per label combination."""
+
+    kind = ""
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._values: Dict[Tuple[str, ...], object] = {}
+
+    def _key(self, labels: Dict[str, object]) -> Tuple[str, ...]:
+        return tuple(str(labels.get(name, "")) for name in self.labelnames)
+
+    def _label_text(self, key: Tuple[str, ...], extra: str = "") -> str:
+        pairs = [f'{n}="{_escape(v)}"' for n, v in zip(self.labelnames, key)]
+        if extra:
+            pairs.append(extra)
+        return "{" + ",".join(pairs) + "}" if pairs else ""
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        with self._lock:
+            items = sorted(self._values.items())
+        for key, value in items:
+            lines.extend(self._render_value(key, value))
+        return lines
+
+    def _render_value(self, key: Tuple[str, ...], value) -> List[str]:
+        return [f"{self.name}{self._label_text(key)} {value:g}"]
+
+
+class Counter(_Metric):
+    """Monotonically increasing total."""
+
+    kind = "counter"
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels) -> float:
+        return self._values.get(self._key(labels), 0)
+
+
+class Gauge(_Metric):
+    """Value that can go up and down (queue depths, jobs in flight)."""
+
+    kind = "gauge"
+
+    def set(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount: float = 1, **labels) -> None:
+        self.inc(-amount, **labels)
+
+    def value(self, **labels) -> float:
+        return self._values.get(self._key(labels), 0)
+
+
+class Histogram(_Metric):
+    """Latency distribution in fixed buckets, plus sum and count."""
+
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = (), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, help, labelnames)
+        self.buckets = tuple(buckets)
+
+    def observe(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        slot = bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                # [per-bucket counts (+Inf last), sum, count]
+                state = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            state[0][slot] += 1
+            state[1] += value
+            state[2] += 1
+
+    def count(self, **labels) -> int:
+        state = self._values.get(self._key(labels))
+        return state[2] if state else 0
+
+    def _render_value(self, key: Tuple[str, ...], value) -> List[str]:
+        counts, total, count = value
+        lines = []
+        cumulative = 0
+        for bound, n in zip((*self.buckets, "+Inf"), counts):
+            cumulative += n
+            le = f'le="{bound:g}"' if bound != "+Inf" else 'le="+Inf"'
+            lines.append(f"{self.name}_bucket{self._label_text(key, le)} {cumulative}")
+        lines.append(f"{self.name}_sum{self._label_text(key)} {total:g}")
+        lines.append(f"{self.name}_count{self._label_text(key)} {count}")
+        return lines
+
+
+class Registry:
+    """All metrics of the process, rendered together."""
+
+    def __init__(self):
+        self.metrics: List[_Metric] = []
+
+    def _add(self, metric: _Metric):
+        self.metrics.append(metric)
+        return metric
+
+    def counter(self, name: str, help: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._add(Counter(name, help, labelnames))
+
+    def gauge(self, name: str, help: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self._add(Gauge(name, help, labelnames))
+
+    def histogram(self, name: str, help: str, labelnames: Sequence[str] = (), buckets=DEFAULT_BUCKETS) -> Histogram:
+        return self._add(Histogram(name, help, labelnames, buckets))
+
+    def render(self) -> str:
+        """Prometheus text exposition format."""
+        lines: List[str] = []
+        for metric in self.metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+PAGE_FETCHES = REGISTRY.counter(
+    "epstein_dl_page_fetches_total", "Listing page requests by outcome (ok, not_modified, error)",
+    ["dataset", "outcome"],
+)
+PAGE_FETCH_SECONDS = REGISTRY.histogram(
+    "epstein_dl_page_fetch_seconds", "Listing page request latency", ["dataset"],
+)
+LINKS_EXTRACTED = REGISTRY.counter(
+    "epstein_dl_links_extracted_total", "PDF links found on listing pages", ["dataset"],
+)
+RETRIES = REGISTRY.counter(
+    "epstein_dl_retries_total", "Requests retried after an error", ["stage"],
+)
+DOWNLOADS = REGISTRY.counter(
+    "epstein_dl_downloads_total", "Downloader calls by kind (torrent, zip, pdf_list) and outcome",
+    ["kind", "outcome"],
+)
+DOWNLOAD_SECONDS = REGISTRY.histogram(
+    "epstein_dl_download_seconds", "Duration of Downloader calls", ["kind"],
+)
+FILE_SECONDS = REGISTRY.histogram(
+    "epstein_dl_file_download_seconds", "Per-file download duration (native engine)", ["engine"],
+)
+BYTES_RECEIVED = REGISTRY.counter(
+    "epstein_dl_bytes_received_total", "Bytes received while downloading (native engine, live)", ["engine"],
+)
+FILES_COMPLETED = REGISTRY.counter(
+    "epstein_dl_files_completed_total", "New files completed on disk", ["location"],
+)
+BYTES_COMPLETED = REGISTRY.counter(
+    "epstein_dl_bytes_completed_total", "Bytes of new files completed on disk", ["location"],
+)
+CONCURRENCY_LIMIT = REGISTRY.gauge(
+    "epstein_dl_concurrency_limit", "Current adaptive (AIMD) limit on requests in flight", ["controller"],
+)
+QUEUE_DEPTH = REGISTRY.gauge(
+    "epstein_dl_queue_depth", "Items waiting or in flight per queue", ["queue"],
+)
+
+
+class EventLog:
+    """
+    Appends one JSON object per line: ``{"ts": ..., "event": ..., **fields}``.
+
+    The file is line-buffered so ``tail -f`` and log shippers see events as
+    they happen; writes from scheduler threads are serialized.
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self._file = open(self.path, "a", buffering=1)
+
+    def emit(self, event: str, /, **fields) -> None:
+        line = json.dumps({"ts": round(time.time(), 3), "event": event, **fields}, default=str)
+        with self._lock:
+            if self._file is not None:
+                self._file.write(line + "\n")
+
+    def close(self) -> None:
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+
+_event_log: Optional[EventLog] = None
+
+
+def open_event_log(path: Path) -> EventLog:
+    """Start sending events to a JSON-lines file."""
+    global _event_log
+    _event_log = EventLog(path)
+    return _event_log
+
+
+def event(name: str, /, **fields) -> None:
+    """Record an event (a no-op unless an event log is open)."""
+    if _event_log is not None:
+        _event_log.emit(name, **fields)
+
+
+def page_fetched(dataset: int, page: int, outcome: str, seconds: float, links: int = 0) -> None:
+    """Record one listing page request."""
+    PAGE_FETCHES.inc(dataset=dataset, outcome=outcome)
+    PAGE_FETCH_SECONDS.observe(seconds, dataset=dataset)
+    if links:
+        LINKS_EXTRACTED.inc(links, dataset=dataset)
+    event("page", dataset=dataset, page=page, outcome=outcome, seconds=round(seconds, 4), links=links)
+
+
+def retried(stage: str, target: str, error: object) -> None:
+    """Record a request that failed and will be retried."""
+    RETRIES.inc(stage=stage)
+    event("retry", stage=stage, target=target, error=str(error))
+
+
+def file_downloaded(engine: str, name: str, ok: bool, seconds: float) -> None:
+    """Record one file fetched by a download engine."""
+    FILE_SECONDS.observe(seconds, engine=engine)
+    event("file", engine=engine, name=name, ok=ok, seconds=round(seconds, 4))
+
+
+def instrument_download(kind: str, describe: Optional[Callable[..., dict]] = None):
+    """
+    Decorate a ``Downloader`` method returning success.
+
+    Counts calls by outcome, times them and emits a ``download`` event;
+    ``describe`` maps the call's arguments (without ``self``) to extra
+    event fields.
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(self, *args, **kwargs):
+            start = time.perf_counter()
+            ok = False
+            try:
+                ok = func(self, *args, **kwargs)
+                return ok
+            finally:
+                seconds = time.perf_counter() - start
+                DOWNLOADS.inc(kind=kind, outcome="ok" if ok else "failed")
+                DOWNLOAD_SECONDS.observe(seconds, kind=kind)
+                if _event_log is not None:
+                    fields = describe(*args, **kwargs) if describe else {}
+                    event("download", kind=kind, ok=bool(ok), seconds=round(seconds, 3), **fields)
+        return wrapper
+    return decorator
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self) -> None:
+        if self.path.split("?", 1)[0] not in ("/", "/metrics"):
+            self.send_error(404)
+            return
+        body = REGISTRY.render().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args) -> None:
+        pass
+
+
+def start_metrics_server(port: int, host: str = "127.0.0.1") -> ThreadingHTTPServer:
+    """Serve ``/metrics`` in Prometheus text format from a background thread."""
+    server = ThreadingHTTPServer((host, port), _MetricsHandler)
+    server.daemon_threads = True
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    console.print(f"[dim]Metrics at http://{host}:{server.server_address[1]}/metrics[/dim]")
+    return server
@@ -0,0 +1,319 @@
+"""Pure-Python async download engine (used when aria2c is unavailable)."""
+
+import asyncio
+import json
+import os
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+import aiohttp
+from rich.console import Console
+from rich.progress import (
+    BarColumn,
+    DownloadColumn,
+    Progress,
+    TextColumn,
+    TransferSpeedColumn,
+)
+
+from . import metrics
+from .adaptive import AdaptiveController
+from .layout import PART_STATE_SUFFIX, PART_SUFFIX
+from .transport import async_session, retry_delay
+
+console = Console()
+
+# Bytes read per iteration of a response body
+CHUNK_SIZE = 256 * 1024
+
+# How often (in bytes written per segment) the .part state is flushed
+STATE_FLUSH_BYTES = 8 * 1024 * 1024
+
+
+class _RangeNotSupported(Exception):
+    """Server ignored a Range request."""
+
+
+def _preallocate(f, size: int) -> None:
+    """Reserve ``size`` bytes for ``f`` so segments can be written in place."""
+    if hasattr(os, "posix_fallocate"):
+        try:
+            os.posix_fallocate(f.fileno(), 0, size)
+            return
+        except OSError:
+            pass
+    f.truncate(size)
+
+
+class NativeEngine:
+    """
+    Async HTTP download engine built on aiohttp.
+
+    Large files are fetched as parallel HTTP Range segments written in place
+    into a preallocated ``<name>.part`` file; segment offsets are persisted
+    to ``<name>.part.json`` so interrupted downloads resume where they
+    stopped. Small files stream straight to disk. All requests share one
+    keep-alive connection pool.
+    """
+
+    def __init__(
+        self,
+        concurrent: int = 5,
+        segments: int = 8,
+        min_segment_size: int = 10 * 1024 * 1024,
+        max_tries: int = 5,
+        retry_wait: float = 3.0,
+        timeout: float = 60.0,
+        quiet: bool = False,
+        controller: Optional[AdaptiveController] = None,
+    ):
+        self.concurrent = concurrent
+        self.controller = controller
+        self.quiet = quiet
+        self.segments = segments
+        self.min_segment_size = min_segment_size
+        self.max_tries = max_tries
+        self.retry_wait = retry_wait
+        self.timeout = timeout
+
+    def _session(self) -> aiohttp.ClientSession:
+        files = max(self.concurrent, self.controller.maximum) if self.controller else self.concurrent
+        return async_session(
+            limit=files * self.segments,
+            timeout=aiohttp.ClientTimeout(total=None, sock_read=self.timeout, sock_connect=self.timeout),
+            controller=self.controller,
+        )
+
+    def _files_text(self, finished: int, total: int) -> str:
+        text = f"{finished}/{total} files"
+        return f"{text}  [dim]{self.controller.describe()}[/dim]" if self.controller else text
+
+    def download_file(self, url: str, path: Path, segments: Optional[int] = None) -> bool:
+        """Download a single (typically large) file; blocking wrapper."""
+        results = asyncio.run(self.download_many([(url, Path(path))], segments=segments))
+        return results[url]
+
+    def download_files(
+        self,
+        jobs: List[Tuple[str, Path]],
+        segments: int = 1,
+        on_result: Optional[Callable[[str, Path, bool, float, Optional[int]], None]] = None,
+    ) -> Dict[str, bool]:
+        """Download many files over a shared connection pool; blocking wrapper."""
+        return asyncio.run(self.download_many(jobs, segments=segments, on_result=on_result))
+
+    async def download_many(
+        self,
+        jobs: List[Tuple[str, Path]],
+        segments: Optional[int] = None,
+        on_result: Optional[Callable[[str, Path, bool, float, Optional[int]], None]] = None,
+    ) -> Dict[str, bool]:
+        """
+        Download ``(url, path)`` jobs with at most ``concurrent`` files in flight.
+
+        Args:
+            jobs: (url, destination path) per file
+            segments: Range segments per large file (default: the engine's)
+            on_result: Called with (url, path, ok, seconds, expected size) as each
+                file finishes; the size is the server's Content-Length when known
+
+        Returns:
+            Success flag per URL
+        """
+        segments = segments or self.segments
+        results: Dict[str, bool] = {}
+        # The adaptive controller, when given, replaces the fixed file limit
+        slots = self.controller or asyncio.Semaphore(self.concurrent)
+
+        with Progress(
+            TextColumn("[progress.description]{task.description}"),
+            BarColumn(),
+            DownloadColumn(),
+            TransferSpeedColumn(),
+            TextColumn("{task.fields[files]}"),
+            console=console,
+            disable=self.quiet,
+        ) as progress:
+            task = progress.add_task("Downloading", total=None, files=self._files_text(0, len(jobs)))
+            finished = 0
+
+            async with self._session() as session:
+
+                def on_bytes(n: int) -> None:
+                    progress.update(task, advance=n)
+                    metrics.BYTES_RECEIVED.inc(n, engine="native")
+
+                async def run(url: str, path: Path) -> None:
+                    nonlocal finished
+                    async with slots:
+                        metrics.QUEUE_DEPTH.inc(queue="native_in_flight")
+                        started = time.perf_counter()
+                        expected = None
+                        try:
+                            results[url], expected = await self._download_with_retries(
+                                session, url, path, segments, on_bytes,
+                            )
+                        finally:
+                            metrics.QUEUE_DEPTH.dec(queue="native_in_flight")
+                        seconds = time.perf_counter() - started
+                        metrics.file_downloaded("native", path.name, results[url], seconds)
+                        if on_result:
+                            on_result(url, path, results[url], seconds, expected)
+                    finished += 1
+                    progress.update(task, files=self._files_text(finished, len(jobs)))
+
+                await asyncio.gather(*(run(url, Path(path)) for url, path in jobs))
+
+        failed = sum(1 for ok in results.values() if not ok)
+        if failed:
+            console.print(f"[red]{failed} of {len(jobs)} downloads failed[/red]")
+        return results
+
+    async def _download_with_retries(self, session, url, path, segments, on_bytes) -> Tuple[bool, Optional[int]]:
+        """Returns (success, expected size from the server if known)."""
+        for attempt in range(1, self.max_tries + 1):
+            try:
+                return True, await self._download(session, url, path, segments, on_bytes)
+            except (aiohttp.ClientError, asyncio.TimeoutError, OSError) as e:
+                if attempt == self.max_tries:
+                    console.print(f"[red]Failed {url.split('/')[-1]}: {e}[/red]")
+                    return False, None
+                metrics.retried("download", url.split("/")[-1], e)
+                await asyncio.sleep(retry_delay(attempt, self.controller, base=self.retry_wait))
+        return False, None
+
+    async def _download(self, session, url: str, path: Path, segments: int, on_bytes) -> Optional[int]:
+        """Download one file; returns its size as announced by the server (None if unknown)."""
+        path.parent.mkdir(parents=True, exist_ok=True)
+        part = path.with_name(path.name + PART_SUFFIX)
+        state_file = path.with_name(path.name + PART_STATE_SUFFIX)
+
+        if path.exists() and not part.exists():
+            return None  # Already complete (matches aria2c --continue behaviour)
+
+        if segments > 1:
+            try:
+                size = await self._download_segmented(session, url, part, state_file, segments, on_bytes)
+                os.replace(part, path)
+                state_file.unlink(missing_ok=True)
+                return size
+            except _RangeNotSupported:
+                state_file.unlink(missing_ok=True)
+                part.unlink(missing_ok=True)
+
+        size = await self._download_stream(session, url, part, on_bytes)
+        os.replace(part, path)
+        return size
+
+    async def _download_stream(self, session, url: str, part: Path, on_bytes) -> Optional[int]:
+        """
+        Single-connection download, resuming from an existing .part file.
+
+        Returns:
+            The full size announced by the server (None if it sent no usable
+            Content-Length); a shorter body raises instead of completing
+        """
+        offset = part.stat().st_size if part.exists() else 0
+        headers = {"Range": f"bytes={offset}-"} if offset else {}
+
+        async with session.get(url, headers=headers) as response:
+            if response.status == 416:
+                return None  # .part already holds the whole file
+            response.raise_for_status()
+            if offset and response.status != 206:
+                offset = 0  # Server ignored Range; start over
+            expected = None
+            if response.content_length is not None and "Content-Encoding" not in response.headers:
+                expected = offset + response.content_length
+            with open(part, "r+b" if offset else "wb") as f:
+                f.seek(offset)
+                async for chunk in response.content.iter_chunked(CHUNK_SIZE):
+                    f.write(chunk)
+                    on_bytes(len(chunk))
+                written = f.tell()
+        if expected is not None and written != expected:
+            raise aiohttp.ClientPayloadError(f"Truncated download: {written} of {expected} bytes")
+        return expected
+
+    async def _probe_size(self, session, url: str) -> int:
+        """Return the file size, raising _RangeNotSupported if ranges don't work."""
+        async with session.get(url, headers={"Range": "bytes=0-0"}) as response:
+            response.raise_for_status()
+            content_range = response.headers.get("Content-Range", "")
+            if response.status != 206 or "/" not in content_range:
+                raise _RangeNotSupported()
+            total = content_range.rsplit("/", 1)[1]
+            if not total.isdigit():
+                raise _RangeNotSupported()
+            return int(total)
+
+    async def _download_segmented(self, session, url, part: Path, state_file: Path, segments: int, on_bytes) -> int:
+        """Parallel Range download into a preallocated file; returns the file size."""
+        state = None
+        if part.exists() and state_file.exists():
+            try:
+                state = json.loads(state_file.read_text())
+            except (OSError, ValueError):
+                state = None
+
+        if state is None or state.get("url") != url:
+            size = await self._probe_size(session, url)
+            if size == 0:
+                raise _RangeNotSupported()  # Nothing to split; the streaming path writes the empty file
+            count = max(1, min(segments, size // self.min_segment_size or 1))
+            step = -(-size // count)
+            state = {
+                "url": url,
+                "size": size,
+                # [next byte to fetch, last byte inclusive] per segment
+                "segments": [[start, min(start + step, size) - 1] for start in range(0, size, step)],
+            }
+            with open(part, "wb") as f:
+                _preallocate(f, size)
+        else:
+            on_bytes(state["size"] - sum(end - pos + 1 for pos, end in state["segments"] if pos <= end))
+
+        lock = asyncio.Lock()
+        unflushed = [0]
+
+        async def save_state() -> None:
+            async with lock:
+                tmp = state_file.with_suffix(".tmp")
+                tmp.write_text(json.dumps(state))
+                os.replace(tmp, state_file)
+
+        async def fetch(segment: list) -> None:
+            if segment[0] > segment[1]:
+                return
+            headers = {"Range": f"bytes={segment[0]}-{segment[1]}"}
+            async with session.get(url, headers=headers) as response:
+                response.raise_for_status()
+                if response.status != 206:
+                    raise _RangeNotSupported()
+                with open(part, "r+b") as f:
+                    f.seek(segment[0])
+                    async for chunk in response.content.iter_chunked(CHUNK_SIZE):
+                        f.write(chunk)
+                        segment[0] += len(chunk)
+                        on_bytes(len(chunk))
+                        unflushed[0] += len(chunk)
+                        if unflushed[0] >= STATE_FLUSH_BYTES:
+                            unflushed[0] = 0
+                            f.flush()
+                            await save_state()
+
+        tasks = [asyncio.ensure_future(fetch(seg)) for seg in state["segments"]]
+        try:
+            await asyncio.gather(*tasks)
+        finally:
+            # Stop sibling segments before persisting offsets, so a retry
+            # never races a still-running writer
+            for t in tasks:
+                t.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            await save_state()
+
+        if any(pos <= end for pos, end in state["segments"]):
+            raise aiohttp.ClientPayloadError("Incomplete segmented download")
+        return state["size"]
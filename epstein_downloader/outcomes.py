@@ -0,0 +1,154 @@
+"""Per-file download outcomes, so restarts retry only what actually failed."""
+
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Set
+
+from .layout import PARTIAL_SUFFIXES
+
+# Rewrite the log once it holds this many times more lines than live entries
+_COMPACT_RATIO = 4
+
+
+def outcomes_path(pdf_dir: Path) -> Path:
+    """Outcome log for a PDF directory: ``dataset9-pdfs`` -> ``dataset9-pdfs-outcomes.jsonl``."""
+    pdf_dir = Path(pdf_dir)
+    return pdf_dir.with_name(f"{pdf_dir.name}-outcomes.jsonl")
+
+
+def completed_size(path: Path) -> Optional[int]:
+    """Size of a finished download, or None if it is missing or still partial."""
+    if any(path.with_name(path.name + s).exists() for s in PARTIAL_SUFFIXES):
+        return None
+    try:
+        return path.stat().st_size
+    except FileNotFoundError:
+        return None
+
+
+class OutcomeLog:
+    """
+    Latest download outcome per filename, as an append-only JSON-lines log.
+
+    Each attempt appends ``{"f": name, "ok": bool, "size": bytes,
+    "s": seconds, "t": timestamp}`` (plus ``len``, the Content-Length, when
+    the engine saw one, and ``err`` on failures), flushed line by
+    line so a crash loses at most the file in flight. The last record for
+    a name wins; superseded lines are dropped by ``compact``. A torn final
+    line is ignored on load, like ``LogIndexStore``.
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self._records: Optional[Dict[str, dict]] = None
+        self._lines = 0
+        self._handle = None
+
+    @classmethod
+    def for_pdf_dir(cls, pdf_dir: Path) -> "OutcomeLog":
+        return cls(outcomes_path(pdf_dir))
+
+    def exists(self) -> bool:
+        return self.path.exists()
+
+    def _load(self) -> Dict[str, dict]:
+        if self._records is not None:
+            return self._records
+        self._records = {}
+        if self.path.exists():
+            good_size = 0
+            with open(self.path, "rb") as f:
+                for raw in f:
+                    if not raw.endswith(b"\n"):
+                        break
+                    try:
+                        record = json.loads(raw)
+                    except ValueError:
+                        break  # Torn write from a crash; drop the tail
+                    good_size += len(raw)
+                    self._records[record["f"]] = record
+                    self._lines += 1
+            if good_size != self.path.stat().st_size:
+                with open(self.path, "r+b") as f:
+                    f.truncate(good_size)
+        return self._records
+
+    def record(
+        self,
+        filename: str,
+        ok: bool,
+        size: Optional[int] = None,
+        seconds: Optional[float] = None,
+        error: Optional[str] = None,
+        expected: Optional[int] = None,
+    ) -> None:
+        """Append one file's outcome (thread-safe); ``expected`` is the server's Content-Length."""
+        entry = {"f": filename, "ok": ok, "size": size, "s": round(seconds, 3) if seconds is not None else None,
+                 "t": round(time.time())}
+        if expected is not None:
+            entry["len"] = expected
+        if error:
+            entry["err"] = error
+        with self._lock:
+            records = self._load()
+            if self._handle is None:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                self._handle = open(self.path, "a", encoding="utf-8", buffering=1)
+            self._handle.write(json.dumps(entry, separators=(",", ":")) + "\n")
+            records[filename] = entry
+            self._lines += 1
+
+    def record_from_disk(self, targets: List[Path]) -> int:
+        """
+        Record each target's outcome from what is on disk (aria2c only reports whole runs).
+
+        Returns:
+            Number of targets that did not complete
+        """
+        failed = 0
+        for path in targets:
+            size = completed_size(path)
+            if size is None:
+                self.record(path.name, False, error="incomplete")
+                failed += 1
+            else:
+                self.record(path.name, True, size=size)
+        return failed
+
+    def get(self, filename: str) -> Optional[dict]:
+        return self._load().get(filename)
+
+    def succeeded(self) -> Set[str]:
+        """Names whose latest attempt completed."""
+        return {name for name, r in self._load().items() if r["ok"]}
+
+    def failed(self) -> List[str]:
+        """Names whose latest attempt failed."""
+        return [name for name, r in self._load().items() if not r["ok"]]
+
+    def items(self) -> Iterator[dict]:
+        return iter(list(self._load().values()))
+
+    def compact(self) -> bool:
+        """Rewrite the log with one line per file if it has grown mostly stale."""
+        with self._lock:
+            records = self._load()
+            if self._lines <= max(len(records), 1000) * _COMPACT_RATIO:
+                return False
+            self.close()
+            tmp = self.path.with_name(self.path.name + ".tmp")
+            with open(tmp, "w", encoding="utf-8") as f:
+                for entry in records.values():
+                    f.write(json.dumps(entry, separators=(",", ":")) + "\n")
+            os.replace(tmp, self.path)
+            self._lines = len(records)
+            return True
+
+    def close(self) -> None:
+        if self._handle is not None:
+            self._handle.close()
+            self._handle = None
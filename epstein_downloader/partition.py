@@ -0,0 +1,231 @@
+"""Page-count discovery and parallel range-partitioned scraping."""
+
+import asyncio
+import json
+import os
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+import requests
+from rich.console import Console
+
+from . import metrics
+from .scraper import DatasetScraper, RateLimiter
+from .transport import retry_delay
+
+console = Console()
+
+
+class PageRangeScraper:
+    """
+    Scrapes a dataset as independent page chunks instead of one long walk.
+
+    ``discover_last_page`` finds the final real listing page with an
+    exponential-then-binary search, treating a page as past the end when it
+    is empty or its first file repeats the previous page's (or page 0's),
+    the same wrap fingerprint ``scrape_pages`` uses. The known range is then
+    split into contiguous chunks that are scraped concurrently; finished
+    chunks are checkpointed to ``dataset{N}-chunks.json`` so an interrupted
+    run only redoes the chunks that were in progress.
+    """
+
+    def __init__(self, scraper: DatasetScraper, chunk_size: int = 200):
+        self.scraper = scraper
+        self.chunk_size = chunk_size
+        self.state_file = scraper.output_dir / f"dataset{scraper.dataset_num}-chunks.json"
+        self._first_files: Dict[int, str] = {}
+
+    def _first_file(self, page: int) -> str:
+        """First filename on a page ("" if empty), retrying errors with backoff as ``iter_pages`` does."""
+        if page not in self._first_files:
+            controller = self.scraper.controller
+            attempt = 0
+            while True:
+                if controller:
+                    controller.wait_sync()
+                try:
+                    links = self.scraper._fetch_page(page)
+                    break
+                except requests.RequestException as e:
+                    console.print(f"[red]Error on page {page}: {e}[/red]")
+                    metrics.retried("scrape", f"page {page}", e)
+                    attempt += 1
+                    time.sleep(retry_delay(attempt, controller, base=2.0))
+            self._first_files[page] = links[0].split("/")[-1] if links else ""
+        return self._first_files[page]
+
+    def _is_valid(self, page: int) -> bool:
+        first = self._first_file(page)
+        if not first:
+            return False
+        if page == 0:
+            return True
+        return first != self._first_file(page - 1) and first != self._first_file(0)
+
+    def discover_last_page(self) -> int:
+        """
+        Return the last page with real content (-1 if page 0 is empty).
+
+        Costs O(log n) listing requests.
+        """
+        console.print(f"[bold]Discovering page count for Dataset {self.scraper.dataset_num}...[/bold]")
+        if not self._is_valid(0):
+            return -1
+
+        lo, hi = 0, 1
+        while self._is_valid(hi):
+            lo, hi = hi, hi * 2
+
+        # Invariant: lo valid, hi invalid
+        while hi - lo > 1:
+            mid = (lo + hi) // 2
+            if self._is_valid(mid):
+                lo = mid
+            else:
+                hi = mid
+
+        console.print(f"[dim]Last page: {lo} ({len(self._first_files)} probe requests)[/dim]")
+        return lo
+
+    def _load_state(self, page_range: Tuple[int, int]) -> List[int]:
+        """Return starts of chunks already completed for this exact range."""
+        if self.state_file.exists():
+            with open(self.state_file, "r") as f:
+                state = json.load(f)
+            if state.get("range") == list(page_range) and state.get("chunk_size") == self.chunk_size:
+                return state.get("done", [])
+        return []
+
+    def _save_state(self, page_range: Tuple[int, int], done: List[int]) -> None:
+        tmp = self.state_file.with_name(self.state_file.name + ".tmp")
+        with open(tmp, "w") as f:
+            json.dump({"range": list(page_range), "chunk_size": self.chunk_size, "done": sorted(done)}, f)
+        os.replace(tmp, self.state_file)
+
+    def scrape(
+        self,
+        start_page: int = 0,
+        max_pages: Optional[int] = None,
+        workers: int = 8,
+        rate_limit: Optional[float] = None,
+        on_new_urls: Optional[Callable[[List[str]], None]] = None,
+    ) -> List[str]:
+        """
+        Discover the page range, then scrape its chunks in parallel.
+
+        Args:
+            start_page: First page to scrape
+            max_pages: Maximum number of pages (None = through the last page)
+            workers: Chunks scraped concurrently
+            rate_limit: Global requests-per-second cap (None = unlimited)
+            on_new_urls: Called with each page's new URLs
+
+        Returns:
+            List of new PDF URLs found
+        """
+        last_page = self.discover_last_page()
+        end_page = last_page
+        if max_pages:
+            end_page = min(end_page, start_page + max_pages - 1)
+        if end_page < start_page:
+            console.print("[yellow]No pages to scrape in the requested range.[/yellow]")
+            return self.scraper._finish_scrape([])
+
+        return asyncio.run(self._scrape_async(
+            (start_page, end_page), last_page, workers, rate_limit, on_new_urls,
+        ))
+
+    def scrape_range(
+        self,
+        first_page: int,
+        last_page: int,
+        workers: int = 8,
+        rate_limit: Optional[float] = None,
+        on_new_urls: Optional[Callable[[List[str]], None]] = None,
+    ) -> List[str]:
+        """
+        Scrape a known page range in parallel chunks, without discovery.
+
+        Used for ranges whose pages are known to exist (such as a leased
+        shard); the index is never marked complete.
+
+        Returns:
+            List of new PDF URLs found
+        """
+        return asyncio.run(self._scrape_async((first_page, last_page), None, workers, rate_limit, on_new_urls))
+
+    async def _scrape_async(
+        self,
+        page_range: Tuple[int, int],
+        last_page: Optional[int],
+        workers: int,
+        rate_limit: Optional[float],
+        on_new_urls: Optional[Callable[[List[str]], None]],
+    ) -> List[str]:
+        scraper = self.scraper
+        store = scraper.store
+        start_page, end_page = page_range
+
+        done = self._load_state(page_range)
+        chunks = [
+            (start, min(start + self.chunk_size - 1, end_page))
+            for start in range(start_page, end_page + 1, self.chunk_size)
+            if start not in done
+        ]
+        total_chunks = len(chunks) + len(done)
+        if done:
+            console.print(f"[dim]Resuming: {len(done)}/{total_chunks} chunks already done[/dim]")
+
+        indexed = store.count()
+        scraper._print_start(start_page, indexed)
+        console.print(f"[dim]Pages {start_page}-{end_page} in {total_chunks} chunks, {workers} workers[/dim]")
+
+        new_urls: List[str] = []
+        queue: "asyncio.Queue[Tuple[int, int]]" = asyncio.Queue()
+        for chunk in chunks:
+            queue.put_nowait(chunk)
+        limiter = RateLimiter(rate_limit)
+
+        # With a controller, its adaptive limit gates requests; run enough workers to reach its ceiling
+        if scraper.controller:
+            workers = max(workers, scraper.controller.maximum)
+
+        async with scraper.client_session(limit=workers) as session:
+            with scraper._progress() as progress:
+                task = progress.add_task(
+                    f"{len(done)}/{total_chunks} chunks",
+                    total=end_page - start_page + 1,
+                    completed=sum(min(s + self.chunk_size - 1, end_page) - s + 1 for s in done),
+                    files=indexed,
+                    control=scraper.control_text(),
+                )
+
+                async def worker() -> None:
+                    while True:
+                        try:
+                            first, last = queue.get_nowait()
+                        except asyncio.QueueEmpty:
+                            return
+                        for page in range(first, last + 1):
+                            _, pdf_links = await scraper._fetch_page_async(session, limiter, page)
+                            page_new = scraper._index_urls(pdf_links)
+                            new_urls.extend(page_new)
+                            if on_new_urls and page_new:
+                                on_new_urls(page_new)
+                            progress.update(
+                                task, advance=1, files=indexed + len(new_urls) + scraper.zip_satisfied,
+                                control=scraper.control_text(),
+                            )
+
+                        # Chunk checkpoint: index first, then the chunk marker
+                        done.append(first)
+                        store.meta["last_page"] = max(store.meta.get("last_page", 0), last)
+                        store.commit()
+                        self._save_state(page_range, done)
+                        progress.update(task, description=f"{len(done)}/{total_chunks} chunks")
+
+                await asyncio.gather(*(worker() for _ in range(workers)))
+
+        if start_page == 0 and end_page == last_page:
+            store.meta["complete"] = True
+        return scraper._finish_scrape(new_urls)
@@ -0,0 +1,179 @@
+"""Streaming scrape-to-download pipeline."""
+
+import asyncio
+import queue
+import threading
+from pathlib import Path
+from typing import List, Optional
+
+from rich.console import Console
+
+from . import metrics
+from .downloader import Downloader
+from .scraper import Checkpoint, DatasetScraper
+
+console = Console()
+
+# Marks the end of the URL stream for the download worker
+_DONE = None
+
+
+class ScrapeDownloadPipeline:
+    """
+    Overlaps listing-page scraping with PDF downloading.
+
+    Pages come from ``DatasetScraper.iter_pages`` (or ``aiter_pages`` with
+    ``concurrency`` > 1) and their new URLs are pushed into a bounded queue
+    that a background worker drains in batches into
+    ``Downloader.download_pdf_list``. When downloads fall behind, ``put``
+    blocks the scraper. Only counters are kept, so memory stays bounded by
+    ``queue_size`` no matter how large the dataset is. The partitioned
+    scraper has no page iterator and still returns its URL list, so with
+    ``partition`` memory grows with the number of new files.
+    """
+
+    def __init__(
+        self,
+        scraper: DatasetScraper,
+        downloader: Downloader,
+        pdf_dir: Path,
+        queue_size: int = 5000,
+        batch_size: int = 500,
+        flush_interval: float = 5.0,
+    ):
+        self.scraper = scraper
+        self.downloader = downloader
+        self.pdf_dir = Path(pdf_dir)
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.queue: "queue.Queue[Optional[str]]" = queue.Queue(maxsize=queue_size)
+
+        self.batches = 0
+        self.failed_batches = 0
+        self.submitted = 0
+        self.failed_files = 0
+        # Exceptions raised by download batches; only the first few messages are kept
+        self.exceptions = 0
+        self.errors: List[str] = []
+
+    def run(
+        self,
+        start_page: int = 0,
+        max_pages: Optional[int] = None,
+        delay: float = 0.3,
+        concurrency: int = 1,
+        rate_limit: Optional[float] = None,
+        partition: bool = False,
+        chunk_size: int = 200,
+        checkpoint: Optional[Checkpoint] = None,
+    ) -> int:
+        """
+        Scrape and download concurrently.
+
+        Arguments are those of ``DatasetScraper.scrape_pages``.
+
+        Returns:
+            Number of new PDF URLs found
+        """
+        worker = threading.Thread(target=self._download_worker, daemon=True)
+        worker.start()
+
+        try:
+            if partition:
+                new_count = len(self.scraper.scrape_pages(
+                    start_page=start_page, max_pages=max_pages, delay=delay, concurrency=concurrency,
+                    rate_limit=rate_limit, on_new_urls=self._enqueue, partition=True, chunk_size=chunk_size,
+                    checkpoint=checkpoint,
+                ))
+            elif concurrency > 1:
+                if rate_limit is None and delay > 0:
+                    rate_limit = concurrency / delay
+                new_count = asyncio.run(self._scrape_async(start_page, max_pages, concurrency, rate_limit, checkpoint))
+            else:
+                new_count = 0
+                for result in self.scraper.iter_pages(start_page, max_pages, delay, checkpoint):
+                    self._enqueue(result.new_urls)
+                    new_count += len(result.new_urls)
+        finally:
+            self.queue.put(_DONE)
+            worker.join()
+
+        self._print_summary(new_count)
+        return new_count
+
+    async def _scrape_async(
+        self,
+        start_page: int,
+        max_pages: Optional[int],
+        concurrency: int,
+        rate_limit: Optional[float],
+        checkpoint: Optional[Checkpoint],
+    ) -> int:
+        new_count = 0
+        async for result in self.scraper.aiter_pages(start_page, max_pages, concurrency, rate_limit, checkpoint):
+            self._enqueue(result.new_urls)
+            new_count += len(result.new_urls)
+        return new_count
+
+    def _enqueue(self, urls: List[str]) -> None:
+        """Scraper callback; blocks while the queue is full."""
+        for url in urls:
+            self.queue.put(url)
+        metrics.QUEUE_DEPTH.set(self.queue.qsize(), queue="pipeline")
+
+    def _download_worker(self) -> None:
+        """Drain the queue into download batches until the stream ends."""
+        batch: List[str] = []
+        while True:
+            try:
+                item = self.queue.get(timeout=self.flush_interval)
+                metrics.QUEUE_DEPTH.set(self.queue.qsize(), queue="pipeline")
+            except queue.Empty:
+                # Scraper is slow; don't let a partial batch sit idle
+                if batch:
+                    self._download_batch(batch)
+                    batch = []
+                continue
+
+            if item is _DONE:
+                if batch:
+                    self._download_batch(batch)
+                return
+
+            batch.append(item)
+            if len(batch) >= self.batch_size:
+                self._download_batch(batch)
+                batch = []
+
+    def _download_batch(self, batch: List[str]) -> None:
+        """Download one batch and record the outcome."""
+        self.batches += 1
+        self.submitted += len(batch)
+        console.print(f"\n[yellow]Downloading batch {self.batches} ({len(batch)} PDFs)...[/yellow]")
+        try:
+            ok = self.downloader.download_pdf_list(batch, self.pdf_dir)
+        except Exception as e:
+            # Keep draining: a dead worker would leave the scraper blocked on a full queue
+            console.print(f"[red]Batch {self.batches} failed: {e}[/red]")
+            self.exceptions += 1
+            if len(self.errors) < 5:
+                self.errors.append(f"batch {self.batches}: {e}")
+            ok = False
+        if not ok:
+            self.failed_batches += 1
+            self.failed_files += len(batch)
+
+    def _print_summary(self, new_count: int) -> None:
+        """Print end-of-run download accounting."""
+        console.print(f"\n[green]Pipeline complete![/green]")
+        console.print(f"  New files found: {new_count}")
+        console.print(f"  PDFs submitted for download: {self.submitted} in {self.batches} batches")
+        if self.failed_batches:
+            console.print(
+                f"  [red]{self.failed_batches} batches reported errors "
+                f"({self.failed_files} URLs); run 'epstein-dl resume' to retry[/red]"
+            )
+        for error in self.errors:
+            console.print(f"    [red]{error}[/red]")
+        if self.exceptions > len(self.errors):
+            console.print(f"    [dim]... {self.exceptions - len(self.errors)} more errors[/dim]")
@@ -0,0 +1,149 @@
+"""Concurrent job scheduler for multi-dataset downloads."""
+
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional
+
+from rich.console import Console
+from rich.live import Live
+from rich.table import Table
+
+from . import metrics
+
+console = Console()
+
+# Host key for the DOJ website (listing pages, ZIPs and PDFs)
+DOJ_HOST = "www.justice.gov"
+# Torrents talk to peers, not to one host, so they are not host-limited
+TORRENT_HOST = None
+
+
+@dataclass
+class Job:
+    """A unit of work (torrent, ZIP, scrape + PDF fetch) run by the scheduler."""
+    name: str
+    func: Callable[["Job"], bool]
+    host: Optional[str] = DOJ_HOST
+    # Jobs that must finish (successfully or not) before this one starts
+    after: List["Job"] = field(default_factory=list)
+    status: str = "pending"
+    detail: str = ""
+    started: Optional[float] = None
+    finished: Optional[float] = None
+
+    @property
+    def elapsed(self) -> float:
+        if self.started is None:
+            return 0.0
+        return (self.finished or time.monotonic()) - self.started
+
+
+class JobScheduler:
+    """
+    Runs jobs concurrently under a global budget and per-host limits.
+
+    A job is only started when both a global slot and a slot for its host
+    are free, so a ``--all`` run can overlap torrents with DOJ downloads
+    without opening more than ``host_limit`` DOJ jobs at once. A live table
+    shows every job's state; jobs may update ``job.detail`` as they run.
+    """
+
+    _STATUS_STYLE = {
+        "pending": "dim",
+        "running": "yellow",
+        "done": "green",
+        "failed": "red",
+    }
+
+    def __init__(
+        self,
+        max_workers: int = 4,
+        host_limit: int = 2,
+        host_limits: Optional[Dict[str, int]] = None,
+    ):
+        self.max_workers = max_workers
+        self.host_limit = host_limit
+        self.host_limits = host_limits or {}
+        self.jobs: List[Job] = []
+
+    def add(
+        self,
+        name: str,
+        func: Callable[[Job], bool],
+        host: Optional[str] = DOJ_HOST,
+        after: Optional[List[Job]] = None,
+    ) -> Job:
+        """Queue a job; ``func`` receives the Job and returns success."""
+        job = Job(name=name, func=func, host=host, after=after or [])
+        self.jobs.append(job)
+        return job
+
+    def _host_capacity(self, host: Optional[str]) -> int:
+        if host is None:
+            return self.max_workers
+        return self.host_limits.get(host, self.host_limit)
+
+    def _run_job(self, job: Job) -> bool:
+        job.status = "running"
+        job.started = time.monotonic()
+        try:
+            return bool(job.func(job))
+        except Exception as e:
+            job.detail = f"{type(e).__name__}: {e}"
+            return False
+        finally:
+            job.finished = time.monotonic()
+
+    def render(self) -> Table:
+        """Build the combined progress table."""
+        table = Table(title="Jobs", expand=False)
+        table.add_column("Job", style="cyan")
+        table.add_column("Status")
+        table.add_column("Time", justify="right")
+        table.add_column("Detail", style="dim")
+        for job in self.jobs:
+            style = self._STATUS_STYLE.get(job.status, "")
+            minutes, seconds = divmod(int(job.elapsed), 60)
+            table.add_row(
+                job.name,
+                f"[{style}]{job.status}[/{style}]",
+                f"{minutes}:{seconds:02d}" if job.started else "-",
+                job.detail,
+            )
+        running = sum(1 for j in self.jobs if j.status == "running")
+        finished = sum(1 for j in self.jobs if j.status in ("done", "failed"))
+        table.caption = f"{running} running, {finished}/{len(self.jobs)} finished"
+        return table
+
+    def run(self) -> Dict[str, bool]:
+        """Run all queued jobs and return success per job name."""
+        pending = list(self.jobs)
+        running: Dict[Future, Job] = {}
+        host_usage: Dict[Optional[str], int] = {}
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool, \
+                Live(self.render(), console=console, refresh_per_second=2) as live:
+            while pending or running:
+                for job in list(pending):
+                    if len(running) >= self.max_workers:
+                        break
+                    if host_usage.get(job.host, 0) >= self._host_capacity(job.host):
+                        continue
+                    if any(dep.status not in ("done", "failed") for dep in job.after):
+                        continue
+                    pending.remove(job)
+                    host_usage[job.host] = host_usage.get(job.host, 0) + 1
+                    running[pool.submit(self._run_job, job)] = job
+
+                metrics.QUEUE_DEPTH.set(len(pending), queue="jobs_pending")
+                metrics.QUEUE_DEPTH.set(len(running), queue="jobs_running")
+                done, _ = wait(list(running), timeout=0.5, return_when=FIRST_COMPLETED)
+                for future in done:
+                    job = running.pop(future)
+                    host_usage[job.host] -= 1
+                    job.status = "done" if future.result() else "failed"
+                live.update(self.render())
+
+        metrics.QUEUE_DEPTH.set(0, queue="jobs_running")
+        return {job.name: job.status == "done" for job in self.jobs}
@@ -2,58 +2,229 @@
 
 import re
 import time
-import json
+import asyncio
+from dataclasses import dataclass
+from itertools import chain
 from pathlib import Path
-from typing import List, Set, Optional
+from typing import AsyncIterator, Callable, Dict, Iterator, List, Set, Optional
 from urllib.parse import unquote
 
+import aiohttp
 import requests
 from rich.console import Console
 from rich.progress import Progress, BarColumn, TextColumn, TimeRemainingColumn
 
-from .config import DOJ_COOKIE, DOJ_BASE_URL, get_listing_url
+from . import metrics
+from .adaptive import AdaptiveController
+from .archives import ZipCatalog
+from .config import DATASETS, DOJ_BASE_URL, get_listing_url
+from .efta_bitmap import Coverage, build_coverage, efta_filename
+from .index_store import IndexStore, open_index_store
+from .layout import pdf_path, resolve_layout, scan_pdf_names
+from .manifest import Manifest
+from .outcomes import OutcomeLog, completed_size
+from .listing_cache import CachedPage, ListingCache, conditional_headers, content_hash
+from .transport import async_session, retry_delay, sync_session
 
 console = Console()
 
 
+class PageWalk:
+    """
+    Pagination stop detection, fed one page at a time in page order.
+
+    The DOJ listing never returns 404 past the last page: it either serves
+    empty pages or wraps around to earlier content. This tracks both
+    conditions so the sequential and concurrent scrapers stop identically.
+    """
+
+    def __init__(self, start_page: int, max_empty: int = 3, max_wrap: int = 10):
+        self.start_page = start_page
+        self.max_empty = max_empty
+        self.max_wrap = max_wrap
+        self.last_first_file = ""
+        self.wrap_count = 0
+        self.consecutive_empty = 0
+
+    def feed(self, page: int, pdf_links: List[str]) -> str:
+        """
+        Record a page's links.
+
+        Returns:
+            "ok" if the page's links should be indexed, "empty" for an empty
+            page, "stop-empty" or "stop-wrap" if scraping should stop here.
+        """
+        if not pdf_links:
+            self.consecutive_empty += 1
+            if self.consecutive_empty >= self.max_empty:
+                return "stop-empty"
+            return "empty"
+
+        self.consecutive_empty = 0
+
+        # Check for pagination wrap (same first file = looped)
+        first_file = pdf_links[0].split("/")[-1]
+
+        if first_file == self.last_first_file and page > self.start_page:
+            self.wrap_count += 1
+            if self.wrap_count >= self.max_wrap:
+                return "stop-wrap"
+        else:
+            self.wrap_count = 0
+
+        self.last_first_file = first_file
+        return "ok"
+
+
+class RateLimiter:
+    """Async limiter that spaces request starts to a global rate."""
+
+    def __init__(self, rate: Optional[float]):
+        self.interval = 1.0 / rate if rate else 0.0
+        self._next = 0.0
+        self._lock = asyncio.Lock()
+
+    async def wait(self) -> None:
+        """Wait until the next request slot is available."""
+        if not self.interval:
+            return
+        async with self._lock:
+            loop = asyncio.get_running_loop()
+            now = loop.time()
+            if self._next > now:
+                await asyncio.sleep(self._next - now)
+                now = self._next
+            self._next = now + self.interval
+
+
+@dataclass
+class PageResult:
+    """One listing page as applied to the index."""
+    page: int
+    # Every PDF URL on the page (empty for an empty page)
+    links: List[str]
+    # Newly indexed URLs that still need downloading
+    new_urls: List[str]
+
+
+class Checkpoint:
+    """
+    Decides when scrape progress is made durable.
+
+    ``page_done`` is called after each indexed page, in page order. The
+    scraper always saves once more when a scrape ends, so subclasses only
+    choose the intermediate points (or add their own bookkeeping).
+    """
+
+    def page_done(self, scraper: "DatasetScraper", page: int) -> None:
+        """Called after ``page`` has been added to the index."""
+
+
+class IndexCheckpoint(Checkpoint):
+    """Commit the index and listing cache every ``every`` pages (the default)."""
+
+    def __init__(self, every: int = 100):
+        self.every = max(1, every)
+
+    def page_done(self, scraper: "DatasetScraper", page: int) -> None:
+        if page % self.every == 0:
+            scraper.save_progress()
+
+
+class UrlListWriter:
+    """Appends URLs to an aria2c input file (``url`` plus ``dir=`` / ``out=`` lines) as they are found."""
+
+    def __init__(self, path: Path, pdf_dir: Path, layout: str):
+        self.pdf_dir = pdf_dir
+        self.layout = layout
+        self._handle = open(path, "w")
+
+    def write(self, urls: List[str]) -> None:
+        for url in urls:
+            target = pdf_path(self.pdf_dir, url.split("/")[-1], self.layout)
+            self._handle.write(f"{url}\n  dir={target.parent}\n  out={target.name}\n")
+        if urls:
+            self._handle.flush()
+
+    def close(self) -> None:
+        self._handle.close()
+
+
 class DatasetScraper:
-    """Scrapes PDF URLs from DOJ listing pages."""
+    """
+    Scrapes PDF URLs from DOJ listing pages.
+
+    With a ``ListingCache``, pages are fetched conditionally and unchanged
+    pages reuse their cached links instead of being re-parsed.
+
+    With ``skip_zipped`` (the default), files already inside the dataset's
+    downloaded ZIP are still indexed but count as satisfied: they are left
+    out of the returned URLs, the aria2c URL list and ``get_missing_files``.
 
-    def __init__(self, output_dir: Path, dataset_num: int):
+    With an ``AdaptiveController``, concurrent scrapes size their requests in
+    flight from server feedback (up to the controller's maximum) and every
+    mode waits out ``Retry-After`` / backs off instead of sleeping 5 s.
+    """
+
+    def __init__(
+        self,
+        output_dir: Path,
+        dataset_num: int,
+        index_backend: str = "auto",
+        cache: Optional[ListingCache] = None,
+        quiet: bool = False,
+        layout: str = "auto",
+        skip_zipped: bool = True,
+        base_url: str = DOJ_BASE_URL,
+        controller: Optional[AdaptiveController] = None,
+    ):
         self.output_dir = Path(output_dir)
         self.dataset_num = dataset_num
-        self.index_file = self.output_dir / f"dataset{dataset_num}-index.json"
+        self.controller = controller
+        self.base_url = base_url.rstrip("/")
+        self._link_re = re.compile(
+            rf'href="{re.escape(self.base_url)}(/epstein/files/DataSet%20{dataset_num}/[^"]+\.pdf)"'
+        )
+        self.cache = cache
+        self.quiet = quiet
+        self.layout = layout
+        self.skip_zipped = skip_zipped
+        self._zip_catalog: Optional[ZipCatalog] = None
+        self._zip_checked = False
+        self.zip_satisfied = 0
+        self.unchanged_pages = 0
+        self.store: IndexStore = open_index_store(self.output_dir, dataset_num, index_backend)
+        self.index_file = self.store.path
         self.urls_file = self.output_dir / f"dataset{dataset_num}-urls.txt"
-        self.session = requests.Session()
-        self.session.headers.update({
-            "Cookie": DOJ_COOKIE,
-            "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36",
-        })
+        self.session = sync_session()
 
     def load_index(self) -> dict:
-        """Load existing index from file."""
-        if self.index_file.exists():
-            with open(self.index_file, "r") as f:
-                return json.load(f)
-        return {"files": {}, "last_page": 0, "complete": False}
+        """Load existing index as a ``{"files", "last_page", "complete"}`` dict."""
+        return self.store.to_dict()
 
     def save_index(self, index: dict) -> None:
-        """Save index to file."""
-        self.output_dir.mkdir(parents=True, exist_ok=True)
-        with open(self.index_file, "w") as f:
-            json.dump(index, f, indent=2)
+        """Merge an index dict into the store and commit it."""
+        for filename, url in index.get("files", {}).items():
+            self.store.add(filename, url)
+        self.store.meta["last_page"] = index.get("last_page", 0)
+        self.store.meta["complete"] = index.get("complete", False)
+        self.store.commit()
 
     def extract_pdf_links(self, html: str) -> List[str]:
         """Extract PDF URLs from HTML content."""
-        pattern = rf'href="{DOJ_BASE_URL}(/epstein/files/DataSet%20{self.dataset_num}/[^"]+\.pdf)"'
-        matches = re.findall(pattern, html)
-        return [f"{DOJ_BASE_URL}{unquote(m)}" for m in matches]
+        return [f"{self.base_url}{unquote(m)}" for m in self._link_re.findall(html)]
 
     def scrape_pages(
         self,
         start_page: int = 0,
         max_pages: Optional[int] = None,
         delay: float = 0.3,
+        concurrency: int = 1,
+        rate_limit: Optional[float] = None,
+        on_new_urls: Optional[Callable[[List[str]], None]] = None,
+        partition: bool = False,
+        chunk_size: int = 200,
+        checkpoint: Optional[Checkpoint] = None,
     ) -> List[str]:
         """
         Scrape all pages to build index of PDF files.
@@ -62,144 +233,589 @@ class DatasetScraper:
             start_page: Page number to start from
             max_pages: Maximum number of pages to scrape (None = all)
             delay: Delay between requests in seconds
+            concurrency: Listing pages kept in flight (>1 uses aiohttp)
+            rate_limit: Global requests-per-second cap for concurrent mode
+                (None = derived from delay)
+            on_new_urls: Called with each page's new URLs as soon as the
+                page is indexed (may block to apply backpressure)
+            partition: Discover the last page by binary search, then scrape
+                chunks of ``chunk_size`` pages with ``concurrency`` workers
+            chunk_size: Pages per chunk in partitioned mode
+            checkpoint: When to commit progress (default: every 100 pages);
+                not supported with ``partition``, which checkpoints per chunk
             
         Returns:
             List of new PDF URLs found
         """
-        index = self.load_index()
-        existing_files: Set[str] = set(index["files"].keys())
+        if partition and checkpoint is not None:
+            raise ValueError("checkpoint is not supported with partition=True (chunks are checkpointed instead)")
+        if (concurrency > 1 or partition) and rate_limit is None and delay > 0:
+            rate_limit = concurrency / delay
+
+        if partition:
+            from .partition import PageRangeScraper
+            return PageRangeScraper(self, chunk_size=chunk_size).scrape(
+                start_page=start_page,
+                max_pages=max_pages,
+                workers=concurrency,
+                rate_limit=rate_limit,
+                on_new_urls=on_new_urls,
+            )
+
+        if concurrency > 1:
+            return asyncio.run(self.scrape_pages_async(
+                start_page=start_page,
+                max_pages=max_pages,
+                concurrency=concurrency,
+                rate_limit=rate_limit,
+                on_new_urls=on_new_urls,
+                checkpoint=checkpoint,
+            ))
+
         new_urls: List[str] = []
+        for result in self.iter_pages(start_page, max_pages, delay, checkpoint):
+            new_urls.extend(result.new_urls)
+            if on_new_urls and result.new_urls:
+                on_new_urls(result.new_urls)
+        return new_urls
+
+    def iter_pages(
+        self,
+        start_page: int = 0,
+        max_pages: Optional[int] = None,
+        delay: float = 0.3,
+        checkpoint: Optional[Checkpoint] = None,
+    ) -> Iterator[PageResult]:
+        """
+        Scrape pages one at a time, yielding each as soon as it is indexed.
+
+        Nothing is accumulated across pages: new URLs go straight to the
+        aria2c URL list, and progress is committed through ``checkpoint``.
+        With the sqlite or efta index backend memory stays flat however
+        many pages there are. The index is committed and the summary
+        printed when the generator is exhausted or closed early.
+
+        Args:
+            start_page: Page number to start from
+            max_pages: Maximum number of pages to scrape (None = all)
+            delay: Delay between requests in seconds
+            checkpoint: When to commit progress (default: every 100 pages)
+
+        Yields:
+            One ``PageResult`` per listing page, in page order
+        """
+        checkpoint = checkpoint or IndexCheckpoint()
+        indexed = self.store.count()
+        found = 0
 
         page = start_page
-        last_first_file = ""
-        wrap_count = 0
-        consecutive_empty = 0
+        walk = PageWalk(start_page)
+        attempt = 0
+
+        self._print_start(start_page, indexed)
+        urls_out = self._open_urls_file()
+
+        try:
+            with self._progress() as progress:
+                # Unknown total, so we'll update as we go
+                task = progress.add_task(
+                    f"Page {page}",
+                    total=max_pages or 30000,
+                    files=indexed,
+                    control=self.control_text(),
+                )
+
+                while True:
+                    if max_pages and page >= start_page + max_pages:
+                        console.print(f"[yellow]Reached max pages ({max_pages})[/yellow]")
+                        break
+
+                    progress.update(task, description=f"Page {page}")
+
+                    if self.controller:
+                        self.controller.wait_sync()
+                    try:
+                        pdf_links = self._fetch_page(page)
+                    except requests.RequestException as e:
+                        console.print(f"\n[red]Error on page {page}: {e}[/red]")
+                        metrics.retried("scrape", f"page {page}", e)
+                        attempt += 1
+                        time.sleep(retry_delay(attempt, self.controller, base=2.0))
+                        continue
+                    attempt = 0
+
+                    result = self._handle_page(walk, page, pdf_links, checkpoint)
+                    if result is None:
+                        break
+                    urls_out.write(result.new_urls)
+                    found += len(result.new_urls)
+                    if pdf_links:
+                        progress.update(
+                            task, advance=1, files=indexed + found + self.zip_satisfied,
+                            control=self.control_text(),
+                        )
+                    yield result
+                    if pdf_links:
+                        time.sleep(delay)
 
-        console.print(f"[bold]Scraping Dataset {self.dataset_num} pages...[/bold]")
-        console.print(f"[dim]Starting from page {start_page}, {len(existing_files)} files already indexed[/dim]")
+                    page += 1
+        finally:
+            urls_out.close()
+            self._summarize(found)
 
-        with Progress(
-            TextColumn("[progress.description]{task.description}"),
-            BarColumn(),
-            TextColumn("[progress.percentage]{task.percentage:>3.0f}%"),
-            TextColumn("•"),
-            TextColumn("{task.fields[files]} files"),
-            TimeRemainingColumn(),
-            console=console,
-        ) as progress:
-            # Unknown total, so we'll update as we go
-            task = progress.add_task(
-                f"Page {page}",
-                total=max_pages or 30000,
-                files=len(existing_files),
-            )
+    def iter_new_files(self, **kwargs) -> Iterator[str]:
+        """Yield newly indexed URLs that still need downloading as they are found (see ``iter_pages``)."""
+        for result in self.iter_pages(**kwargs):
+            yield from result.new_urls
 
-            while True:
-                if max_pages and page >= start_page + max_pages:
-                    console.print(f"[yellow]Reached max pages ({max_pages})[/yellow]")
-                    break
+    async def scrape_pages_async(
+        self,
+        start_page: int = 0,
+        max_pages: Optional[int] = None,
+        concurrency: int = 8,
+        rate_limit: Optional[float] = None,
+        on_new_urls: Optional[Callable[[List[str]], None]] = None,
+        checkpoint: Optional[Checkpoint] = None,
+    ) -> List[str]:
+        """
+        Scrape pages with several listing requests in flight.
 
-                url = get_listing_url(self.dataset_num, page)
-                progress.update(task, description=f"Page {page}")
+        Args:
+            start_page: Page number to start from
+            max_pages: Maximum number of pages to scrape (None = all)
+            concurrency: Maximum number of listing requests in flight
+            rate_limit: Global requests-per-second cap (None = unlimited)
+            on_new_urls: Called with each page's new URLs in page order
+            checkpoint: When to commit progress (default: every 100 pages)
 
-                try:
-                    response = self.session.get(url, timeout=30)
-                    response.raise_for_status()
+        Returns:
+            List of new PDF URLs found
+        """
+        new_urls: List[str] = []
+        async for result in self.aiter_pages(start_page, max_pages, concurrency, rate_limit, checkpoint):
+            new_urls.extend(result.new_urls)
+            if on_new_urls and result.new_urls:
+                on_new_urls(result.new_urls)
+        return new_urls
 
-                    pdf_links = self.extract_pdf_links(response.text)
+    async def aiter_pages(
+        self,
+        start_page: int = 0,
+        max_pages: Optional[int] = None,
+        concurrency: int = 8,
+        rate_limit: Optional[float] = None,
+        checkpoint: Optional[Checkpoint] = None,
+    ) -> AsyncIterator[PageResult]:
+        """
+        Async ``iter_pages`` with several listing requests in flight.
 
-                    if not pdf_links:
-                        consecutive_empty += 1
-                        if consecutive_empty >= 3:
-                            console.print(f"\n[yellow]No files found on 3 consecutive pages, stopping.[/yellow]")
-                            break
-                        page += 1
-                        continue
+        Responses may complete out of order; they are buffered and fed to
+        the wrap/empty detection strictly in page order, so the stop point
+        and resulting index match the sequential scraper. The buffer is
+        bounded by the dispatch window, so memory stays flat as in
+        ``iter_pages``.
 
-                    consecutive_empty = 0
+        Args:
+            start_page: Page number to start from
+            max_pages: Maximum number of pages to scrape (None = all)
+            concurrency: Maximum number of listing requests in flight
+            rate_limit: Global requests-per-second cap (None = unlimited)
+            checkpoint: When to commit progress (default: every 100 pages)
 
-                    # Check for pagination wrap (same first file = looped)
-                    first_file = pdf_links[0].split("/")[-1] if pdf_links else ""
+        Yields:
+            One ``PageResult`` per listing page, in page order
+        """
+        checkpoint = checkpoint or IndexCheckpoint()
+        indexed = self.store.count()
+        found = 0
+
+        end_page = start_page + max_pages if max_pages else None
+        walk = PageWalk(start_page)
+        limiter = RateLimiter(rate_limit)
+        # Bound how far dispatch may run ahead of the in-order cursor so the
+        # reorder buffer stays small when one page is slow.
+        window = concurrency * 4
+
+        self._print_start(start_page, indexed)
+        urls_out = self._open_urls_file()
+
+        next_page = start_page
+        cursor = start_page
+        done_pages: Dict[int, List[str]] = {}
+        in_flight: Set[asyncio.Task] = set()
+        stopped = False
+
+        # With a controller, its adaptive limit gates requests; dispatch up to its ceiling
+        if self.controller:
+            concurrency = max(concurrency, self.controller.maximum)
+            window = concurrency * 4
+
+        try:
+            async with self.client_session(limit=concurrency) as session:
+                with self._progress() as progress:
+                    task = progress.add_task(
+                        f"Page {start_page}",
+                        total=max_pages or 30000,
+                        files=indexed,
+                        control=self.control_text(),
+                    )
+
+                    try:
+                        while True:
+                            while (
+                                not stopped
+                                and len(in_flight) < concurrency
+                                and next_page - cursor < window
+                                and (end_page is None or next_page < end_page)
+                            ):
+                                in_flight.add(asyncio.ensure_future(
+                                    self._fetch_page_async(session, limiter, next_page)
+                                ))
+                                next_page += 1
+
+                            if not in_flight:
+                                break
+
+                            finished, in_flight = await asyncio.wait(
+                                in_flight, return_when=asyncio.FIRST_COMPLETED,
+                            )
+                            for t in finished:
+                                page, pdf_links = t.result()
+                                done_pages[page] = pdf_links
+
+                            while not stopped and cursor in done_pages:
+                                pdf_links = done_pages.pop(cursor)
+                                progress.update(task, description=f"Page {cursor}")
+                                result = self._handle_page(walk, cursor, pdf_links, checkpoint)
+                                if result is None:
+                                    stopped = True
+                                    break
+                                urls_out.write(result.new_urls)
+                                found += len(result.new_urls)
+                                if pdf_links:
+                                    progress.update(
+                                        task, advance=1, files=indexed + found + self.zip_satisfied,
+                                        control=self.control_text(),
+                                    )
+                                cursor += 1
+                                yield result
+                    finally:
+                        for t in in_flight:
+                            t.cancel()
+                        if in_flight:
+                            await asyncio.gather(*in_flight, return_exceptions=True)
+
+                if not stopped and end_page is not None and cursor >= end_page:
+                    console.print(f"[yellow]Reached max pages ({max_pages})[/yellow]")
+        finally:
+            urls_out.close()
+            self._summarize(found)
 
-                    if first_file == last_first_file and page > start_page:
-                        wrap_count += 1
-                        if wrap_count >= 10:
-                            console.print(f"\n[yellow]Pagination wrapped at page {page}, stopping.[/yellow]")
-                            index["complete"] = True
-                            break
-                    else:
-                        wrap_count = 0
+    async def aiter_new_files(self, **kwargs) -> AsyncIterator[str]:
+        """Async ``iter_new_files`` (see ``aiter_pages``)."""
+        async for result in self.aiter_pages(**kwargs):
+            for url in result.new_urls:
+                yield url
 
-                    last_first_file = first_file
+    async def _fetch_page_async(
+        self,
+        session: aiohttp.ClientSession,
+        limiter: RateLimiter,
+        page: int,
+    ) -> tuple:
+        """Fetch one listing page, retrying on errors like the sync scraper."""
+        url = get_listing_url(self.dataset_num, page, self.base_url)
+        attempt = 0
+        while True:
+            await limiter.wait()
+            cached = self.cache.get(self.dataset_num, page) if self.cache else None
+            started = time.perf_counter()
+            if self.controller:
+                await self.controller.acquire()
+            try:
+                async with session.get(url, headers=conditional_headers(cached)) as response:
+                    if response.status == 304 and cached:
+                        self.unchanged_pages += 1
+                        metrics.page_fetched(self.dataset_num, page, "not_modified", time.perf_counter() - started)
+                        return page, cached.links
+                    response.raise_for_status()
+                    body = await response.read()
+                    headers = response.headers
+                links = self._links_from_body(page, body, headers, cached)
+                metrics.page_fetched(self.dataset_num, page, "ok", time.perf_counter() - started, len(links))
+                return page, links
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                metrics.page_fetched(self.dataset_num, page, "error", time.perf_counter() - started)
+                console.print(f"\n[red]Error on page {page}: {e}[/red]")
+                metrics.retried("scrape", f"page {page}", e)
+            finally:
+                if self.controller:
+                    self.controller.release()
+            attempt += 1
+            await asyncio.sleep(retry_delay(attempt, self.controller, base=2.0))
+
+    def _fetch_page(self, page: int) -> List[str]:
+        """Fetch one listing page (conditionally, if cached) and return its links."""
+        url = get_listing_url(self.dataset_num, page, self.base_url)
+        cached = self.cache.get(self.dataset_num, page) if self.cache else None
+
+        started = time.perf_counter()
+        try:
+            try:
+                response = self.session.get(url, headers=conditional_headers(cached), timeout=30)
+            except requests.RequestException as e:
+                if self.controller:
+                    self.controller.record_error(e)
+                raise
+            if self.controller:
+                self.controller.record(
+                    response.status_code, response.elapsed.total_seconds(), response.headers.get("Retry-After"),
+                )
+            if response.status_code == 304 and cached:
+                self.unchanged_pages += 1
+                metrics.page_fetched(self.dataset_num, page, "not_modified", time.perf_counter() - started)
+                return cached.links
+            response.raise_for_status()
+        except requests.RequestException:
+            metrics.page_fetched(self.dataset_num, page, "error", time.perf_counter() - started)
+            raise
+        links = self._links_from_body(page, response.content, response.headers, cached)
+        metrics.page_fetched(self.dataset_num, page, "ok", time.perf_counter() - started, len(links))
+        return links
+
+    def _links_from_body(self, page: int, body: bytes, headers, cached: Optional[CachedPage]) -> List[str]:
+        """Extract links from a page body, skipping extraction if it is unchanged."""
+        body_hash = content_hash(body)
+        if cached and cached.content_hash == body_hash:
+            self.unchanged_pages += 1
+            links = cached.links
+        else:
+            links = self.extract_pdf_links(body.decode("utf-8", errors="replace"))
+
+        if self.cache:
+            self.cache.put(
+                self.dataset_num,
+                page,
+                headers.get("ETag"),
+                headers.get("Last-Modified"),
+                body_hash,
+                links,
+            )
+        return links
 
-                    # Add new files to index
-                    for url in pdf_links:
-                        filename = url.split("/")[-1]
-                        if filename not in existing_files:
-                            index["files"][filename] = url
-                            existing_files.add(filename)
-                            new_urls.append(url)
+    def _handle_page(
+        self,
+        walk: PageWalk,
+        page: int,
+        pdf_links: List[str],
+        checkpoint: Checkpoint,
+    ) -> Optional[PageResult]:
+        """
+        Apply one in-order page result to the index.
 
-                    index["last_page"] = page
-                    progress.update(task, advance=1, files=len(existing_files))
+        Returns:
+            The page's result, or None if scraping should stop at this page
+        """
+        result = walk.feed(page, pdf_links)
+        if result == "stop-empty":
+            console.print(f"\n[yellow]No files found on {walk.max_empty} consecutive pages, stopping.[/yellow]")
+            return None
+        if result == "stop-wrap":
+            console.print(f"\n[yellow]Pagination wrapped at page {page}, stopping.[/yellow]")
+            self.store.meta["complete"] = True
+            return None
+        if result == "empty":
+            return PageResult(page, pdf_links, [])
+
+        page_new = self._index_urls(pdf_links)
+        self.store.meta["last_page"] = page
+        checkpoint.page_done(self, page)
+        return PageResult(page, pdf_links, page_new)
+
+    def save_progress(self) -> None:
+        """Commit the index and listing cache."""
+        self.store.commit()
+        if self.cache:
+            self.cache.commit()
+
+    @property
+    def zip_catalog(self) -> Optional[ZipCatalog]:
+        """PDF members of this dataset's downloaded ZIP (loaded on first use)."""
+        if self.skip_zipped and not self._zip_checked:
+            self._zip_checked = True
+            self._zip_catalog = ZipCatalog.for_dataset(self.output_dir, self.dataset_num)
+            if self._zip_catalog:
+                console.print(
+                    f"[dim]{len(self._zip_catalog)} PDFs already in {self._zip_catalog.zip_path.name}; "
+                    f"they will not be downloaded again[/dim]"
+                )
+        return self._zip_catalog
+
+    def _index_urls(self, pdf_links: List[str]) -> List[str]:
+        """
+        Add a page's links to the index.
 
-                    # Save progress periodically
-                    if page % 100 == 0:
-                        self.save_index(index)
+        Returns:
+            The newly indexed URLs that still need downloading
+        """
+        catalog = self.zip_catalog
+        page_new: List[str] = []
+        for url in pdf_links:
+            filename = url.split("/")[-1]
+            if self.store.add(filename, url):
+                if catalog is not None and filename in catalog:
+                    self.zip_satisfied += 1
+                else:
+                    page_new.append(url)
+        return page_new
+
+    def _print_start(self, start_page: int, indexed: int) -> None:
+        """Print the scrape header."""
+        console.print(f"[bold]Scraping Dataset {self.dataset_num} pages...[/bold]")
+        console.print(f"[dim]Starting from page {start_page}, {indexed} files already indexed[/dim]")
 
-                    page += 1
-                    time.sleep(delay)
+    def _progress(self) -> Progress:
+        """Create the scrape progress display."""
+        return Progress(
+            TextColumn("[progress.description]{task.description}"),
+            BarColumn(),
+            TextColumn("[progress.percentage]{task.percentage:>3.0f}%"),
+            TextColumn("•"),
+            TextColumn("{task.fields[files]} files"),
+            TimeRemainingColumn(),
+            TextColumn("[dim]{task.fields[control]}[/dim]"),
+            console=console,
+            disable=self.quiet,
+        )
 
-                except requests.RequestException as e:
-                    console.print(f"\n[red]Error on page {page}: {e}[/red]")
-                    time.sleep(5)
-                    continue
+    def control_text(self) -> str:
+        """Adaptive controller state for the progress line ("" without one)."""
+        return self.controller.describe() if self.controller else ""
 
-        # Final save
-        self.save_index(index)
-        
-        # Save URL list for aria2c
+    def client_session(self, limit: int) -> aiohttp.ClientSession:
+        """Pooled aiohttp session for listing pages, reporting to the controller if any."""
+        return async_session(limit=limit, timeout=aiohttp.ClientTimeout(total=30), controller=self.controller)
+
+    def _finish_scrape(self, new_urls: List[str]) -> List[str]:
+        """Save the index and URL list and print the summary."""
         self._save_urls_file(new_urls)
+        self._summarize(len(new_urls))
+        return new_urls
+
+    def _summarize(self, new_count: int) -> None:
+        """Save the index and manifest and print the summary (the URL list is already written)."""
+        # Final save
+        self.save_progress()
+        Manifest(self.output_dir).update_index(
+            self.dataset_num,
+            self.store.count(),
+            last_page=self.store.meta.get("last_page", 0),
+            complete=self.store.meta.get("complete", False),
+        )
+        metrics.event(
+            "scrape_done", dataset=self.dataset_num, indexed=self.store.count(),
+            new=new_count + self.zip_satisfied, zip_satisfied=self.zip_satisfied,
+        )
 
         console.print(f"\n[green]Scraping complete![/green]")
-        console.print(f"  Total files indexed: {len(existing_files)}")
-        console.print(f"  New files found: {len(new_urls)}")
+        console.print(f"  Total files indexed: {self.store.count()}")
+        console.print(f"  New files found: {new_count + self.zip_satisfied}")
+        if self.zip_satisfied:
+            console.print(f"  Already in ZIP (not downloaded): {self.zip_satisfied}")
+        if self.cache:
+            console.print(f"  Unchanged pages (from cache): {self.unchanged_pages}")
         console.print(f"  Index saved to: {self.index_file}")
+        console.print(f"  URL list saved to: {self.urls_file}")
 
-        return new_urls
-
-    def _save_urls_file(self, urls: List[str]) -> None:
-        """Save URLs to a file for aria2c."""
+    def _open_urls_file(self) -> UrlListWriter:
+        """Start a fresh aria2c URL list for this scrape."""
         pdf_dir = self.output_dir / f"dataset{self.dataset_num}-pdfs"
         pdf_dir.mkdir(parents=True, exist_ok=True)
+        return UrlListWriter(self.urls_file, pdf_dir, resolve_layout(pdf_dir, self.layout))
 
-        with open(self.urls_file, "w") as f:
-            for url in urls:
-                filename = url.split("/")[-1]
-                f.write(f"{url}\n")
-                f.write(f"  dir={pdf_dir}\n")
-                f.write(f"  out={filename}\n")
-
-        console.print(f"  URL list saved to: {self.urls_file}")
+    def _save_urls_file(self, urls: List[str]) -> None:
+        """Save URLs to a file for aria2c."""
+        writer = self._open_urls_file()
+        writer.write(urls)
+        writer.close()
 
     def get_all_urls(self) -> List[str]:
         """Get all URLs from the index."""
-        index = self.load_index()
-        return list(index["files"].values())
+        return list(self.store.urls())
 
-    def get_missing_files(self) -> List[str]:
-        """Get URLs for files that haven't been downloaded yet."""
-        index = self.load_index()
+    def coverage(self) -> Coverage:
+        """Indexed vs. downloaded EFTA bitmaps for this dataset."""
         pdf_dir = self.output_dir / f"dataset{self.dataset_num}-pdfs"
+        dataset = DATASETS.get(self.dataset_num)
+        present = scan_pdf_names(pdf_dir)
+        if self.zip_catalog is not None:
+            present = chain(present, self.zip_catalog.names())
+        return build_coverage(
+            self.store.filenames(),
+            present,
+            efta_start=dataset.efta_start if dataset else None,
+            efta_end=dataset.efta_end if dataset else None,
+        )
+
+    def get_missing_files(self, rescan: bool = False) -> List[str]:
+        """
+        Get URLs for files that haven't been downloaded yet.
 
-        if not pdf_dir.exists():
-            return list(index["files"].values())
+        Once downloads have recorded outcomes for the PDF directory, only
+        files without a successful outcome are checked (one stat each);
+        files found complete on disk are recorded as done so later calls
+        skip them. Otherwise, or with ``rescan``, the directory is scanned.
+        """
+        pdf_dir = self.output_dir / f"dataset{self.dataset_num}-pdfs"
+        outcomes = OutcomeLog.for_pdf_dir(pdf_dir)
+        if outcomes.exists() and not rescan:
+            return self._missing_from_outcomes(pdf_dir, outcomes)
+
+        coverage = self.coverage()
+        names = [efta_filename(n) for n in coverage.missing.numbers()]
+        names += coverage.irregular_missing
+        return [self.store.get(name) for name in names]
+
+    def _missing_from_outcomes(self, pdf_dir: Path, outcomes: OutcomeLog) -> List[str]:
+        done = outcomes.succeeded()
+        catalog = self.zip_catalog
+        layout = resolve_layout(pdf_dir, self.layout)
+        missing: List[str] = []
+        for name, url in self.store.items():
+            if name in done or (catalog is not None and name in catalog):
+                continue
+            size = completed_size(pdf_path(pdf_dir, name, layout))
+            if size is None:
+                missing.append(url)
+            else:
+                outcomes.record(name, True, size=size)  # Downloaded before outcomes were tracked
+        outcomes.close()
+        return missing
 
-        downloaded = {f.name for f in pdf_dir.glob("*.pdf")}
-        missing = []
+    def extract_zipped(self, workers: Optional[int] = None) -> int:
+        """
+        Extract indexed PDFs that are inside the dataset ZIP but not on disk.
 
-        for filename, url in index["files"].items():
-            if filename not in downloaded:
-                missing.append(url)
+        Args:
+            workers: Extraction processes (default: CPU count)
 
-        return missing
+        Returns:
+            Number of files extracted
+        """
+        catalog = self.zip_catalog
+        if catalog is None:
+            return 0
+        pdf_dir = self.output_dir / f"dataset{self.dataset_num}-pdfs"
+        on_disk = set(scan_pdf_names(pdf_dir))
+        layout = resolve_layout(pdf_dir, self.layout)
+        targets = [
+            (name, pdf_path(pdf_dir, name, layout))
+            for name in self.store.filenames()
+            if name in catalog and name not in on_disk
+        ]
+        if not targets:
+            return 0
+        console.print(f"[yellow]Extracting {len(targets)} PDFs from {catalog.zip_path.name}...[/yellow]")
+        extracted = catalog.extract(targets, workers=workers)
+        Manifest(self.output_dir).add_files(pdf_dir.name, [dest for _, dest in targets])
+        return extracted
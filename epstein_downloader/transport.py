@@ -0,0 +1,150 @@
+"""Shared HTTP transport: pooled keep-alive connections, DNS caching, retries and DOJ headers."""
+
+import random
+import socket
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+import aiohttp
+import requests
+from aiohttp.abc import AbstractResolver
+from aiohttp.resolver import ThreadedResolver
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from .adaptive import AdaptiveController
+from .config import DOJ_COOKIE
+
+USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"
+
+# Sent with every request to justice.gov (the cookie skips the age gate)
+DEFAULT_HEADERS = {"Cookie": DOJ_COOKIE, "User-Agent": USER_AGENT}
+
+# Keep-alive connections kept open per host
+POOL_SIZE = 32
+# Seconds a resolved address is reused by every session in the process
+DNS_TTL = 300.0
+# Server errors worth retrying at the transport level; 429/503 are left to
+# the callers so the adaptive controller sees them
+_RETRY_STATUSES = (500, 502, 504)
+
+
+def backoff_delay(attempt: int, base: float = 1.0, cap: float = 30.0) -> float:
+    """
+    Seconds to wait before retry ``attempt`` (1-based): exponential, half jittered.
+
+    The jitter keeps workers that failed together from retrying in lockstep.
+    """
+    delay = min(cap, base * 2 ** max(attempt - 1, 0))
+    return delay / 2 + random.uniform(0, delay / 2)
+
+
+def retry_delay(attempt: int, controller: Optional[AdaptiveController] = None, base: float = 1.0) -> float:
+    """Wait before a retry: the controller's Retry-After / backoff if there is one, else ``backoff_delay``."""
+    if controller:
+        return controller.retry_delay()
+    return backoff_delay(attempt, base=base)
+
+
+_session: Optional[requests.Session] = None
+_session_lock = threading.Lock()
+
+
+def sync_session() -> requests.Session:
+    """
+    The process-wide ``requests`` session.
+
+    Every sync request path shares it, so connections stay alive across
+    datasets and commands in one process. Connection errors and 5xx
+    responses to GET/HEAD are retried with jittered backoff (urllib3 2.x
+    ``backoff_jitter``); each host keeps up to ``POOL_SIZE`` idle
+    connections.
+    """
+    global _session
+    with _session_lock:
+        if _session is None:
+            retry = Retry(
+                total=3,
+                connect=3,
+                read=2,
+                status=2,
+                status_forcelist=_RETRY_STATUSES,
+                allowed_methods=frozenset({"GET", "HEAD"}),
+                backoff_factor=0.5,
+                backoff_jitter=0.5,
+                raise_on_status=False,
+                respect_retry_after_header=True,
+            )
+            adapter = HTTPAdapter(pool_connections=16, pool_maxsize=POOL_SIZE, max_retries=retry)
+            session = requests.Session()
+            session.headers.update(DEFAULT_HEADERS)
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+            _session = session
+        return _session
+
+
+class CachedResolver(AbstractResolver):
+    """
+    aiohttp resolver whose answers are shared process-wide for ``DNS_TTL``.
+
+    aiohttp's own cache lives in one connector, and every ``asyncio.run``
+    (one per dataset scrape, probe or download batch) gets a new one; this
+    keeps lookups from being repeated for each of them.
+    """
+
+    _cache: Dict[Tuple[str, int, int], Tuple[float, List]] = {}
+    _lock = threading.Lock()
+
+    def __init__(self):
+        self._resolver = ThreadedResolver()
+
+    async def resolve(self, host: str, port: int = 0, family: int = socket.AF_INET) -> List:
+        key = (host, port, family)
+        with self._lock:
+            cached = self._cache.get(key)
+        if cached and cached[0] > time.monotonic():
+            return cached[1]
+        result = await self._resolver.resolve(host, port, family)
+        with self._lock:
+            self._cache[key] = (time.monotonic() + DNS_TTL, result)
+        return result
+
+    async def close(self) -> None:
+        await self._resolver.close()
+
+
+def async_session(
+    limit: int = POOL_SIZE,
+    limit_per_host: int = 0,
+    timeout: Optional[aiohttp.ClientTimeout] = None,
+    controller: Optional[AdaptiveController] = None,
+    headers: Optional[dict] = None,
+) -> aiohttp.ClientSession:
+    """
+    aiohttp session with the DOJ headers, keep-alive pooling and cached DNS.
+
+    Connections are kept alive within the session only: an aiohttp
+    connector belongs to one event loop, so across ``asyncio.run`` calls
+    (datasets, batches) only the ``CachedResolver`` answers are shared.
+
+    Args:
+        limit: Connections open at once (0 = unlimited)
+        limit_per_host: Connections per host (0 = only ``limit`` applies)
+        timeout: Request timeout (default: aiohttp's)
+        controller: Adaptive controller fed by every response of the session
+        headers: Extra headers on top of ``DEFAULT_HEADERS``
+    """
+    connector = aiohttp.TCPConnector(
+        limit=limit,
+        limit_per_host=limit_per_host,
+        resolver=CachedResolver(),
+        keepalive_timeout=60,
+    )
+    return aiohttp.ClientSession(
+        headers={**DEFAULT_HEADERS, **(headers or {})},
+        connector=connector,
+        timeout=timeout or aiohttp.ClientTimeout(total=30),
+        trace_configs=[controller.trace_config()] if controller else None,
+    )
@@ -0,0 +1,202 @@
+"""Fast structural checks that catch empty, truncated or half-written PDFs."""
+
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from rich.console import Console
+from rich.progress import BarColumn, Progress, TextColumn
+
+from .layout import scan_pdf_entries
+from .outcomes import OutcomeLog, completed_size
+
+console = Console()
+
+# "%PDF-" may be preceded by junk, but readers only look this far
+HEAD_BYTES = 1024
+# "%%EOF" may be followed by whitespace or junk; allow a few KB
+TAIL_BYTES = 4096
+QUARANTINE_SUFFIX = ".invalid"
+
+
+def check_pdf(path: Path, size: int, expected: Optional[int] = None) -> str:
+    """
+    Check a PDF's size, header and trailer, reading only its first and last few KB.
+
+    Args:
+        path: File to check
+        size: Its current size (from the directory scan)
+        expected: Content-Length recorded when it was downloaded, if any
+
+    Returns:
+        "" if the file looks complete, otherwise the reason it does not
+    """
+    if size == 0:
+        return "empty"
+    if expected is not None and size != expected:
+        return f"size {size} != Content-Length {expected}"
+    with open(path, "rb") as f:
+        if b"%PDF-" not in f.read(HEAD_BYTES):
+            return "no %PDF- header"
+        f.seek(max(0, size - TAIL_BYTES))
+        if b"%%EOF" not in f.read(TAIL_BYTES):
+            return "no %%EOF trailer (truncated?)"
+    return ""
+
+
+def _check_job(job: Tuple[str, int, Optional[int]]) -> str:
+    path, size, expected = job
+    try:
+        return check_pdf(Path(path), size, expected)
+    except OSError as e:
+        return f"unreadable: {e}"
+
+
+class ValidationCache:
+    """
+    Results of earlier checks keyed by ``(name, size, mtime)``.
+
+    Stored as ``dataset{N}-pdfs-validated.json`` next to the PDF directory,
+    so the next pass only opens files that are new or have changed.
+    """
+
+    def __init__(self, pdf_dir: Path):
+        pdf_dir = Path(pdf_dir)
+        self.path = pdf_dir.with_name(f"{pdf_dir.name}-validated.json")
+        self.entries: Dict[str, list] = {}
+        self.dirty = False
+        if self.path.exists():
+            try:
+                with open(self.path, "r") as f:
+                    self.entries = json.load(f)
+            except (OSError, ValueError):
+                self.entries = {}
+
+    def get(self, name: str, size: int, mtime_ns: int) -> Optional[str]:
+        """Cached reason ("" = valid) if the file is unchanged, else None."""
+        entry = self.entries.get(name)
+        if entry is None or entry[0] != size or entry[1] != mtime_ns:
+            return None
+        return entry[2]
+
+    def put(self, name: str, size: int, mtime_ns: int, reason: str) -> None:
+        self.entries[name] = [size, mtime_ns, reason]
+        self.dirty = True
+
+    def forget(self, name: str) -> None:
+        if self.entries.pop(name, None) is not None:
+            self.dirty = True
+
+    def save(self) -> None:
+        """Atomically write the cache if anything changed."""
+        if not self.dirty:
+            return
+        tmp = self.path.with_name(self.path.name + ".tmp")
+        with open(tmp, "w") as f:
+            json.dump(self.entries, f, separators=(",", ":"))
+        os.replace(tmp, self.path)
+        self.dirty = False
+
+
+@dataclass
+class ValidationResult:
+    """Outcome of a validation pass over one PDF directory."""
+    checked: int = 0
+    cached: int = 0
+    invalid: List[Tuple[Path, str]] = field(default_factory=list)
+
+
+def validate_pdfs(
+    pdf_dir: Path,
+    workers: int = 32,
+    use_cache: bool = True,
+    quiet: bool = False,
+) -> ValidationResult:
+    """
+    Check every PDF in a dataset directory on a thread pool.
+
+    Sizes are compared with the Content-Length recorded in the directory's
+    ``OutcomeLog`` where the download engine saw one. Files still being
+    downloaded (with an ``.aria2`` / ``.part`` sidecar) are skipped.
+
+    Args:
+        pdf_dir: Dataset PDF directory (flat or sharded)
+        workers: Files checked in parallel
+        use_cache: Skip files unchanged since they were last checked
+        quiet: Hide the progress bar
+
+    Returns:
+        Counts of checked / cached files and the invalid ones with reasons
+    """
+    pdf_dir = Path(pdf_dir)
+    result = ValidationResult()
+    cache = ValidationCache(pdf_dir)
+    outcomes = OutcomeLog.for_pdf_dir(pdf_dir)
+
+    todo: List[Tuple[str, int, Optional[int]]] = []
+    stats: Dict[str, Tuple[int, int]] = {}
+    for entry in scan_pdf_entries(pdf_dir):
+        st = entry.stat()
+        cached = cache.get(entry.name, st.st_size, st.st_mtime_ns) if use_cache else None
+        if cached is not None:
+            result.cached += 1
+            if cached:
+                result.invalid.append((Path(entry.path), cached))
+            continue
+        record = outcomes.get(entry.name) if outcomes.exists() else None
+        todo.append((entry.path, st.st_size, record.get("len") if record else None))
+        stats[entry.path] = (st.st_size, st.st_mtime_ns)
+
+    with Progress(
+        TextColumn("[progress.description]{task.description}"),
+        BarColumn(),
+        TextColumn("{task.completed}/{task.total} files"),
+        console=console,
+        disable=quiet or not todo,
+    ) as progress:
+        task = progress.add_task(f"Validating {pdf_dir.name}", total=len(todo))
+        with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+            for job, reason in zip(todo, pool.map(_check_job, todo, chunksize=64)):
+                path = Path(job[0])
+                progress.advance(task)
+                if reason and completed_size(path) is None:
+                    continue  # Still downloading
+                result.checked += 1
+                size, mtime_ns = stats[job[0]]
+                cache.put(path.name, size, mtime_ns, reason)
+                if reason:
+                    result.invalid.append((path, reason))
+
+    cache.save()
+    return result
+
+
+def quarantine(pdf_dir: Path, invalid: List[Tuple[Path, str]]) -> int:
+    """
+    Move invalid PDFs aside (``<name>.invalid``) and mark them failed for re-download.
+
+    Both ``resume`` paths then pick them up: the outcome log no longer
+    lists them as done and the PDF itself is gone from the directory.
+
+    Returns:
+        Number of files moved
+    """
+    if not invalid:
+        return 0
+    outcomes = OutcomeLog.for_pdf_dir(pdf_dir)
+    cache = ValidationCache(pdf_dir)
+    moved = 0
+    for path, reason in invalid:
+        try:
+            os.replace(path, path.with_name(path.name + QUARANTINE_SUFFIX))
+        except FileNotFoundError:
+            continue
+        outcomes.record(path.name, False, error=f"invalid: {reason}")
+        cache.forget(path.name)
+        moved += 1
+    outcomes.close()
+    cache.save()
+    return moved
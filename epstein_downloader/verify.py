@@ -0,0 +1,260 @@
+"""Checksum verification for downloaded archives."""
+
+import hashlib
+import json
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+from rich.console import Console
+from rich.progress import BarColumn, DownloadColumn, Progress, TextColumn, TransferSpeedColumn
+
+from .config import DATASETS
+
+console = Console()
+
+CHUNK_SIZE = 8 * 1024 * 1024
+CACHE_FILENAME = "verify-cache.json"
+
+
+@dataclass
+class FileHashes:
+    """SHA-256 and MD5 digests of one file."""
+    sha256: str
+    md5: str
+
+
+def hash_file(path: Path, chunk_size: int = CHUNK_SIZE) -> FileHashes:
+    """
+    Compute SHA-256 and MD5 in a single pass over the file.
+
+    Reads into one reusable buffer so multi-gigabyte archives hash at disk
+    speed without allocating a new bytes object per chunk; ``hashlib``
+    releases the GIL on large updates.
+    """
+    sha256 = hashlib.sha256()
+    md5 = hashlib.md5()
+    buf = bytearray(chunk_size)
+    view = memoryview(buf)
+    with open(path, "rb", buffering=0) as f:
+        while True:
+            n = f.readinto(buf)
+            if not n:
+                break
+            sha256.update(view[:n])
+            md5.update(view[:n])
+    return FileHashes(sha256=sha256.hexdigest(), md5=md5.hexdigest())
+
+
+def _hash_worker(path: str) -> tuple:
+    hashes = hash_file(Path(path))
+    return path, hashes.sha256, hashes.md5
+
+
+class VerifyCache:
+    """
+    Remembers digests keyed by ``(path, size, mtime)``.
+
+    A file that hasn't changed since it was last hashed is not read again,
+    so re-running ``verify`` over tens of gigabytes is instant. Safe to
+    share between the scheduler's download threads.
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.entries: Dict[str, dict] = {}
+        self.dirty = False
+        self._lock = threading.Lock()
+        if self.path.exists():
+            try:
+                with open(self.path, "r") as f:
+                    self.entries = json.load(f)
+            except (OSError, ValueError):
+                self.entries = {}
+
+    @staticmethod
+    def _key(path: Path) -> str:
+        return str(Path(path).resolve())
+
+    def get(self, path: Path) -> Optional[FileHashes]:
+        """Return cached digests if the file is unchanged, else None."""
+        entry = self.entries.get(self._key(path))
+        if entry is None:
+            return None
+        st = os.stat(path)
+        if entry["size"] != st.st_size or entry["mtime_ns"] != st.st_mtime_ns:
+            return None
+        return FileHashes(sha256=entry["sha256"], md5=entry["md5"])
+
+    def put(self, path: Path, hashes: FileHashes) -> None:
+        st = os.stat(path)
+        with self._lock:
+            self.entries[self._key(path)] = {
+                "size": st.st_size,
+                "mtime_ns": st.st_mtime_ns,
+                "sha256": hashes.sha256,
+                "md5": hashes.md5,
+            }
+            self.dirty = True
+
+    def save(self) -> None:
+        """Atomically write the cache if anything changed."""
+        with self._lock:
+            if not self.dirty:
+                return
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self.path.with_name(self.path.name + ".tmp")
+            with open(tmp, "w") as f:
+                json.dump(self.entries, f)
+            os.replace(tmp, self.path)
+            self.dirty = False
+
+
+def hash_files(
+    paths: Iterable[Path],
+    cache: Optional[VerifyCache] = None,
+    workers: Optional[int] = None,
+    quiet: bool = False,
+) -> Dict[Path, FileHashes]:
+    """
+    Hash many files, reusing cached digests and spreading the rest across cores.
+
+    Args:
+        paths: Files to hash
+        cache: Digest cache (None = always hash)
+        workers: Worker processes (default: CPU count)
+        quiet: Hide the progress bar
+
+    Returns:
+        Digests per path
+    """
+    results: Dict[Path, FileHashes] = {}
+    todo: List[Path] = []
+    for path in paths:
+        cached = cache.get(path) if cache else None
+        if cached:
+            results[path] = cached
+        else:
+            todo.append(path)
+
+    if not todo:
+        return results
+
+    workers = max(1, min(workers or os.cpu_count() or 1, len(todo)))
+    sizes = {str(p): p.stat().st_size for p in todo}
+    by_name = {str(p): p for p in todo}
+
+    with Progress(
+        TextColumn("[progress.description]{task.description}"),
+        BarColumn(),
+        DownloadColumn(),
+        TransferSpeedColumn(),
+        TextColumn("{task.fields[files]}"),
+        console=console,
+        disable=quiet,
+    ) as progress:
+        task = progress.add_task("Hashing", total=sum(sizes.values()), files=f"0/{len(todo)} files")
+
+        done = [0]
+
+        def record(name: str, sha256: str, md5: str) -> None:
+            path = by_name[name]
+            results[path] = FileHashes(sha256=sha256, md5=md5)
+            if cache:
+                cache.put(path, results[path])
+            done[0] += 1
+            progress.update(task, advance=sizes[name], files=f"{done[0]}/{len(todo)} files")
+
+        if workers == 1:
+            for name in by_name:
+                record(*_hash_worker(name))
+        else:
+            # Many small files: batch them to keep IPC overhead down
+            chunksize = max(1, len(todo) // (workers * 8))
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                for name, sha256, md5 in pool.map(_hash_worker, list(by_name), chunksize=chunksize):
+                    record(name, sha256, md5)
+
+    if cache:
+        cache.save()
+    return results
+
+
+def _normalize(name: str) -> str:
+    return name.lower().replace(" ", "").replace("_", "").replace("%20", "")
+
+
+def find_archives(output_dir: Path, dataset_num: int) -> List[Path]:
+    """
+    Locate a dataset's archive in ``zips/`` or anywhere under ``torrents/``.
+
+    Torrent payloads keep their upstream names (``DataSet 10.zip``), so
+    names are compared ignoring case, spaces and underscores.
+    """
+    output_dir = Path(output_dir)
+    wanted = f"dataset{dataset_num}.zip"
+    found: List[Path] = []
+
+    zip_path = output_dir / "zips" / f"DataSet{dataset_num}.zip"
+    if zip_path.is_file():
+        found.append(zip_path)
+
+    torrents_dir = output_dir / "torrents"
+    if torrents_dir.exists():
+        for path in torrents_dir.rglob("*.zip"):
+            if path.is_file() and _normalize(path.name) == wanted:
+                found.append(path)
+    return found
+
+
+def has_checksums(dataset_num: int) -> bool:
+    """Whether a published checksum exists for the dataset's archive."""
+    dataset = DATASETS.get(dataset_num)
+    return bool(dataset and (dataset.checksum_sha256 or dataset.checksum_md5))
+
+
+def check_hashes(dataset_num: int, hashes: FileHashes) -> Optional[bool]:
+    """
+    Compare digests with the dataset's published checksums.
+
+    Returns:
+        True/False for match/mismatch, None if no checksum is known
+    """
+    if not has_checksums(dataset_num):
+        return None
+    dataset = DATASETS[dataset_num]
+    if dataset.checksum_sha256 and dataset.checksum_sha256.lower() != hashes.sha256:
+        return False
+    if dataset.checksum_md5 and dataset.checksum_md5.lower() != hashes.md5:
+        return False
+    return True
+
+
+def verify_file(path: Path, dataset_num: int, cache: Optional[VerifyCache] = None, quiet: bool = False) -> bool:
+    """
+    Verify one downloaded archive against its published checksum.
+
+    Args:
+        path: Archive to check
+        dataset_num: Dataset whose checksums apply
+        cache: Digest cache (None = always hash)
+        quiet: Only print on mismatch
+
+    Returns:
+        False only on a checksum mismatch (unknown checksums pass)
+    """
+    if not has_checksums(dataset_num):
+        return True
+    if not quiet:
+        console.print(f"[dim]Verifying {path.name}...[/dim]")
+    hashes = hash_files([path], cache=cache, quiet=quiet)[path]
+    ok = check_hashes(dataset_num, hashes)
+    if ok:
+        if not quiet:
+            console.print(f"[green]Checksum OK: {path.name}[/green]")
+        return True
+    console.print(f"[red]Checksum mismatch: {path} (sha256 {hashes.sha256})[/red]")
+    return False